@@ -5,26 +5,125 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Configuration du bot
-BOT_TOKEN = os.getenv('BOT_TOKEN')
-if not BOT_TOKEN:
-    raise ValueError("BOT_TOKEN n'est pas défini dans le fichier .env")
+BOT_TOKEN = os.getenv('BOT_TOKEN', '')  # vérifié au démarrage (main.py), pas à l'import
+
+# Serveur Bot API local (optionnel, ex: http://localhost:8081)
+LOCAL_BOT_API_URL = os.getenv('LOCAL_BOT_API_URL', '').rstrip('/')
+LOCAL_MODE = bool(LOCAL_BOT_API_URL)
+
+# Réception des mises à jour: 'polling' ou 'webhook'
+BOT_MODE = os.getenv('BOT_MODE', 'polling').lower()
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')  # URL publique (ex: https://bot.example.com/telegram)
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8443))
+WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN', '')  # généré au démarrage si vide
+# Retirer le webhook à l'arrêt (false si plusieurs instances partagent le webhook)
+WEBHOOK_DELETE_ON_SHUTDOWN = os.getenv('WEBHOOK_DELETE_ON_SHUTDOWN', 'true').lower() in ('1', 'true', 'yes')
 
 # Configuration des téléchargements
 DOWNLOAD_PATH = "downloads"
-MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB (limite Telegram)
+if LOCAL_MODE:
+    MAX_FILE_SIZE = 2000 * 1024 * 1024  # 2GB (limite du serveur Bot API local)
+else:
+    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB (limite Telegram)
+MAX_FILE_SIZE_MB = MAX_FILE_SIZE // (1024 * 1024)
 SUPPORTED_FORMATS = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
 
+# Configuration du pool de téléchargement
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', os.cpu_count() or 4))
+DOWNLOAD_EXECUTOR = os.getenv('DOWNLOAD_EXECUTOR', 'thread')  # 'thread' ou 'process'
+
+# Post-traitement ffmpeg (remux MP4 +faststart, réencodage optionnel)
+POSTPROCESS_WORKERS = int(os.getenv('POSTPROCESS_WORKERS', os.cpu_count() or 2))
+POSTPROCESS_EXECUTOR = os.getenv('POSTPROCESS_EXECUTOR', 'process')  # 'thread' ou 'process'
+TRANSCODE_OVERSIZED = os.getenv('TRANSCODE_OVERSIZED', 'false').lower() in ('1', 'true', 'yes')
+TRANSCODE_AUDIO_BITRATE = int(os.getenv('TRANSCODE_AUDIO_BITRATE', 128))  # kbit/s
+TRANSCODE_MAX_INPUT_RATIO = float(os.getenv('TRANSCODE_MAX_INPUT_RATIO', 2))  # taille téléchargeable / MAX_FILE_SIZE
+
+# Découpage sans réencodage des vidéos trop volumineuses (envoyées en album)
+SPLIT_OVERSIZED = os.getenv('SPLIT_OVERSIZED', 'false').lower() in ('1', 'true', 'yes')
+SPLIT_MAX_PARTS = int(os.getenv('SPLIT_MAX_PARTS', 10))
+UPLOAD_CONCURRENCY = int(os.getenv('UPLOAD_CONCURRENCY', 3))  # parties envoyées en parallèle
+UPLOAD_STAGING_CHAT_ID = os.getenv('UPLOAD_STAGING_CHAT_ID')  # chat de dépôt des parties (défaut: le chat de l'utilisateur)
+
+# Taille maximale d'un téléchargement (au-delà de MAX_FILE_SIZE si le réencodage ou le découpage est activé)
+DOWNLOAD_MAX_SIZE = int(MAX_FILE_SIZE * max(
+    TRANSCODE_MAX_INPUT_RATIO if TRANSCODE_OVERSIZED else 1,
+    SPLIT_MAX_PARTS if SPLIT_OVERSIZED else 1,
+))
+
+# Configuration de la file d'attente
+MAX_CONCURRENT_DOWNLOADS = int(os.getenv('MAX_CONCURRENT_DOWNLOADS', DOWNLOAD_WORKERS))
+MAX_DOWNLOADS_PER_USER = int(os.getenv('MAX_DOWNLOADS_PER_USER', 1))
+MESSAGE_URL_CONCURRENCY = int(os.getenv('MESSAGE_URL_CONCURRENCY', 4))  # liens d'un même message traités en parallèle
+
+# Playlists: nombre maximal d'éléments (0 = refusées) et éléments préparés d'avance pendant un envoi
+PLAYLIST_MAX_ITEMS = int(os.getenv('PLAYLIST_MAX_ITEMS', 50))
+PLAYLIST_PREFETCH = int(os.getenv('PLAYLIST_PREFETCH', 2))
+
+# Liens sans extracteur dédié acceptés (extracteur générique de yt-dlp) et domaines mémorisés
+ALLOW_GENERIC_EXTRACTOR = os.getenv('ALLOW_GENERIC_EXTRACTOR', 'true').lower() in ('1', 'true', 'yes')
+EXTRACTOR_CACHE_SIZE = int(os.getenv('EXTRACTOR_CACHE_SIZE', 1024))
+
+# Cache des informations extraites (nombre d'entrées, durée de vie en secondes)
+INFO_CACHE_SIZE = int(os.getenv('INFO_CACHE_SIZE', 256))
+INFO_CACHE_TTL = int(os.getenv('INFO_CACHE_TTL', 600))
+
+# Cache persistant des file_id Telegram
+FILE_ID_CACHE_PATH = os.getenv('FILE_ID_CACHE_PATH', 'file_ids.db')
+
+# Espace disque des téléchargements (0 = pas de quota)
+STORAGE_QUOTA = int(os.getenv('STORAGE_QUOTA_MB', 0)) * 1024 * 1024
+STORAGE_MIN_FREE = int(os.getenv('STORAGE_MIN_FREE_MB', 512)) * 1024 * 1024  # espace libre à préserver sur le disque
+STORAGE_WAIT_TIMEOUT = float(os.getenv('STORAGE_WAIT_TIMEOUT', 600))  # attente maximale d'espace libre (secondes)
+STORAGE_SWEEP_INTERVAL = float(os.getenv('STORAGE_SWEEP_INTERVAL', 900))  # nettoyage des fichiers orphelins (secondes)
+STORAGE_ORPHAN_AGE = float(os.getenv('STORAGE_ORPHAN_AGE', 3600))  # âge minimal d'un fichier orphelin (secondes)
+STORAGE_TMPFS_PATH = os.getenv('STORAGE_TMPFS_PATH', '')  # ex: /dev/shm/video-bot (petites tâches en mémoire)
+STORAGE_TMPFS_MAX_JOB_SIZE = int(os.getenv('STORAGE_TMPFS_MAX_JOB_SIZE_MB', 64)) * 1024 * 1024
+
+# Journal des tâches (reprise des téléchargements après un redémarrage)
+JOB_JOURNAL_PATH = os.getenv('JOB_JOURNAL_PATH', 'jobs.db')
+JOB_MAX_RESUMES = int(os.getenv('JOB_MAX_RESUMES', 3))  # reprises maximales d'une même tâche
+
+# File de tâches entre le frontal et les workers: 'local' (tout dans le processus du bot), 'memory' ou 'sqlite'
+JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'local').lower()
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', 'queue.db')
+JOB_LEASE_TIMEOUT = float(os.getenv('JOB_LEASE_TIMEOUT', 60))  # réservation d'une tâche par un worker (secondes)
+
+# Mise à jour des messages de progression (limites de Telegram)
+PROGRESS_MIN_INTERVAL = float(os.getenv('PROGRESS_MIN_INTERVAL', 2))  # secondes entre deux mises à jour d'un message
+PROGRESS_GLOBAL_EDITS_PER_SECOND = float(os.getenv('PROGRESS_GLOBAL_EDITS_PER_SECOND', 20))
+PROGRESS_CHAT_EDITS_PER_MINUTE = float(os.getenv('PROGRESS_CHAT_EDITS_PER_MINUTE', 20))
+
+# Envoi des vidéos en flux (délai maximal sans réponse du serveur, en secondes)
+UPLOAD_READ_TIMEOUT = float(os.getenv('UPLOAD_READ_TIMEOUT', 300))
+
+# Téléchargement direct des liens vers un fichier vidéo (sans extracteur yt-dlp)
+DIRECT_DOWNLOAD_SEGMENTS = int(os.getenv('DIRECT_DOWNLOAD_SEGMENTS', 4))  # segments Range parallèles
+DIRECT_MIN_SEGMENT_SIZE = int(os.getenv('DIRECT_MIN_SEGMENT_SIZE', 4 * 1024 * 1024))
+DIRECT_CHUNK_SIZE = 256 * 1024
+DIRECT_MAX_CONNECTIONS = int(os.getenv('DIRECT_MAX_CONNECTIONS', 64))
+DIRECT_MAX_CONNECTIONS_PER_HOST = int(os.getenv('DIRECT_MAX_CONNECTIONS_PER_HOST', 8))
+
+# Fragments HLS/DASH téléchargés en parallèle par yt-dlp
+FRAGMENT_CONCURRENCY = int(os.getenv('FRAGMENT_CONCURRENCY', 4))
+
 # Configuration des messages
 MESSAGES = {
     'welcome': "🎬 Bienvenue au Bot de Téléchargement de Vidéos!\n\n"
                "Envoyez-moi un lien vers une vidéo et je la téléchargerai pour vous.\n"
                "Exemple: https://video.sibnet.ru/v/eb43c140e5f90c18644eb7b06981656e/4942633.mp4",
     'processing': "⏳ Traitement en cours...",
+    'queued': "🕒 En file d'attente (position {position})...",
     'downloading': "📥 Téléchargement en cours...",
     'uploading': "📤 Envoi en cours...",
     'success': "✅ Vidéo envoyée avec succès!",
     'error': "❌ Erreur lors du traitement de la vidéo",
     'invalid_url': "❌ Lien invalide ou non supporté",
-    'file_too_large': "❌ Le fichier est trop volumineux (max 50MB)",
+    'file_too_large': f"❌ Le fichier est trop volumineux (max {MAX_FILE_SIZE_MB}MB)",
+    'splitting': "✂️ Découpage de la vidéo en parties...",
+    'no_space': "💾 Espace disque insuffisant pour le moment, veuillez réessayer plus tard.",
+    'waiting_worker': "🕒 En attente d'un worker...",
+    'playlist_disabled': "❌ Les playlists ne sont pas prises en charge",
     'not_found': "❌ Vidéo non trouvée"
 } 
\ No newline at end of file
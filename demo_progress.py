@@ -12,6 +12,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from video_downloader import VideoDownloader
+from progress import DownloadProgress
 
 def simulate_progress():
     """Simule une progression de téléchargement pour démontrer les fonctionnalités"""
@@ -19,30 +20,34 @@ def simulate_progress():
     print("=" * 60)
     
     downloader = VideoDownloader()
-    user_id = 12345  # ID utilisateur fictif
+    job_id = 12345  # ID de tâche fictif
+    total_bytes = int(25.5 * 1024 * 1024)
     
-    # Simuler les données de progression
+    # Progression de la tâche, alimentée comme le ferait le hook yt-dlp
+    progress = DownloadProgress(job_id)
+    downloader.download_progress[job_id] = progress
+    
+    # Simuler les données de progression (pourcentage, vitesse en MB/s, temps restant)
     progress_data = [
-        {'percentage': 0, 'downloaded_mb': 0, 'total_mb': 25.5, 'speed_mb': 0, 'eta': 'Calcul...'},
-        {'percentage': 5, 'downloaded_mb': 1.3, 'total_mb': 25.5, 'speed_mb': 2.1, 'eta': '12m 30s'},
-        {'percentage': 15, 'downloaded_mb': 3.8, 'total_mb': 25.5, 'speed_mb': 2.5, 'eta': '8m 45s'},
-        {'percentage': 30, 'downloaded_mb': 7.7, 'total_mb': 25.5, 'speed_mb': 2.8, 'eta': '6m 20s'},
-        {'percentage': 50, 'downloaded_mb': 12.8, 'total_mb': 25.5, 'speed_mb': 3.1, 'eta': '4m 10s'},
-        {'percentage': 70, 'downloaded_mb': 17.9, 'total_mb': 25.5, 'speed_mb': 3.3, 'eta': '2m 25s'},
-        {'percentage': 85, 'downloaded_mb': 21.7, 'total_mb': 25.5, 'speed_mb': 3.5, 'eta': '1m 8s'},
-        {'percentage': 95, 'downloaded_mb': 24.2, 'total_mb': 25.5, 'speed_mb': 3.2, 'eta': '0m 25s'},
-        {'percentage': 100, 'downloaded_mb': 25.5, 'total_mb': 25.5, 'speed_mb': 0, 'eta': 'Terminé'},
+        (0, 0, None), (5, 2.1, 750), (15, 2.5, 525), (30, 2.8, 380), (50, 3.1, 250),
+        (70, 3.3, 145), (85, 3.5, 68), (95, 3.2, 25), (100, 0, 0),
     ]
     
     print("📥 Simulation d'un téléchargement de 25.5 MB")
     print("⏳ Démarrage de la simulation...\n")
     
-    for i, data in enumerate(progress_data):
-        # Stocker les données de progression
-        downloader.download_progress[user_id] = data
+    for i, (percentage, speed_mb, eta) in enumerate(progress_data):
+        # Transmettre les données de progression au hook
+        progress({
+            'status': 'downloading',
+            'downloaded_bytes': int(total_bytes * percentage / 100),
+            'total_bytes': total_bytes,
+            'speed': speed_mb * 1024 * 1024,
+            'eta': eta,
+        })
         
         # Afficher le message formaté
-        message = downloader.format_progress_message(user_id)
+        message = downloader.format_progress_message(job_id)
         print(f"🔄 Étape {i+1}/{len(progress_data)}:")
         print(message)
         print("-" * 60)
@@ -51,6 +56,8 @@ def simulate_progress():
         if i < len(progress_data) - 1:
             time.sleep(1)
     
+    del downloader.download_progress[job_id]
+    
     print("✅ Simulation terminée !")
     print("\n📋 Fonctionnalités démontrées:")
     print("• 📊 Barre de progression visuelle")
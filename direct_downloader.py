@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+from urllib.parse import urlsplit, unquote
+
+from config import (
+    DIRECT_DOWNLOAD_SEGMENTS, DIRECT_MIN_SEGMENT_SIZE, DIRECT_CHUNK_SIZE,
+    DIRECT_MAX_CONNECTIONS, DIRECT_MAX_CONNECTIONS_PER_HOST,
+)
+from size_guard import SizeGuard
+from url_utils import is_direct_media_url
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class NotDirectMediaError(Exception):
+    """L'URL ne pointe pas directement vers un fichier vidéo (un extracteur est nécessaire)"""
+
+
+class DirectDownloader:
+    """
+    Téléchargement asynchrone des liens directs vers un fichier vidéo
+
+    Utilise une session aiohttp partagée: la taille est sondée par HEAD (ou
+    une requête Range), puis le fichier est récupéré en plusieurs segments
+    parallèles écrits au fil de l'eau sur le disque quand le serveur accepte
+    les requêtes Range. Le nombre de connexions simultanées est plafonné au
+    total et par hôte, tous téléchargements confondus.
+
+    L'avancement des segments est enregistré à côté du fichier partiel: un
+    téléchargement interrompu reprend là où il s'était arrêté.
+    """
+
+    STATE_INTERVAL = 1.0  # secondes entre deux enregistrements de l'avancement
+
+    def __init__(self, segments: int = DIRECT_DOWNLOAD_SEGMENTS, min_segment_size: int = DIRECT_MIN_SEGMENT_SIZE,
+                 chunk_size: int = DIRECT_CHUNK_SIZE, max_connections: int = DIRECT_MAX_CONNECTIONS,
+                 max_connections_per_host: int = DIRECT_MAX_CONNECTIONS_PER_HOST):
+        self.segments = max(1, segments)
+        self.min_segment_size = min_segment_size
+        self.chunk_size = chunk_size
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self._session: Optional['aiohttp.ClientSession'] = None
+
+    @staticmethod
+    def is_direct_url(url: str) -> bool:
+        """Indique si l'URL désigne un fichier vidéo par son extension"""
+        return is_direct_media_url(url)
+
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """Retourne la session HTTP partagée (aiohttp n'est chargé qu'au premier lien direct)"""
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections_per_host)
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def probe(self, url: str) -> Tuple[Optional[int], bool, str]:
+        """
+        Sonde la taille du fichier et le support des requêtes Range
+
+        Returns:
+            (taille ou None, Range accepté, URL finale après redirections)
+        """
+        session = await self._get_session()
+        async with session.head(url, allow_redirects=True) as response:
+            if response.status < 400:
+                self._check_content_type(response)
+                size = response.content_length
+                accepts_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                return size, accepts_ranges, str(response.url)
+
+        # Certains serveurs refusent HEAD: demander le premier octet
+        async with session.get(url, headers={'Range': 'bytes=0-0'}, allow_redirects=True) as response:
+            if response.status >= 400:
+                raise NotDirectMediaError(f"HTTP {response.status}")
+            self._check_content_type(response)
+            content_range = response.headers.get('Content-Range', '')
+            match = re.match(r'bytes \d+-\d+/(\d+)', content_range)
+            if response.status == 206 and match:
+                return int(match.group(1)), True, str(response.url)
+            return response.content_length, False, str(response.url)
+
+    @staticmethod
+    def _check_content_type(response: 'aiohttp.ClientResponse'):
+        content_type = response.headers.get('Content-Type', '').lower()
+        if content_type.startswith(('text/', 'application/json', 'application/xml')):
+            raise NotDirectMediaError(f"Contenu non vidéo: {content_type}")
+
+    async def download(self, url: str, dest_dir: str, max_size: int, progress: Optional[Callable] = None,
+                       probed: Optional[Tuple[Optional[int], bool, str]] = None) -> str:
+        """
+        Télécharge un fichier vidéo direct
+
+        Args:
+            url: Lien direct vers le fichier
+            dest_dir: Dossier de destination (dossier de travail de la tâche)
+            max_size: Taille maximale en octets
+            progress: Hook de progression (même format que yt-dlp)
+            probed: Résultat de probe() s'il est déjà connu
+
+        Returns:
+            Le chemin du fichier téléchargé
+
+        Raises:
+            NotDirectMediaError: si le lien ne renvoie pas un fichier vidéo
+            FileTooLargeError: si le fichier dépasse max_size
+        """
+        size, accepts_ranges, final_url = probed or await self.probe(url)
+        guard = SizeGuard(max_size)
+        guard.check(0, size)
+
+        file_name = unquote(os.path.basename(urlsplit(final_url).path)) or 'video.mp4'
+        file_name = re.sub(r'[\\/:*?"<>|]', '_', file_name)[:150]
+        path = os.path.join(dest_dir, file_name)
+        part_path = path + '.part'
+        state_path = part_path + '.state'
+        ranged = bool(size and accepts_ranges)
+
+        # Reprendre un téléchargement interrompu (segments déjà reçus) si possible
+        segments = self._load_state(state_path, part_path, size) if ranged else None
+        resumed = segments is not None
+        if not resumed:
+            segments = [[0, None, 0]]
+            if ranged:
+                segment_count = max(1, min(self.segments, size // self.min_segment_size))
+                segments = [
+                    [i * size // segment_count, (i + 1) * size // segment_count - 1, i * size // segment_count]
+                    for i in range(segment_count)
+                ]
+
+        downloaded = sum(offset - start for start, _, offset in segments) if resumed else 0
+        completed_segments = sum(1 for _, end, offset in segments if end is not None and offset > end)
+        saved_at = time.monotonic()
+
+        def report(segment: list, count: int):
+            nonlocal downloaded, saved_at
+            segment[2] += count
+            downloaded += count
+            guard.check(downloaded, size)
+            if ranged and time.monotonic() - saved_at >= self.STATE_INTERVAL:
+                self._save_state(state_path, size, segments)
+                saved_at = time.monotonic()
+            if progress:
+                progress({
+                    'status': 'downloading', 'downloaded_bytes': downloaded, 'total_bytes': size,
+                    'fragment_index': completed_segments, 'fragment_count': len(segments),
+                })
+
+        async def fetch(segment: list):
+            nonlocal completed_segments
+            start, end, offset = segment
+            if end is not None and offset > end:
+                return
+            await self._fetch_segment(final_url, part_path, offset if ranged else None, end,
+                                      lambda count: report(segment, count))
+            completed_segments += 1
+
+        if resumed:
+            logger.info(f"Reprise du téléchargement direct: {final_url} ({downloaded / 1024 / 1024:.2f} MB déjà reçus)")
+        else:
+            logger.info(f"Téléchargement direct: {final_url} ({(size or 0) / 1024 / 1024:.2f} MB, {len(segments)} segment(s))")
+
+        try:
+            if ranged and not resumed:
+                # Préallouer le fichier: chaque segment est écrit à sa position
+                with open(part_path, 'wb') as f:
+                    f.truncate(size)
+            tasks = [asyncio.create_task(fetch(segment)) for segment in segments]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # Premier échec ou arrêt: interrompre les autres segments avant tout nettoyage
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            os.replace(part_path, path)
+        except asyncio.CancelledError:
+            # Arrêt du bot: conserver le fichier partiel pour une reprise
+            if ranged and os.path.exists(part_path):
+                self._save_state(state_path, size, segments)
+            raise
+        except BaseException:
+            for leftover in (part_path, state_path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            raise
+
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        if progress:
+            progress({'status': 'finished', 'downloaded_bytes': downloaded, 'total_bytes': downloaded, 'filename': path})
+        return path
+
+    @staticmethod
+    def _load_state(state_path: str, part_path: str, size: int) -> Optional[List[list]]:
+        """Relit l'avancement des segments d'un téléchargement interrompu"""
+        if not (os.path.exists(state_path) and os.path.exists(part_path)):
+            return None
+        try:
+            with open(state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('size') != size or os.path.getsize(part_path) != size:
+            return None
+        return state['segments']
+
+    @staticmethod
+    def _save_state(state_path: str, size: int, segments: List[list]):
+        """Enregistre l'avancement des segments (écriture atomique)"""
+        tmp_path = state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'size': size, 'segments': segments}, f)
+        os.replace(tmp_path, state_path)
+
+    async def _fetch_segment(self, url: str, part_path: str, start: Optional[int], end: Optional[int],
+                             report: Callable[[int], None]):
+        """Télécharge une plage d'octets (ou tout le fichier) et l'écrit à sa position"""
+        session = await self._get_session()
+        headers = {'Range': f'bytes={start}-{end}'} if start is not None else {}
+
+        async with session.get(url, headers=headers) as response:
+            if start is not None and response.status != 206:
+                raise NotDirectMediaError(f"Requête Range refusée (HTTP {response.status})")
+            response.raise_for_status()
+
+            # Écriture non tamponnée (les octets comptés sont bien sur le disque), dans un
+            # thread: les segments parallèles ne bloquent pas la boucle asyncio
+            f = await asyncio.to_thread(open, part_path, 'r+b' if start is not None else 'wb', buffering=0)
+            try:
+                if start is not None:
+                    f.seek(start)
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    await asyncio.to_thread(f.write, chunk)
+                    report(len(chunk))
+            finally:
+                f.close()
+
+    async def close(self):
+        """Ferme la session HTTP"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import DOWNLOAD_WORKERS, DOWNLOAD_EXECUTOR
+
+logger = logging.getLogger(__name__)
+
+# Clés des dicts de progression yt-dlp transmises entre processus
+# ('info_dict' est volumineux et pas toujours sérialisable)
+_PROGRESS_KEYS = (
+    'status', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate',
+    'speed', 'eta', 'elapsed', 'filename', 'tmpfilename',
+    'fragment_index', 'fragment_count',
+)
+
+
+class _QueueProgressReporter:
+    """Hook de progression sérialisable qui renvoie les mises à jour vers le processus parent"""
+
+    def __init__(self, progress_queue, job_id: int):
+        self.progress_queue = progress_queue
+        self.job_id = job_id
+
+    def __call__(self, d: Dict[str, Any]):
+        payload = {key: d.get(key) for key in _PROGRESS_KEYS if key in d}
+        try:
+            self.progress_queue.put_nowait((self.job_id, payload))
+        except Exception:
+            pass
+
+
+class DownloadExecutor:
+    """
+    Pool de travailleurs pour les tâches bloquantes (yt-dlp)
+
+    Les tâches sont exécutées dans un pool de threads ou de processus et
+    leurs résultats sont renvoyés à la boucle asyncio sous forme de futures.
+    En mode processus, la progression transite par une file partagée.
+    """
+
+    def __init__(self, max_workers: int = DOWNLOAD_WORKERS, mode: str = DOWNLOAD_EXECUTOR, name: str = 'download'):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Mode d'exécution inconnu: {mode}")
+
+        self.max_workers = max(1, max_workers)
+        self.mode = mode
+        self.name = name  # Nom du pool (journaux et noms des threads)
+        self._pool = None
+        self._manager = None
+        self._progress_queue = None
+        self._progress_thread = None
+        self._progress_callbacks: Dict[int, Callable] = {}
+        self._next_job_id = 0
+        self._lock = threading.Lock()
+        self.pending = 0  # Tâches en attente d'un travailleur
+        self.running = 0  # Tâches en cours d'exécution
+
+    def _ensure_pool(self):
+        """Crée le pool à la première utilisation"""
+        if self._pool is not None:
+            return
+
+        if self.mode == 'process':
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._manager = multiprocessing.Manager()
+            self._progress_queue = self._manager.Queue()
+            self._progress_thread = threading.Thread(
+                target=self._pump_progress, name=f"{self.name}-progress", daemon=True
+            )
+            self._progress_thread.start()
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+
+        logger.info(f"Pool {self.name} démarré: {self.max_workers} travailleurs ({self.mode})")
+
+    def _pump_progress(self):
+        """Relaie la progression des processus travailleurs vers les callbacks"""
+        while True:
+            try:
+                item = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+
+            job_id, payload = item
+            callback = self._progress_callbacks.get(job_id)
+            if callback:
+                try:
+                    callback(payload)
+                except Exception as e:
+                    logger.error(f"Erreur dans le callback de progression: {e}")
+
+    def _make_progress_hook(self, job_id: int, progress: Optional[Callable]) -> Optional[Callable]:
+        """Adapte le callback de progression au mode d'exécution"""
+        if progress is None:
+            return None
+        if self.mode == 'process':
+            self._progress_callbacks[job_id] = progress
+            return _QueueProgressReporter(self._progress_queue, job_id)
+        return progress
+
+    def _track(self, fn: Callable, *args, **kwargs):
+        """Enveloppe une tâche pour suivre son passage de la file au travailleur"""
+        with self._lock:
+            self.pending -= 1
+            self.running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def submit(self, fn: Callable, *args, progress: Optional[Callable] = None, **kwargs) -> Any:
+        """
+        Soumet une tâche bloquante au pool et attend son résultat
+
+        Args:
+            fn: Fonction à exécuter (au niveau module en mode processus)
+            progress: Callback de progression, passé à fn via l'argument 'progress'
+
+        Returns:
+            Le résultat de fn
+        """
+        self._ensure_pool()
+
+        with self._lock:
+            self._next_job_id += 1
+            job_id = self._next_job_id
+            self.pending += 1
+
+        hook = self._make_progress_hook(job_id, progress)
+        if hook is not None:
+            kwargs['progress'] = hook
+
+        try:
+            if self.mode == 'process':
+                # Les compteurs ne traversent pas la frontière des processus
+                with self._lock:
+                    self.pending -= 1
+                    self.running += 1
+                future = self._pool.submit(fn, *args, **kwargs)
+            else:
+                future = self._pool.submit(self._track, fn, *args, **kwargs)
+            return await asyncio.wrap_future(future)
+        finally:
+            if self.mode == 'process':
+                with self._lock:
+                    self.running -= 1
+            self._progress_callbacks.pop(job_id, None)
+
+    def shutdown(self, wait: bool = True):
+        """Arrête le pool et le relais de progression"""
+        if self._pool is None:
+            return
+
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        if self._progress_queue is not None:
+            try:
+                self._progress_queue.put(None)
+            except Exception:
+                pass
+        if self._manager is not None:
+            self._manager.shutdown()
+
+        self._pool = None
+        self._manager = None
+        self._progress_queue = None
+        logger.info(f"Pool {self.name} arrêté")
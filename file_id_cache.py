@@ -0,0 +1,98 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import FILE_ID_CACHE_PATH
+from url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class FileIdCache:
+    """
+    Cache persistant des file_id Telegram
+
+    Associe une URL canonique et un format au file_id renvoyé par le premier
+    envoi, pour répondre aux liens déjà traités sans télécharger ni renvoyer
+    le fichier.
+    """
+
+    def __init__(self, db_path: str = FILE_ID_CACHE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_ids ("
+            " url TEXT NOT NULL,"
+            " format TEXT NOT NULL,"
+            " file_id TEXT NOT NULL,"
+            " file_name TEXT,"
+            " file_size INTEGER,"
+            " created_at REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (url, format))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, url: str, format_spec: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'entrée en cache (file_id, nom, taille) ou None"""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_id, file_name, file_size FROM file_ids WHERE url = ? AND format = ?",
+                (key, format_spec)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE file_ids SET hits = hits + 1 WHERE url = ? AND format = ?",
+                (key, format_spec)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return {'file_id': row[0], 'name': row[1], 'size': row[2]}
+
+    def put(self, url: str, format_spec: str, file_id: str, file_name: str = None, file_size: int = None):
+        """Enregistre le file_id obtenu après un envoi"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_ids (url, format, file_id, file_name, file_size, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), format_spec, file_id, file_name, file_size, time.time())
+            )
+            self._conn.commit()
+
+    def invalidate(self, url: str, format_spec: str):
+        """Supprime une entrée rejetée par Telegram"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM file_ids WHERE url = ? AND format = ?",
+                (normalize_url(url), format_spec)
+            )
+            self._conn.commit()
+            self.invalidations += 1
+        logger.info(f"file_id invalidé pour {url}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du cache"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM file_ids").fetchone()[0]
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
+
+    def close(self):
+        """Ferme la base de données"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,121 @@
+import logging
+import shutil
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marge de sécurité sur les tailles estimées (débit moyen, conteneur)
+SIZE_MARGIN = 0.95
+
+
+class FormatChoice:
+    """Format retenu pour un téléchargement"""
+
+    __slots__ = ('format_id', 'estimated_size', 'height', 'tbr', 'reason')
+
+    def __init__(self, format_id: str, estimated_size: Optional[int], height: int, tbr: float, reason: str):
+        self.format_id = format_id
+        self.estimated_size = estimated_size
+        self.height = height
+        self.tbr = tbr
+        self.reason = reason
+
+    def __repr__(self):
+        return f"FormatChoice({self.format_id!r}, ~{(self.estimated_size or 0) / 1024 / 1024:.1f} MB, {self.height}p)"
+
+
+def estimate_size(fmt: Dict[str, Any], duration: Optional[float]) -> Optional[int]:
+    """Estime la taille d'un format (filesize, filesize_approx ou débit × durée)"""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    tbr = fmt.get('tbr') or ((fmt.get('vbr') or 0) + (fmt.get('abr') or 0))
+    if tbr and duration:
+        return int(tbr * 1000 / 8 * duration)
+    return None
+
+
+def _has_video(fmt: Dict[str, Any]) -> bool:
+    # Un codec absent est inconnu: yt-dlp le considère alors comme présent
+    return fmt.get('vcodec') != 'none'
+
+
+def _has_audio(fmt: Dict[str, Any]) -> bool:
+    return fmt.get('acodec') != 'none'
+
+
+def _candidates(info: Dict[str, Any], allow_merge: bool) -> List[Dict[str, Any]]:
+    """Liste les combinaisons vidéo+audio possibles avec leur taille estimée"""
+    duration = info.get('duration')
+    formats = [f for f in info.get('formats') or [] if f.get('format_id')]
+    candidates = []
+
+    for fmt in formats:
+        if _has_video(fmt) and _has_audio(fmt):
+            candidates.append({
+                'format_id': fmt['format_id'],
+                'size': estimate_size(fmt, duration),
+                'height': fmt.get('height') or 0,
+                'tbr': fmt.get('tbr') or 0,
+                'merged': False,
+            })
+
+    if allow_merge:
+        videos = [f for f in formats if _has_video(f) and not _has_audio(f)]
+        audios = [f for f in formats if _has_audio(f) and not _has_video(f)]
+        for video in videos:
+            for audio in audios:
+                video_size = estimate_size(video, duration)
+                audio_size = estimate_size(audio, duration)
+                candidates.append({
+                    'format_id': f"{video['format_id']}+{audio['format_id']}",
+                    'size': video_size + audio_size if video_size and audio_size else None,
+                    'height': video.get('height') or 0,
+                    'tbr': (video.get('tbr') or 0) + (audio.get('tbr') or 0),
+                    'merged': True,
+                })
+
+    return candidates
+
+
+def select_format(info: Dict[str, Any], max_size: int, allow_merge: Optional[bool] = None) -> Optional[FormatChoice]:
+    """
+    Choisit le meilleur format vidéo+audio qui tient dans la taille maximale
+
+    Args:
+        info: Informations extraites par yt-dlp (une seule extraction)
+        max_size: Taille maximale en octets
+        allow_merge: Autoriser la fusion de flux séparés (par défaut si ffmpeg est installé)
+
+    Returns:
+        Le format choisi, ou None si aucune estimation n'est possible
+        (le sélecteur générique de yt-dlp est alors utilisé)
+    """
+    if allow_merge is None:
+        allow_merge = shutil.which('ffmpeg') is not None
+
+    candidates = _candidates(info, allow_merge)
+    sized = [c for c in candidates if c['size']]
+    if not sized:
+        return None
+
+    budget = max_size * SIZE_MARGIN
+    fitting = [c for c in sized if c['size'] <= budget]
+    if not fitting:
+        smallest = min(sized, key=lambda c: c['size'])
+        logger.info(
+            f"Aucun format sous {max_size / 1024 / 1024:.0f} MB "
+            f"(le plus petit: {smallest['format_id']} ~{smallest['size'] / 1024 / 1024:.1f} MB)"
+        )
+        return FormatChoice(smallest['format_id'], smallest['size'], smallest['height'], smallest['tbr'],
+                            "aucun format ne respecte la taille maximale")
+
+    # Meilleure qualité: résolution, puis débit; à égalité, un flux unique plutôt qu'une fusion
+    best = max(fitting, key=lambda c: (c['height'], c['tbr'], not c['merged']))
+    reason = (
+        f"{best['height']}p, ~{best['size'] / 1024 / 1024:.1f} MB sur {max_size / 1024 / 1024:.0f} MB, "
+        f"{len(fitting)}/{len(candidates)} formats compatibles"
+        + (", flux fusionnés" if best['merged'] else "")
+    )
+    logger.info(f"Format choisi: {best['format_id']} ({reason})")
+    return FormatChoice(best['format_id'], best['size'], best['height'], best['tbr'], reason)
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class InFlightJob:
+    """Téléchargement en cours partagé par toutes les demandes du même lien"""
+
+    def __init__(self, key: str, job_id: int):
+        self.key = key
+        self.job_id = job_id  # Tâche qui exécute le téléchargement (clé de progression)
+        self.subscribers = 0
+        self._future = asyncio.get_running_loop().create_future()
+
+    @property
+    def done(self) -> bool:
+        return self._future.done()
+
+    def resolve(self, result: Optional[Dict[str, Any]]):
+        """Publie le résultat de l'envoi (file_id, nom, taille) ou None en cas d'échec"""
+        if not self._future.done():
+            self._future.set_result(result)
+
+    async def wait(self) -> Optional[Dict[str, Any]]:
+        """Attend le résultat du téléchargement partagé"""
+        return await asyncio.shield(self._future)
+
+
+class InFlightRegistry:
+    """
+    Registre des téléchargements en cours par lien canonique
+
+    La première demande d'un lien exécute le téléchargement; les demandes
+    suivantes s'y abonnent et reçoivent le même résultat.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, InFlightJob] = {}
+
+    def join(self, key: str, job_id: int) -> Tuple[InFlightJob, bool]:
+        """
+        Rejoint le téléchargement en cours pour un lien ou en crée un
+
+        Returns:
+            Le téléchargement partagé et True si l'appelant doit l'exécuter
+        """
+        job = self._jobs.get(key)
+        if job is not None and not job.done:
+            job.subscribers += 1
+            logger.info(f"Demande regroupée avec le téléchargement en cours: {key} ({job.subscribers} abonnés)")
+            return job, False
+
+        job = InFlightJob(key, job_id)
+        self._jobs[key] = job
+        return job, True
+
+    def finish(self, job: InFlightJob, result: Optional[Dict[str, Any]] = None):
+        """Termine un téléchargement et notifie les abonnés"""
+        job.resolve(result)
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
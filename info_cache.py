@@ -0,0 +1,70 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import INFO_CACHE_SIZE, INFO_CACHE_TTL
+from url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class InfoCache:
+    """
+    Cache LRU avec expiration des informations extraites par yt-dlp
+
+    Évite de relancer l'extracteur (et ses requêtes réseau) pour un lien
+    déjà vu récemment. L'expiration protège contre les URLs de formats
+    signées qui finissent par expirer.
+    """
+
+    def __init__(self, max_entries: int = INFO_CACHE_SIZE, ttl: float = INFO_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Retourne les informations en cache pour une URL, ou None"""
+        if self.max_entries <= 0:
+            return None
+
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, info = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return info
+
+    def put(self, url: str, info: Dict[str, Any]):
+        """Ajoute les informations d'une URL au cache"""
+        if self.max_entries <= 0 or not info:
+            return
+
+        key = normalize_url(url)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, info)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url: str):
+        """Retire une URL du cache"""
+        with self._lock:
+            self._entries.pop(normalize_url(url), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
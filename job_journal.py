@@ -0,0 +1,108 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import JOB_JOURNAL_PATH
+
+logger = logging.getLogger(__name__)
+
+# Colonnes modifiables après la création d'une tâche
+_UPDATABLE = ('format_id', 'job_dir', 'file_path', 'status', 'attempts')
+
+
+class JobJournal:
+    """
+    Journal persistant des tâches en cours
+
+    Chaque tâche y est inscrite avant son téléchargement (URL, chat, format
+    choisi, dossier de travail) puis retirée une fois traitée. Les tâches
+    encore présentes au démarrage ont été interrompues et peuvent être
+    reprises à partir de leurs fichiers partiels. Les workers qui partagent
+    un journal y inscrivent leur identifiant (owner) avec chaque tâche.
+    """
+
+    def __init__(self, db_path: str = JOB_JOURNAL_PATH, owner: Optional[str] = None):
+        self.db_path = db_path
+        self.owner = owner
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id INTEGER PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " chat_id INTEGER NOT NULL,"
+            " user_id INTEGER,"
+            " format_spec TEXT,"
+            " format_id TEXT,"
+            " job_dir TEXT,"
+            " file_path TEXT,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        # Journal créé par une version sans propriétaire des tâches
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if 'owner' not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._conn.commit()
+
+    def last_job_id(self) -> int:
+        """Retourne le plus grand identifiant de tâche enregistré (0 si aucun)"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(job_id) FROM jobs").fetchone()
+        return row[0] or 0
+
+    def create(self, job_id: int, url: str, chat_id: int, user_id: int = None, format_spec: str = None):
+        """Inscrit une nouvelle tâche avant son téléchargement"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs"
+                " (job_id, url, chat_id, user_id, format_spec, status, owner, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, url, chat_id, user_id, format_spec, self.owner, now, now)
+            )
+            self._conn.commit()
+
+    def update(self, job_id: int, **fields: Any):
+        """Met à jour l'état d'une tâche (format choisi, dossier, fichier, statut)"""
+        unknown = set(fields) - set(_UPDATABLE)
+        if unknown:
+            raise ValueError(f"Colonnes inconnues: {', '.join(sorted(unknown))}")
+        if not fields:
+            return
+
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+                (*fields.values(), time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Retourne une tâche ou None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Liste les tâches interrompues, dans leur ordre d'arrivée"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY job_id").fetchall()
+        return [dict(row) for row in rows]
+
+    def remove(self, job_id: int):
+        """Retire une tâche terminée (ou abandonnée)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def close(self):
+        """Ferme la base de données"""
+        with self._lock:
+            self._conn.close()
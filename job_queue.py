@@ -0,0 +1,306 @@
+import abc
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import JOB_QUEUE_BACKEND, JOB_QUEUE_PATH, JOB_LEASE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# (numéro d'ordre, tâche, événement)
+Event = Tuple[int, int, Dict[str, Any]]
+
+
+class JobQueue(abc.ABC):
+    """
+    File de tâches entre le frontal et les workers de téléchargement
+
+    Le frontal dépose les tâches (put) et lit les événements publiés par
+    les workers (events): textes de statut puis résultat final. Un worker
+    réserve une tâche (claim) pour une durée limitée qu'il prolonge tant
+    qu'il y travaille (heartbeat); une tâche dont le worker a disparu est
+    de nouveau proposée à l'expiration de sa réservation.
+    """
+
+    def __init__(self, lease: float = JOB_LEASE_TIMEOUT):
+        self.lease = lease
+
+    @abc.abstractmethod
+    async def put(self, job: Dict[str, Any]):
+        """Dépose une tâche (dict avec au moins job_id)"""
+
+    @abc.abstractmethod
+    async def claim(self, worker_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Réserve la prochaine tâche disponible (None si aucune dans le délai)"""
+
+    @abc.abstractmethod
+    async def heartbeat(self, job_id: int, worker_id: str):
+        """Prolonge la réservation d'une tâche"""
+
+    @abc.abstractmethod
+    async def publish(self, job_id: int, event: Dict[str, Any]):
+        """Publie un événement de la tâche vers le frontal"""
+
+    @abc.abstractmethod
+    async def complete(self, job_id: int, result: Optional[Dict[str, Any]]):
+        """Termine une tâche et publie son résultat (None en cas d'échec)"""
+
+    @abc.abstractmethod
+    async def events(self, after: int, timeout: float) -> List[Event]:
+        """Événements publiés après le numéro donné (attend au plus timeout)"""
+
+    @abc.abstractmethod
+    async def purge(self, job_id: int):
+        """Oublie les événements d'une tâche dont le résultat a été traité"""
+
+    @abc.abstractmethod
+    async def pending(self) -> List[Dict[str, Any]]:
+        """Tâches non terminées (en attente ou réservées)"""
+
+    @abc.abstractmethod
+    async def next_job_id(self, after: int = 0) -> int:
+        """Nouvel identifiant de tâche, unique pour tous les processus de la file et supérieur à after"""
+
+    async def close(self):
+        """Libère les ressources de la file"""
+
+
+class MemoryJobQueue(JobQueue):
+    """File en mémoire: frontal et workers dans le même processus (tests)"""
+
+    def __init__(self, lease: float = JOB_LEASE_TIMEOUT):
+        super().__init__(lease)
+        self._jobs: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()  # job_id -> tâche et réservation
+        self._events: List[Event] = []
+        self._seq = itertools.count(1)
+        self._last_job_id = 0
+        self._changed: Optional[asyncio.Event] = None
+
+    def _signal(self):
+        if self._changed is not None:
+            self._changed.set()
+
+    async def _wait(self, deadline: float) -> bool:
+        """Attend un changement jusqu'à l'échéance (False si elle est dépassée)"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        self._changed.clear()
+        try:
+            await asyncio.wait_for(self._changed.wait(), remaining)
+        except asyncio.TimeoutError:
+            pass
+        return True
+
+    async def put(self, job: Dict[str, Any]):
+        self._jobs[job['job_id']] = {'job': dict(job), 'worker': None, 'lease_until': 0.0}
+        self._signal()
+
+    async def claim(self, worker_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            for entry in self._jobs.values():
+                if entry['worker'] is None or entry['lease_until'] < now:
+                    entry['worker'] = worker_id
+                    entry['lease_until'] = now + self.lease
+                    return dict(entry['job'])
+            # Réveil au plus tard à la première réservation expirée
+            expiries = [entry['lease_until'] for entry in self._jobs.values()]
+            if not await self._wait(min([deadline] + expiries)) and time.monotonic() >= deadline:
+                return None
+
+    async def heartbeat(self, job_id: int, worker_id: str):
+        entry = self._jobs.get(job_id)
+        if entry is not None and entry['worker'] == worker_id:
+            entry['lease_until'] = time.monotonic() + self.lease
+
+    async def publish(self, job_id: int, event: Dict[str, Any]):
+        self._events.append((next(self._seq), job_id, event))
+        self._signal()
+
+    async def complete(self, job_id: int, result: Optional[Dict[str, Any]]):
+        self._jobs.pop(job_id, None)
+        await self.publish(job_id, {'type': 'result', 'result': result})
+
+    async def events(self, after: int, timeout: float) -> List[Event]:
+        deadline = time.monotonic() + timeout
+        while True:
+            found = [event for event in self._events if event[0] > after]
+            if found or not await self._wait(deadline):
+                return found
+
+    async def purge(self, job_id: int):
+        self._events = [event for event in self._events if event[1] != job_id]
+
+    async def pending(self) -> List[Dict[str, Any]]:
+        return [dict(entry['job']) for entry in self._jobs.values()]
+
+    async def next_job_id(self, after: int = 0) -> int:
+        self._last_job_id = max(self._last_job_id, after) + 1
+        return self._last_job_id
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    File persistante dans une base SQLite partagée
+
+    Le frontal et les workers d'un même hôte (ou d'un système de fichiers
+    partagé qui gère les verrous) ouvrent la même base. Les tâches survivent
+    à un redémarrage du frontal comme des workers.
+    """
+
+    POLL_INTERVAL = 0.5  # secondes entre deux lectures de la base pendant une attente
+
+    def __init__(self, db_path: str = JOB_QUEUE_PATH, lease: float = JOB_LEASE_TIMEOUT):
+        super().__init__(lease)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queue ("
+            " job_id INTEGER PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " worker TEXT,"
+            " lease_until REAL NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " job_id INTEGER NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+        # Dernier identifiant attribué, partagé par le frontal et les workers
+        self._conn.execute("CREATE TABLE IF NOT EXISTS job_ids (last_id INTEGER NOT NULL)")
+        self._conn.execute("INSERT INTO job_ids (last_id) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM job_ids)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _claim_now(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        # Les réservations sont datées en temps réel: elles sont comparées entre processus
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id, payload FROM queue WHERE worker IS NULL OR lease_until < ?"
+                    " ORDER BY job_id LIMIT 1", (now,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE queue SET worker = ?, lease_until = ? WHERE job_id = ?",
+                        (worker_id, now + self.lease, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return json.loads(row[1]) if row else None
+
+    def _complete_now(self, job_id: int, result: Optional[Dict[str, Any]]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM queue WHERE job_id = ?", (job_id,))
+                self._conn.execute(
+                    "INSERT INTO events (job_id, payload) VALUES (?, ?)",
+                    (job_id, json.dumps({'type': 'result', 'result': result}))
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _next_job_id_now(self, after: int) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("UPDATE job_ids SET last_id = MAX(last_id, ?) + 1", (after,))
+                (job_id,) = self._conn.execute("SELECT last_id FROM job_ids").fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    async def put(self, job: Dict[str, Any]):
+        await asyncio.to_thread(
+            self._execute, "INSERT OR REPLACE INTO queue (job_id, payload, created_at) VALUES (?, ?, ?)",
+            (job['job_id'], json.dumps(job), time.time())
+        )
+
+    async def claim(self, worker_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(self._claim_now, worker_id)
+            remaining = deadline - time.monotonic()
+            if job is not None or remaining <= 0:
+                return job
+            await asyncio.sleep(min(remaining, self.POLL_INTERVAL))
+
+    async def heartbeat(self, job_id: int, worker_id: str):
+        await asyncio.to_thread(
+            self._execute, "UPDATE queue SET lease_until = ? WHERE job_id = ? AND worker = ?",
+            (time.time() + self.lease, job_id, worker_id)
+        )
+
+    async def publish(self, job_id: int, event: Dict[str, Any]):
+        await asyncio.to_thread(
+            self._execute, "INSERT INTO events (job_id, payload) VALUES (?, ?)", (job_id, json.dumps(event))
+        )
+
+    async def complete(self, job_id: int, result: Optional[Dict[str, Any]]):
+        await asyncio.to_thread(self._complete_now, job_id, result)
+
+    async def events(self, after: int, timeout: float) -> List[Event]:
+        deadline = time.monotonic() + timeout
+        while True:
+            rows = await asyncio.to_thread(
+                self._execute, "SELECT seq, job_id, payload FROM events WHERE seq > ? ORDER BY seq", (after,)
+            )
+            remaining = deadline - time.monotonic()
+            if rows or remaining <= 0:
+                return [(seq, job_id, json.loads(payload)) for seq, job_id, payload in rows]
+            await asyncio.sleep(min(remaining, self.POLL_INTERVAL))
+
+    async def purge(self, job_id: int):
+        await asyncio.to_thread(self._execute, "DELETE FROM events WHERE job_id = ?", (job_id,))
+
+    async def pending(self) -> List[Dict[str, Any]]:
+        rows = await asyncio.to_thread(self._execute, "SELECT payload FROM queue ORDER BY job_id")
+        return [json.loads(payload) for (payload,) in rows]
+
+    async def next_job_id(self, after: int = 0) -> int:
+        return await asyncio.to_thread(self._next_job_id_now, after)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_queue(backend: str = JOB_QUEUE_BACKEND, db_path: str = JOB_QUEUE_PATH) -> Optional[JobQueue]:
+    """
+    Crée la file de tâches configurée
+
+    Returns:
+        La file, ou None en mode 'local' (téléchargements dans le processus du bot)
+    """
+    if backend == 'local':
+        return None
+    if backend == 'memory':
+        return MemoryJobQueue()
+    if backend == 'sqlite':
+        return SQLiteJobQueue(db_path)
+    raise ValueError(f"File de tâches inconnue: {backend} (local, memory ou sqlite)")
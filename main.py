@@ -3,6 +3,7 @@
 Bot Telegram pour le téléchargement et l'envoi de vidéos
 """
 
+import argparse
 import asyncio
 import logging
 import sys
@@ -12,10 +13,29 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from telegram_bot import VideoUploaderBot
-from config import BOT_TOKEN
+from job_queue import MemoryJobQueue, create_job_queue
+from worker import run_worker
+from config import BOT_TOKEN, BOT_MODE, WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_SECRET_TOKEN
+
+def parse_args(argv=None):
+    """Options de la ligne de commande (par défaut celles de la configuration)"""
+    parser = argparse.ArgumentParser(description="Bot Telegram de téléchargement de vidéos")
+    parser.add_argument('--mode', choices=('polling', 'webhook'), default=BOT_MODE,
+                        help="Réception des mises à jour (défaut: %(default)s)")
+    parser.add_argument('--webhook-url', default=WEBHOOK_URL, help="URL publique du webhook")
+    parser.add_argument('--listen', default=WEBHOOK_LISTEN, help="Adresse d'écoute du webhook (défaut: %(default)s)")
+    parser.add_argument('--port', type=int, default=WEBHOOK_PORT, help="Port d'écoute du webhook (défaut: %(default)s)")
+    parser.add_argument('--secret-token', default=WEBHOOK_SECRET_TOKEN,
+                        help="Jeton secret exigé dans les requêtes du webhook (généré si absent)")
+    parser.add_argument('--worker', action='store_true',
+                        help="Lancer un worker de téléchargement (file partagée JOB_QUEUE_BACKEND=sqlite)")
+    parser.add_argument('--worker-id', default=None, help="Identifiant du worker (défaut: hôte et PID)")
+    return parser.parse_args(argv)
 
 def main():
     """Fonction principale"""
+    args = parse_args()
+    
     # Configuration du logging
     logging.basicConfig(
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -38,9 +58,18 @@ def main():
         print("✅ Modules importés")
         print("🚀 Démarrage du bot...")
         
+        if args.worker:
+            # Worker de téléchargement: prend ses tâches dans la file partagée avec le frontal
+            queue = create_job_queue()
+            if queue is None or isinstance(queue, MemoryJobQueue):
+                raise ValueError("Un worker nécessite une file partagée (JOB_QUEUE_BACKEND=sqlite)")
+            print("🛠️ Démarrage du worker...")
+            asyncio.run(run_worker(queue, args.worker_id))
+            return
+        
         # Créer et lancer le bot
         bot = VideoUploaderBot()
-        bot.run()
+        bot.run(args.mode, args.webhook_url, args.listen, args.port, args.secret_token)
         
     except KeyboardInterrupt:
         logger.info("Arrêt du bot (Ctrl+C)")
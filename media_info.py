@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import shutil
+import subprocess
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Miniature acceptée par Telegram: JPEG, 320 px de côté au plus, moins de 200 KB
+THUMBNAIL_SIZE = 320
+THUMBNAIL_MAX_BYTES = 200 * 1024
+
+
+def metadata_from_info(info: Optional[Dict[str, Any]], format_id: Optional[str] = None) -> Dict[str, Any]:
+    """Durée et dimensions tirées des informations yt-dlp (format téléchargé si connu)"""
+    if not info:
+        return {}
+
+    source = info
+    if format_id:
+        # Format fusionné (vidéo+audio): les dimensions sont celles du flux vidéo
+        video_id = format_id.split('+')[0]
+        source = next((f for f in info.get('formats') or [] if f.get('format_id') == video_id), info)
+
+    return {
+        'duration': int(info['duration']) if info.get('duration') else None,
+        'width': source.get('width'),
+        'height': source.get('height'),
+    }
+
+
+def _ffprobe(path: str) -> Dict[str, Any]:
+    """Durée et dimensions du premier flux vidéo (ffprobe)"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+         '-show_entries', 'stream=width,height:format=duration', '-of', 'json', path],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {}
+
+    data = json.loads(result.stdout or '{}')
+    stream = (data.get('streams') or [{}])[0]
+    duration = (data.get('format') or {}).get('duration')
+    return {
+        'duration': int(float(duration)) if duration else None,
+        'width': stream.get('width'),
+        'height': stream.get('height'),
+    }
+
+
+def _make_thumbnail(path: str, duration: Optional[int]) -> Optional[str]:
+    """Extrait une image de la vidéo en JPEG réduit (ffmpeg)"""
+    thumbnail = f"{os.path.splitext(path)[0]}.thumb.jpg"
+    position = min(1.0, duration / 2) if duration else 0
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-ss', str(position), '-i', path,
+         '-frames:v', '1', '-vf',
+         f'scale={THUMBNAIL_SIZE}:{THUMBNAIL_SIZE}:force_original_aspect_ratio=decrease',
+         '-q:v', '5', thumbnail],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0 or not os.path.exists(thumbnail):
+        return None
+    if os.path.getsize(thumbnail) > THUMBNAIL_MAX_BYTES:
+        os.remove(thumbnail)
+        return None
+    return thumbnail
+
+
+def probe_video(path: str, info: Optional[Dict[str, Any]] = None, format_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Prépare les paramètres de sendVideo (de façon bloquante, dans un travailleur du pool)
+
+    Les dimensions et la durée sont lues par ffprobe, ou à défaut dans les
+    informations yt-dlp déjà connues. Une miniature JPEG est générée si
+    ffmpeg est disponible.
+
+    Returns:
+        duration, width, height, supports_streaming et thumbnail (chemin ou None)
+    """
+    metadata = {}
+    if shutil.which('ffprobe') is not None:
+        try:
+            metadata = _ffprobe(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Échec de ffprobe pour {path}: {e}")
+
+    # Compléter avec les informations de l'extracteur
+    for key, value in metadata_from_info(info, format_id).items():
+        if not metadata.get(key):
+            metadata[key] = value
+
+    metadata['supports_streaming'] = path.lower().endswith('.mp4')
+    metadata['thumbnail'] = None
+    if shutil.which('ffmpeg') is not None:
+        metadata['thumbnail'] = _make_thumbnail(path, metadata.get('duration'))
+
+    logger.info(
+        f"Métadonnées: {metadata.get('width')}x{metadata.get('height')}, {metadata.get('duration')}s, "
+        f"miniature {'oui' if metadata['thumbnail'] else 'non'}"
+    )
+    return metadata
@@ -0,0 +1,248 @@
+import glob
+import logging
+import math
+import os
+import shutil
+import struct
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from config import (
+    MAX_FILE_SIZE, POSTPROCESS_WORKERS, POSTPROCESS_EXECUTOR, TRANSCODE_OVERSIZED, TRANSCODE_AUDIO_BITRATE,
+    TRANSCODE_MAX_INPUT_RATIO, SPLIT_MAX_PARTS,
+)
+from download_executor import DownloadExecutor
+from media_info import probe_video
+
+logger = logging.getLogger(__name__)
+
+# Marge sur le débit cible (conteneur, dépassements de l'encodeur)
+BITRATE_MARGIN = 0.92
+# En dessous de ce débit vidéo (kbit/s), le réencodage n'a plus d'intérêt
+MIN_VIDEO_BITRATE = 150
+# Taille des parties visée sous la limite (les coupes tombent sur l'image clé suivante)
+SPLIT_MARGIN = 0.85
+SPLIT_ATTEMPTS = 3
+
+
+def is_faststart(path: str) -> bool:
+    """Indique si un MP4 a son index (moov) avant les données (mdat)"""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return False
+                size, box_type = struct.unpack('>I4s', header)
+                if box_type == b'moov':
+                    return True
+                if box_type == b'mdat':
+                    return False
+                if size == 1:
+                    size = struct.unpack('>Q', f.read(8))[0]
+                    f.seek(size - 16, os.SEEK_CUR)
+                elif size == 0:
+                    return False
+                else:
+                    f.seek(size - 8, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return False
+
+
+def target_video_bitrate(duration: float, max_size: int, audio_bitrate: int = TRANSCODE_AUDIO_BITRATE) -> Optional[int]:
+    """
+    Calcule le débit vidéo (kbit/s) qui fait tenir la vidéo dans max_size
+
+    Returns:
+        Le débit vidéo, ou None si la durée est inconnue ou le budget trop faible
+    """
+    if not duration or duration <= 0:
+        return None
+    total = max_size * 8 / 1000 / duration * BITRATE_MARGIN
+    video = int(total - audio_bitrate)
+    return video if video >= MIN_VIDEO_BITRATE else None
+
+
+def _probe_duration(path: str) -> Optional[float]:
+    """Durée de la vidéo en secondes (ffprobe)"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=nw=1:nk=1', path],
+        capture_output=True, text=True
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def _run_ffmpeg(args: list, output: str) -> bool:
+    """Exécute ffmpeg et supprime la sortie incomplète en cas d'échec"""
+    result = subprocess.run(['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', *args, output],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.error(f"Échec de ffmpeg: {result.stderr.strip()[-500:]}")
+        if os.path.exists(output):
+            os.remove(output)
+        return False
+    return True
+
+
+def _should_transcode(size: int, max_size: int, transcode: bool) -> bool:
+    """Réencodage des fichiers légèrement trop volumineux (les autres sont découpés)"""
+    return transcode and max_size < size <= max_size * TRANSCODE_MAX_INPUT_RATIO
+
+
+def postprocess_video(path: str, max_size: int = MAX_FILE_SIZE, transcode: bool = TRANSCODE_OVERSIZED,
+                      audio_bitrate: int = TRANSCODE_AUDIO_BITRATE) -> str:
+    """
+    Prépare une vidéo pour Telegram (de façon bloquante, dans un travailleur du pool)
+
+    - remux en MP4 avec +faststart (copie des flux) si le fichier n'est pas
+      un MP4 lisible en streaming;
+    - réencodage au débit qui tient dans max_size si le fichier dépasse
+      légèrement la limite (TRANSCODE_MAX_INPUT_RATIO) et que le réencodage
+      est activé.
+
+    Returns:
+        Le chemin du fichier à envoyer (l'original est supprimé s'il a été remplacé)
+    """
+    if shutil.which('ffmpeg') is None:
+        logger.warning("ffmpeg introuvable: fichier envoyé sans post-traitement")
+        return path
+
+    base, ext = os.path.splitext(path)
+    output = f"{base}.processed.mp4"
+    size = os.path.getsize(path)
+
+    if _should_transcode(size, max_size, transcode):
+        duration = _probe_duration(path)
+        bitrate = target_video_bitrate(duration, max_size, audio_bitrate)
+        if bitrate is None:
+            logger.warning(f"Réencodage impossible pour {path} (durée {duration}s)")
+            return path
+        logger.info(f"Réencodage de {path} à {bitrate} kbit/s ({size / 1024 / 1024:.1f} MB)")
+        ok = _run_ffmpeg([
+            '-i', path, '-c:v', 'libx264', '-preset', 'veryfast',
+            '-b:v', f'{bitrate}k', '-maxrate', f'{bitrate}k', '-bufsize', f'{bitrate * 2}k',
+            '-c:a', 'aac', '-b:a', f'{audio_bitrate}k', '-movflags', '+faststart',
+        ], output)
+    elif ext.lower() != '.mp4' or not is_faststart(path):
+        logger.info(f"Remux en MP4 +faststart: {path}")
+        ok = _run_ffmpeg(['-i', path, '-map', '0', '-c', 'copy', '-movflags', '+faststart'], output)
+    else:
+        return path
+
+    if not ok:
+        return path
+
+    # Remplacer l'original par la version traitée
+    final_path = f"{base}.mp4"
+    os.remove(path)
+    os.replace(output, final_path)
+    logger.info(f"Post-traitement terminé: {final_path} ({os.path.getsize(final_path) / 1024 / 1024:.2f} MB)")
+    return final_path
+
+
+def split_video(path: str, max_size: int = MAX_FILE_SIZE, max_parts: int = SPLIT_MAX_PARTS) -> List[str]:
+    """
+    Découpe une vidéo en parties MP4 sous max_size (de façon bloquante, dans un travailleur du pool)
+
+    Le découpage se fait par copie des flux (segment muxer de ffmpeg): les
+    coupes tombent sur des images clés et rien n'est réencodé. Si une
+    partie dépasse malgré tout la limite, le découpage est refait plus fin.
+
+    Returns:
+        Les chemins des parties dans l'ordre (l'original est supprimé), ou une
+        liste vide si le découpage est impossible
+    """
+    if shutil.which('ffmpeg') is None or shutil.which('ffprobe') is None:
+        logger.warning("ffmpeg introuvable: découpage impossible")
+        return []
+
+    size = os.path.getsize(path)
+    duration = _probe_duration(path)
+    if not duration:
+        logger.warning(f"Durée inconnue, découpage impossible: {path}")
+        return []
+
+    base = os.path.splitext(path)[0]
+    part_count = min(max_parts, max(2, math.ceil(size / (max_size * SPLIT_MARGIN))))
+    for _ in range(SPLIT_ATTEMPTS):
+        segment_time = max(1.0, duration / part_count)
+        ok = _run_ffmpeg([
+            '-i', path, '-map', '0', '-c', 'copy', '-f', 'segment',
+            '-segment_time', f'{segment_time:.3f}', '-reset_timestamps', '1',
+            '-segment_format', 'mp4', '-segment_format_options', 'movflags=+faststart',
+        ], f"{base}.%03d.mp4")
+        parts = sorted(glob.glob(glob.escape(base) + '.[0-9][0-9][0-9].mp4'))
+
+        if ok and parts and len(parts) <= max_parts and all(os.path.getsize(p) <= max_size for p in parts):
+            os.remove(path)
+            logger.info(f"Vidéo découpée en {len(parts)} parties: {path}")
+            return parts
+
+        for part in parts:
+            os.remove(part)
+        if not ok or part_count >= max_parts:
+            break
+        # Images clés trop espacées: viser des parties plus courtes
+        part_count = min(max_parts, math.ceil(part_count / 0.75))
+
+    logger.warning(f"Découpage impossible sous {max_size / 1024 / 1024:.0f} MB en {max_parts} parties: {path}")
+    return []
+
+
+class PostProcessor:
+    """
+    Étape de post-traitement ffmpeg après le téléchargement
+
+    Les conversions tournent dans leur propre pool (un travailleur par cœur
+    par défaut) avec leur propre file: elles ne retiennent ni les places de
+    téléchargement ni la boucle asyncio.
+    """
+
+    def __init__(self, executor: Optional[DownloadExecutor] = None, transcode: bool = TRANSCODE_OVERSIZED):
+        self.executor = executor or DownloadExecutor(POSTPROCESS_WORKERS, POSTPROCESS_EXECUTOR, name='postprocess')
+        self.transcode = transcode
+
+    def needs_processing(self, path: str, max_size: int = MAX_FILE_SIZE) -> bool:
+        """Indique (sans lancer ffmpeg) si le fichier sera converti"""
+        if shutil.which('ffmpeg') is None:
+            return False
+        if _should_transcode(os.path.getsize(path), max_size, self.transcode):
+            return True
+        return not path.lower().endswith('.mp4') or not is_faststart(path)
+
+    @property
+    def queued_count(self) -> int:
+        """Conversions en attente ou en cours"""
+        return self.executor.pending + self.executor.running
+
+    async def process(self, path: str, max_size: int = MAX_FILE_SIZE) -> str:
+        """Post-traite un fichier téléchargé et retourne le chemin à envoyer"""
+        try:
+            return await self.executor.submit(postprocess_video, path, max_size, self.transcode)
+        except Exception as e:
+            logger.error(f"Erreur lors du post-traitement de {path}: {e}")
+            return path
+
+    async def split(self, path: str, max_size: int = MAX_FILE_SIZE) -> List[str]:
+        """Découpe une vidéo trop volumineuse en parties (liste vide en cas d'échec)"""
+        try:
+            return await self.executor.submit(split_video, path, max_size)
+        except Exception as e:
+            logger.error(f"Erreur lors du découpage de {path}: {e}")
+            return []
+
+    async def probe(self, path: str, info: Optional[Dict[str, Any]] = None,
+                    format_id: Optional[str] = None) -> Dict[str, Any]:
+        """Métadonnées et miniature pour sendVideo (vide en cas d'échec)"""
+        try:
+            return await self.executor.submit(probe_video, path, info, format_id)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse de {path}: {e}")
+            return {}
+
+    def shutdown(self):
+        """Arrête le pool de post-traitement"""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,83 @@
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class DownloadProgress:
+    """
+    Progression d'un téléchargement (une instance par tâche)
+
+    L'instance sert directement de hook de progression yt-dlp. Les derniers
+    échantillons sont conservés dans un tampon circulaire pour lisser la
+    vitesse et le temps restant. Pour les flux fragmentés (HLS/DASH) ou
+    segmentés, les octets sont cumulés sur l'ensemble des fragments
+    téléchargés en parallèle: la vitesse est donc le débit agrégé.
+    """
+
+    __slots__ = (
+        'job_id', 'status', 'downloaded_bytes', 'total_bytes',
+        'reported_speed', 'reported_eta', 'fragment_index', 'fragment_count', 'updated_at', '_samples',
+    )
+
+    SAMPLE_COUNT = 8
+
+    def __init__(self, job_id: Any):
+        self.job_id = job_id
+        self.status = 'pending'
+        self.downloaded_bytes = 0
+        self.total_bytes = 0
+        self.reported_speed = None
+        self.reported_eta = None
+        self.fragment_index = None
+        self.fragment_count = None
+        self.updated_at = None
+        self._samples = deque(maxlen=self.SAMPLE_COUNT)
+
+    def __call__(self, d: Dict[str, Any]):
+        self.update(d)
+
+    def update(self, d: Dict[str, Any]):
+        """Met à jour la progression à partir d'un dict de hook yt-dlp"""
+        status = d.get('status')
+        if status:
+            self.status = status
+        if status not in (None, 'downloading'):
+            return
+
+        now = time.monotonic()
+        self.downloaded_bytes = d.get('downloaded_bytes') or 0
+        self.total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+        self.reported_speed = d.get('speed')
+        self.reported_eta = d.get('eta')
+        self.fragment_index = d.get('fragment_index')
+        self.fragment_count = d.get('fragment_count')
+        self.updated_at = now
+        self._samples.append((now, self.downloaded_bytes))
+
+    @property
+    def started(self) -> bool:
+        return self.updated_at is not None
+
+    @property
+    def percentage(self) -> float:
+        if self.total_bytes <= 0:
+            return 0.0
+        return min(100.0, self.downloaded_bytes / self.total_bytes * 100)
+
+    @property
+    def speed(self) -> float:
+        """Vitesse lissée en octets par seconde"""
+        if len(self._samples) >= 2:
+            (first_time, first_bytes), (last_time, last_bytes) = self._samples[0], self._samples[-1]
+            elapsed = last_time - first_time
+            if elapsed > 0 and last_bytes >= first_bytes:
+                return (last_bytes - first_bytes) / elapsed
+        return self.reported_speed or 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Temps restant estimé en secondes"""
+        speed = self.speed
+        if speed > 0 and self.total_bytes > self.downloaded_bytes:
+            return (self.total_bytes - self.downloaded_bytes) / speed
+        return self.reported_eta
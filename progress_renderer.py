@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, RetryAfter
+
+from config import PROGRESS_MIN_INTERVAL, PROGRESS_GLOBAL_EDITS_PER_SECOND, PROGRESS_CHAT_EDITS_PER_MINUTE
+
+logger = logging.getLogger(__name__)
+
+
+class _TokenBucket:
+    """Seau à jetons pour limiter un débit d'appels"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def try_consume(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class _TrackedMessage:
+    """Message de progression suivi par le moteur de rendu"""
+
+    __slots__ = ('message', 'render', 'chat_id', 'last_text', 'next_at', 'pending')
+
+    def __init__(self, message, render: Callable[[], str]):
+        self.message = message
+        self.render = render
+        self.chat_id = message.chat_id
+        self.last_text = None
+        self.next_at = 0.0
+        self.pending: Optional[asyncio.Task] = None
+
+
+class ProgressRenderer:
+    """
+    Moteur de rendu unique pour tous les messages de progression
+
+    Une seule tâche parcourt les messages suivis et ne les modifie que si
+    le texte a changé, en respectant un budget global et un budget par chat.
+    L'intervalle entre deux modifications s'allonge avec le nombre de
+    tâches actives, et les erreurs RetryAfter suspendent les envois le
+    temps demandé par Telegram. Les messages locaux (attribut local, ex:
+    une ligne d'un statut agrégé) ne consomment aucun budget.
+    """
+
+    TICK = 0.25
+
+    def __init__(self, min_interval: float = PROGRESS_MIN_INTERVAL,
+                 global_rate: float = PROGRESS_GLOBAL_EDITS_PER_SECOND,
+                 chat_rate_per_minute: float = PROGRESS_CHAT_EDITS_PER_MINUTE):
+        self.min_interval = min_interval
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate_per_minute / 60
+        self._entries: Dict[Any, _TrackedMessage] = {}
+        self._global_bucket = _TokenBucket(global_rate, global_rate)
+        self._chat_buckets: Dict[int, _TokenBucket] = {}
+        self._chat_blocked_until: Dict[int, float] = {}
+        self._blocked_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.edits = 0
+        self.skipped = 0
+
+    @property
+    def interval(self) -> float:
+        """Intervalle entre deux modifications d'un même message"""
+        return max(self.min_interval, len(self._entries) / self.global_rate)
+
+    def track(self, key: Any, message, render: Callable[[], str]):
+        """Confie un message de progression au moteur de rendu"""
+        self._entries[key] = _TrackedMessage(message, render)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def untrack(self, key: Any):
+        """Retire un message et attend la fin de sa modification en cours"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        if entry.pending and not entry.pending.done():
+            try:
+                await entry.pending
+            except Exception:
+                pass
+
+        # Oublier les budgets des chats qui n'ont plus de message suivi
+        if not any(other.chat_id == entry.chat_id for other in self._entries.values()):
+            self._chat_buckets.pop(entry.chat_id, None)
+            if self._chat_blocked_until.get(entry.chat_id, 0) <= time.monotonic():
+                self._chat_blocked_until.pop(entry.chat_id, None)
+
+    async def _run(self):
+        """Boucle principale du moteur de rendu"""
+        while self._entries:
+            now = time.monotonic()
+            if now >= self._blocked_until:
+                for entry in list(self._entries.values()):
+                    if entry.pending and not entry.pending.done():
+                        continue
+                    if now < entry.next_at or now < self._chat_blocked_until.get(entry.chat_id, 0):
+                        continue
+
+                    try:
+                        text = entry.render()
+                    except Exception as e:
+                        logger.error(f"Erreur lors du rendu de la progression: {e}")
+                        continue
+
+                    if text == entry.last_text:
+                        self.skipped += 1
+                        entry.next_at = now + self.interval
+                        continue
+
+                    if getattr(entry.message, 'local', False):
+                        # Pas d'appel à Telegram: aucun budget à respecter
+                        entry.next_at = now + self.interval
+                        entry.pending = asyncio.create_task(self._edit(entry, text))
+                        continue
+
+                    if not self._chat_bucket(entry.chat_id).try_consume(now):
+                        continue
+                    if not self._global_bucket.try_consume(now):
+                        break
+
+                    entry.next_at = now + self.interval
+                    entry.pending = asyncio.create_task(self._edit(entry, text))
+
+            await asyncio.sleep(self.TICK)
+
+    def _chat_bucket(self, chat_id: int) -> _TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = _TokenBucket(self.chat_rate, 1)
+        return bucket
+
+    async def _edit(self, entry: _TrackedMessage, text: str):
+        """Modifie un message en gérant les limites de Telegram"""
+        try:
+            await entry.message.edit_text(text, parse_mode=ParseMode.HTML)
+            entry.last_text = text
+            self.edits += 1
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if hasattr(retry_after, 'total_seconds'):
+                retry_after = retry_after.total_seconds()
+            until = time.monotonic() + float(retry_after)
+            logger.warning(f"Limite Telegram atteinte, pause de {retry_after}s")
+            self._chat_blocked_until[entry.chat_id] = until
+            self._blocked_until = max(self._blocked_until, until)
+        except BadRequest as e:
+            if 'not modified' in str(e).lower():
+                entry.last_text = text
+            else:
+                logger.error(f"Erreur lors de la mise à jour de progression: {e}")
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour de progression: {e}")
+
+    async def stop(self):
+        """Arrête le moteur de rendu"""
+        self._entries.clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+from config import MAX_CONCURRENT_DOWNLOADS, MAX_DOWNLOADS_PER_USER
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadTicket:
+    """Place d'un téléchargement dans la file du planificateur"""
+
+    def __init__(self, scheduler: 'DownloadScheduler', user_id: int, allowance: Optional[int] = None):
+        self.scheduler = scheduler
+        self.user_id = user_id
+        # Téléchargements simultanés permis à l'utilisateur quand ce ticket est en tête de sa file
+        self.allowance = max(scheduler.max_per_user, allowance or 0)
+        self.granted = False
+        self.released = False
+        self._event = asyncio.Event()
+
+    @property
+    def position(self) -> int:
+        """Position estimée dans la file (0 si le téléchargement a démarré)"""
+        return self.scheduler.position(self)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend que le téléchargement soit autorisé à démarrer
+
+        Returns:
+            True si autorisé, False si le délai a expiré
+        """
+        if self.granted:
+            return True
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def release(self):
+        """Libère la place (ou quitte la file si le téléchargement n'a pas démarré)"""
+        self.scheduler.release(self)
+
+    async def __aenter__(self):
+        await self.wait()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class DownloadScheduler:
+    """
+    Planificateur de téléchargements avec file d'attente équitable
+
+    Limite le nombre de téléchargements simultanés (globalement et par
+    utilisateur) et sert les utilisateurs en tourniquet pour qu'un seul
+    utilisateur ne puisse pas monopoliser le pool.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_DOWNLOADS, max_per_user: int = MAX_DOWNLOADS_PER_USER):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_user = max(1, max_per_user)
+        self._waiting: 'OrderedDict[int, deque]' = OrderedDict()  # Ordre du tourniquet
+        self._running: Dict[int, int] = {}
+        self.running_count = 0
+
+    @property
+    def queued_count(self) -> int:
+        """Nombre de téléchargements en attente"""
+        return sum(len(queue) for queue in self._waiting.values())
+
+    def enqueue(self, user_id: int, allowance: Optional[int] = None) -> DownloadTicket:
+        """
+        Ajoute un téléchargement à la file et tente de le démarrer
+        
+        Args:
+            allowance: Téléchargements simultanés permis à l'utilisateur pour
+                celui-ci, s'il en faut plus que max_per_user (liens d'un même
+                message); la limite globale reste appliquée
+        """
+        ticket = DownloadTicket(self, user_id, allowance)
+        self._waiting.setdefault(user_id, deque()).append(ticket)
+        self._dispatch()
+        if not ticket.granted:
+            logger.info(f"Téléchargement de {user_id} en file (position {ticket.position})")
+        return ticket
+
+    def release(self, ticket: DownloadTicket):
+        """Libère la place d'un ticket et démarre les suivants"""
+        if ticket.released:
+            return
+        ticket.released = True
+
+        if ticket.granted:
+            self.running_count -= 1
+            remaining = self._running.get(ticket.user_id, 1) - 1
+            if remaining > 0:
+                self._running[ticket.user_id] = remaining
+            else:
+                self._running.pop(ticket.user_id, None)
+        else:
+            queue = self._waiting.get(ticket.user_id)
+            if queue is not None:
+                try:
+                    queue.remove(ticket)
+                except ValueError:
+                    pass
+                if not queue:
+                    del self._waiting[ticket.user_id]
+
+        self._dispatch()
+
+    def _dispatch(self):
+        """Démarre des téléchargements tant que les limites le permettent"""
+        while self.running_count < self.max_concurrent:
+            for user_id, queue in self._waiting.items():
+                if self._running.get(user_id, 0) < queue[0].allowance:
+                    break
+            else:
+                return
+
+            queue = self._waiting.pop(user_id)
+            ticket = queue.popleft()
+            if queue:
+                # L'utilisateur repasse en fin de tourniquet
+                self._waiting[user_id] = queue
+
+            ticket.granted = True
+            ticket._event.set()
+            self._running[user_id] = self._running.get(user_id, 0) + 1
+            self.running_count += 1
+
+    def position(self, ticket: DownloadTicket) -> int:
+        """Calcule la position d'un ticket selon l'ordre du tourniquet"""
+        if ticket.granted or ticket.released:
+            return 0
+
+        queue = self._waiting.get(ticket.user_id)
+        if queue is None or ticket not in queue:
+            return 0
+
+        # Les utilisateurs placés avant dans le tourniquet passent un tour de plus
+        rank = queue.index(ticket)
+        position = 0
+        before = True
+        for user_queue in self._waiting.values():
+            position += min(len(user_queue), rank + 1 if before else rank)
+            if user_queue is queue:
+                before = False
+        return position
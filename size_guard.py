@@ -0,0 +1,58 @@
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# Tolérance appliquée aux tailles estimées (total_bytes_estimate), moins fiables
+ESTIMATE_TOLERANCE = 1.2
+
+
+class FileTooLargeError(Exception):
+    """Le fichier dépasse la taille maximale autorisée"""
+
+    def __init__(self, size: int, max_size: int):
+        super().__init__(size, max_size)
+        self.size = size
+        self.max_size = max_size
+
+    def __str__(self):
+        return (
+            f"Fichier trop volumineux: {self.size / 1024 / 1024:.2f} MB "
+            f"(max {self.max_size / 1024 / 1024:.0f} MB)"
+        )
+
+
+class SizeGuard:
+    """
+    Garde-fou de taille branché sur les hooks de progression
+
+    Interrompt le transfert (en levant FileTooLargeError) dès que les octets
+    reçus ou la taille annoncée dépassent le budget. Les flux téléchargés
+    séparément (vidéo puis audio) sont additionnés.
+    """
+
+    __slots__ = ('max_size', 'completed_bytes')
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.completed_bytes = 0
+
+    def __call__(self, d: Dict[str, Any]):
+        status = d.get('status')
+        downloaded = d.get('downloaded_bytes') or 0
+
+        if status == 'finished':
+            self.completed_bytes += d.get('total_bytes') or downloaded
+            self.check(0)
+        elif status == 'downloading':
+            self.check(downloaded, d.get('total_bytes'), d.get('total_bytes_estimate'))
+
+    def check(self, downloaded: int, total: int = None, estimate: int = None):
+        """Vérifie les octets du flux en cours (et ses tailles annoncées)"""
+        done = self.completed_bytes + downloaded
+        if done > self.max_size:
+            raise FileTooLargeError(done, self.max_size)
+        if total and self.completed_bytes + total > self.max_size:
+            raise FileTooLargeError(self.completed_bytes + total, self.max_size)
+        if estimate and self.completed_bytes + estimate > self.max_size * ESTIMATE_TOLERANCE:
+            raise FileTooLargeError(self.completed_bytes + estimate, self.max_size)
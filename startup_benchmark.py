@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Mesure du temps d'import au démarrage du bot (python -X importtime)
+
+Importe le point d'entrée dans un processus neuf, plusieurs fois, et
+compare la médiane au budget suivi ci-dessous. Échoue aussi si un module
+lourd réservé aux téléchargements (yt-dlp, aiohttp) est chargé par le
+frontal: ils doivent l'être à la première utilisation.
+
+    python startup_benchmark.py [--module main] [--runs 5] [--budget 400]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Budget suivi pour l'import du point d'entrée (millisecondes, médiane)
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', 400))
+
+# Modules chargés à la première utilisation, jamais au démarrage du frontal
+DEFERRED_MODULES = ('yt_dlp', 'aiohttp')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """Lignes de -X importtime: (module, temps propre µs, temps cumulé µs, profondeur)"""
+    entries = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return entries
+
+
+def measure_imports(module: str = 'main', runs: int = 5) -> Dict:
+    """
+    Importe un module dans des processus neufs et mesure le temps d'import
+
+    BOT_TOKEN est retiré de l'environnement: l'import ne doit pas en dépendre.
+
+    Returns:
+        median_ms, runs_ms, le détail du dernier import (entries) et les
+        modules différés chargés (deferred)
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = {key: value for key, value in os.environ.items() if key != 'BOT_TOKEN'}
+
+    runs_ms = []
+    entries = []
+    for _ in range(max(1, runs)):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=root, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Import de {module} impossible:\n{result.stderr.strip()[-2000:]}")
+        entries = parse_importtime(result.stderr)
+        total = next((cumulative for name, _, cumulative, depth in entries if name == module and depth == 0), None)
+        if total is None:
+            raise RuntimeError(f"Module {module} absent de la sortie de -X importtime")
+        runs_ms.append(total / 1000)
+
+    deferred = sorted({
+        name.split('.')[0] for name, _, _, _ in entries
+        if name.split('.')[0] in DEFERRED_MODULES
+    })
+    return {
+        'median_ms': statistics.median(runs_ms),
+        'runs_ms': runs_ms,
+        'entries': entries,
+        'deferred': deferred,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Temps d'import au démarrage du bot")
+    parser.add_argument('--module', default='main', help="Module importé (défaut: %(default)s)")
+    parser.add_argument('--runs', type=int, default=5, help="Nombre de mesures (défaut: %(default)s)")
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS,
+                        help="Budget en millisecondes (défaut: %(default)s)")
+    parser.add_argument('--top', type=int, default=10, help="Imports les plus lents affichés (défaut: %(default)s)")
+    args = parser.parse_args(argv)
+
+    report = measure_imports(args.module, args.runs)
+    print(f"⏱️ Import de {args.module}: {report['median_ms']:.1f} ms (médiane de {len(report['runs_ms'])}, "
+          f"budget {args.budget:.0f} ms)")
+    print("   " + ", ".join(f"{ms:.1f}" for ms in report['runs_ms']))
+
+    # Paquets les plus coûteux (temps cumulé, imbrications comprises)
+    top_level = sorted(
+        ((cumulative, name) for name, _, cumulative, _ in report['entries'] if '.' not in name and name != args.module),
+        reverse=True
+    )
+    print("\n📦 Imports les plus lents:")
+    for cumulative, name in top_level[:args.top]:
+        print(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+    ok = True
+    if report['deferred']:
+        print(f"\n❌ Modules chargés au démarrage au lieu de la première utilisation: {', '.join(report['deferred'])}")
+        ok = False
+    if report['median_ms'] > args.budget:
+        print(f"\n❌ Budget dépassé de {report['median_ms'] - args.budget:.1f} ms")
+        ok = False
+    if ok:
+        print("\n✅ Démarrage dans le budget")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
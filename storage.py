@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import (
+    DOWNLOAD_PATH, STORAGE_QUOTA, STORAGE_MIN_FREE, STORAGE_WAIT_TIMEOUT, STORAGE_SWEEP_INTERVAL,
+    STORAGE_ORPHAN_AGE, STORAGE_TMPFS_PATH, STORAGE_TMPFS_MAX_JOB_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientStorageError(Exception):
+    """Pas assez d'espace disque pour admettre la tâche"""
+
+    def __init__(self, needed: int, available: int):
+        super().__init__(needed, available)
+        self.needed = needed
+        self.available = available
+
+    def __str__(self):
+        return (
+            f"Espace disque insuffisant: {self.needed / 1024 / 1024:.1f} MB demandés, "
+            f"{self.available / 1024 / 1024:.1f} MB disponibles"
+        )
+
+
+class StorageManager:
+    """
+    Gestion de l'espace disque des dossiers de travail
+
+    Chaque tâche réserve la taille estimée de sa vidéo avant de recevoir
+    son dossier: la réservation attend qu'il y ait de la place sous le
+    quota et au-dessus du minimum d'espace libre. Les petites tâches
+    peuvent être placées sur un tmpfs. Les dossiers et fichiers partiels
+    orphelins (tâches en échec, arrêt brutal) sont supprimés au démarrage
+    puis périodiquement.
+    """
+
+    POLL_INTERVAL = 5.0  # secondes entre deux vérifications pendant une attente
+
+    def __init__(self, root: str = DOWNLOAD_PATH, quota: int = STORAGE_QUOTA, min_free: int = STORAGE_MIN_FREE,
+                 tmpfs_path: str = STORAGE_TMPFS_PATH, tmpfs_max_job_size: int = STORAGE_TMPFS_MAX_JOB_SIZE,
+                 orphan_age: float = STORAGE_ORPHAN_AGE):
+        self.root = os.path.abspath(root)
+        self.quota = quota
+        self.min_free = min_free
+        self.tmpfs_path = os.path.abspath(tmpfs_path) if tmpfs_path else None
+        self.tmpfs_max_job_size = tmpfs_max_job_size
+        self.orphan_age = orphan_age
+        self._reservations: Dict[str, int] = {}  # dossier de travail -> octets réservés
+        self._active_dirs = set()
+        self._changed: Optional[asyncio.Event] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self.swept_bytes = 0
+
+        for area in self.areas:
+            os.makedirs(area, exist_ok=True)
+
+    @property
+    def areas(self) -> List[str]:
+        """Emplacements des dossiers de travail"""
+        return [self.root] + ([self.tmpfs_path] if self.tmpfs_path else [])
+
+    def is_job_dir(self, path: str) -> bool:
+        """Indique si le chemin est un dossier de travail géré"""
+        return os.path.dirname(os.path.abspath(path)) in self.areas
+
+    def usage(self) -> int:
+        """Octets occupés dans tous les emplacements"""
+        total = 0
+        for area in self.areas:
+            for dir_path, _, file_names in os.walk(area):
+                for file_name in file_names:
+                    try:
+                        total += os.path.getsize(os.path.join(dir_path, file_name))
+                    except OSError:
+                        pass
+        return total
+
+    @property
+    def reserved(self) -> int:
+        """Octets réservés par les téléchargements en cours"""
+        return sum(self._reservations.values())
+
+    async def _usage(self) -> int:
+        """Octets occupés, mesurés dans un thread (parcours complet des dossiers) si un quota est fixé"""
+        return await asyncio.to_thread(self.usage) if self.quota else 0
+
+    def _available(self, area: str, usage: int) -> int:
+        """Octets encore attribuables dans un emplacement (quota et espace libre)"""
+        reserved_here = sum(size for path, size in self._reservations.items() if os.path.dirname(path) == area)
+        available = shutil.disk_usage(area).free - self.min_free - reserved_here
+        if self.quota:
+            available = min(available, self.quota - usage - self.reserved)
+        return available
+
+    def _choose_area(self, estimate: int, usage: int) -> Optional[str]:
+        """Emplacement qui peut accueillir la tâche (tmpfs pour les petites tâches)"""
+        if (self.tmpfs_path and 0 < estimate <= self.tmpfs_max_job_size
+                and self._available(self.tmpfs_path, usage) >= estimate):
+            return self.tmpfs_path
+        if self._available(self.root, usage) >= estimate:
+            return self.root
+        return None
+
+    def _signal(self):
+        """Réveille les tâches en attente d'espace"""
+        if self._changed is not None:
+            self._changed.set()
+
+    async def allocate(self, estimate: Optional[int] = None, timeout: float = STORAGE_WAIT_TIMEOUT) -> str:
+        """
+        Réserve l'espace d'une tâche et crée son dossier de travail
+
+        Args:
+            estimate: Taille estimée de la vidéo (None si inconnue)
+            timeout: Attente maximale de l'espace nécessaire
+
+        Returns:
+            Le chemin du dossier de travail
+
+        Raises:
+            InsufficientStorageError: si l'espace ne se libère pas à temps
+        """
+        estimate = estimate or 0
+        if self.quota and estimate > self.quota:
+            raise InsufficientStorageError(estimate, self.quota)
+
+        if self._changed is None:
+            self._changed = asyncio.Event()
+
+        deadline = time.monotonic() + timeout
+        usage = await self._usage()
+        area = self._choose_area(estimate, usage)
+        while area is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise InsufficientStorageError(estimate, max(0, self._available(self.root, usage)))
+            logger.info(f"En attente d'espace disque ({estimate / 1024 / 1024:.1f} MB)")
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), min(remaining, self.POLL_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
+            usage = await self._usage()
+            area = self._choose_area(estimate, usage)
+
+        job_dir = tempfile.mkdtemp(prefix='job-', dir=area)
+        self._reservations[job_dir] = estimate
+        self._active_dirs.add(job_dir)
+        return job_dir
+
+    def adopt(self, job_dir: str):
+        """Reprend le suivi d'un dossier de travail existant (tâche reprise)"""
+        self._active_dirs.add(os.path.abspath(job_dir))
+
+    def release(self, job_dir: str):
+        """Libère la réservation à la fin du téléchargement (le fichier est compté sur disque)"""
+        if self._reservations.pop(os.path.abspath(job_dir), None) is not None:
+            self._signal()
+
+    def forget(self, job_dir: str):
+        """Oublie un dossier de travail supprimé"""
+        job_dir = os.path.abspath(job_dir)
+        self._reservations.pop(job_dir, None)
+        self._active_dirs.discard(job_dir)
+        self._signal()
+
+    def sweep(self, keep: Iterable[str] = (), min_age: Optional[float] = None) -> int:
+        """
+        Supprime les dossiers de travail et fichiers orphelins
+
+        Args:
+            keep: Dossiers à conserver (tâches du journal à reprendre)
+            min_age: Âge minimal d'un orphelin en secondes (STORAGE_ORPHAN_AGE par défaut)
+
+        Returns:
+            Le nombre d'octets libérés
+        """
+        min_age = self.orphan_age if min_age is None else min_age
+        protected = self._active_dirs | {os.path.abspath(path) for path in keep if path}
+        now = time.time()
+        freed = 0
+
+        for area in self.areas:
+            for entry in os.scandir(area):
+                path = os.path.abspath(entry.path)
+                if path in protected:
+                    continue
+                try:
+                    if now - entry.stat(follow_symlinks=False).st_mtime < min_age:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        size = sum(
+                            os.path.getsize(os.path.join(dir_path, name))
+                            for dir_path, _, names in os.walk(path) for name in names
+                        )
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        size = entry.stat(follow_symlinks=False).st_size
+                        os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Orphelin non supprimé {path}: {e}")
+                    continue
+                freed += size
+                logger.info(f"Orphelin supprimé: {path} ({size / 1024 / 1024:.2f} MB)")
+
+        if freed:
+            self.swept_bytes += freed
+            self._signal()
+        return freed
+
+    def start_sweeper(self, keep: Callable[[], Iterable[str]] = lambda: (),
+                      interval: float = STORAGE_SWEEP_INTERVAL):
+        """Lance le nettoyage périodique des orphelins"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_periodically(keep, interval))
+
+    async def _sweep_periodically(self, keep: Callable[[], Iterable[str]], interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.sweep, list(keep()))
+            except Exception as e:
+                logger.error(f"Erreur lors du nettoyage des orphelins: {e}")
+            # L'espace libéré par d'autres processus est aussi pris en compte
+            self._signal()
+
+    async def stop(self):
+        """Arrête le nettoyage périodique"""
+        if self._sweeper and not self._sweeper.done():
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+        self._sweeper = None
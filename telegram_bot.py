@@ -1,12 +1,35 @@
 import asyncio
+import itertools
 import logging
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+import os
+from collections import deque
+from typing import Optional
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaVideo
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler
 from telegram.constants import ParseMode
+from telegram.error import BadRequest, TelegramError
 import re
 
-from config import BOT_TOKEN, MESSAGES, MAX_FILE_SIZE
-from video_downloader import VideoDownloader
+from config import (
+    BOT_TOKEN, MESSAGES, MAX_FILE_SIZE, MAX_FILE_SIZE_MB, LOCAL_BOT_API_URL, LOCAL_MODE, JOB_MAX_RESUMES,
+    SPLIT_OVERSIZED, UPLOAD_CONCURRENCY, UPLOAD_STAGING_CHAT_ID, MESSAGE_URL_CONCURRENCY,
+    PLAYLIST_MAX_ITEMS, PLAYLIST_PREFETCH,
+    BOT_MODE, WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_SECRET_TOKEN, WEBHOOK_DELETE_ON_SHUTDOWN,
+)
+from video_downloader import VideoDownloader, PlaylistError
+from scheduler import DownloadScheduler
+from file_id_cache import FileIdCache
+from job_journal import JobJournal
+from url_utils import normalize_url, extract_urls
+from inflight import InFlightRegistry
+from progress_renderer import ProgressRenderer
+from progress import DownloadProgress
+from uploader import StreamingUploader
+from postprocessor import PostProcessor
+from size_guard import FileTooLargeError
+from storage import InsufficientStorageError
+from job_queue import JobQueue, MemoryJobQueue, create_job_queue
+from worker import DownloadWorker
 
 # Configuration du logging
 logging.basicConfig(
@@ -15,11 +38,60 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class _StatusMessageRef:
+    """Message de statut désigné par son chat et son identifiant (tâche suivie après un redémarrage)"""
+    
+    def __init__(self, bot, chat_id: int, message_id: int):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+    
+    async def edit_text(self, text: str, parse_mode: Optional[str] = None, **kwargs):
+        return await self.bot.edit_message_text(text, chat_id=self.chat_id, message_id=self.message_id,
+                                                parse_mode=parse_mode, **kwargs)
+
+class _BatchItemStatus:
+    """Statut d'un lien d'un message à plusieurs liens (une ligne du statut agrégé)"""
+    
+    local = True  # modifié en mémoire, sans appel à Telegram
+    
+    def __init__(self, chat_id: int, message_id):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = None
+        self.done = False
+    
+    async def edit_text(self, text: str, parse_mode: Optional[str] = None, **kwargs):
+        self.text = text
+
 class VideoUploaderBot:
-    def __init__(self):
-        self.downloader = VideoDownloader()
-        self.active_downloads = {}  # Pour suivre les téléchargements actifs
-        self.progress_tasks = {}  # Pour les tâches de mise à jour de progression
+    def __init__(self, job_queue: Optional[JobQueue] = None, journal: Optional[JobJournal] = None,
+                 file_id_cache: Optional[FileIdCache] = None):
+        self.journal = journal or JobJournal()  # Tâches en cours, reprises au redémarrage
+        self.downloader = VideoDownloader(journal=self.journal)
+        self.scheduler = DownloadScheduler()
+        self.file_id_cache = file_id_cache or FileIdCache()
+        self.inflight = InFlightRegistry()
+        self.uploader = StreamingUploader(local_mode=LOCAL_MODE)
+        self.postprocessor = PostProcessor()  # Conversions ffmpeg, dans un pool séparé des téléchargements
+        self.active_downloads = {}  # Pour suivre les téléchargements actifs (par tâche)
+        self.progress_renderer = ProgressRenderer()  # Mise à jour centralisée des messages de progression
+        # File vers les workers de téléchargement (None: tout s'exécute dans ce processus)
+        self.job_queue = job_queue if job_queue is not None else create_job_queue()
+        self._remote_jobs = {}  # tâche confiée aux workers -> futur de son résultat
+        self._remote_status = {}  # tâche confiée aux workers -> dernier texte de statut publié
+        self._event_seq = 0
+        self._event_pump = None
+        self._local_worker = None
+        # Avec une file, les identifiants sont attribués par la file (uniques entre processus)
+        self._last_journaled_id = self.journal.last_job_id()
+        self._job_ids = itertools.count(self._last_journaled_id + 1)
+    
+    async def _new_job_id(self) -> int:
+        """Identifiant d'une nouvelle tâche"""
+        if self.job_queue is not None:
+            return await self.job_queue.next_job_id(self._last_journaled_id)
+        return next(self._job_ids)
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Commande /start"""
@@ -37,7 +109,7 @@ class VideoUploaderBot:
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Commande /help"""
-        help_text = """
+        help_text = f"""
 🎬 <b>Bot de Téléchargement de Vidéos</b>
 
 <b>Comment utiliser:</b>
@@ -59,12 +131,13 @@ class VideoUploaderBot:
 • 📁 Informations détaillées sur le fichier
 
 <b>Limitations:</b>
-• Taille maximale: 50MB
+• Taille maximale: {MAX_FILE_SIZE_MB}MB
 • Formats supportés: MP4, AVI, MOV, MKV, WEBM
 
 <b>Commandes:</b>
 /start - Démarrer le bot
 /help - Afficher cette aide
+/stats - Afficher les statistiques du cache
         """
         
         await update.message.reply_text(help_text, parse_mode=ParseMode.HTML)
@@ -74,8 +147,12 @@ class VideoUploaderBot:
         message = update.message.text
         user_id = update.effective_user.id
         
-        # Extraire les URLs du message
-        urls = self._extract_urls(message)
+        # Extraire les URLs du message: un même lien (même forme normalisée) n'est traité
+        # qu'une fois, mais téléchargé tel qu'envoyé (liens signés, encodage des paramètres)
+        links = {}
+        for url in extract_urls(message):
+            links.setdefault(normalize_url(url), url)
+        urls = list(links.values())
         
         if not urls:
             await update.message.reply_text(
@@ -85,35 +162,259 @@ class VideoUploaderBot:
             )
             return
         
-        # Traiter chaque URL
-        for url in urls:
-            await self._process_video_url(update, context, url, user_id)
+        # Écarter sans requête réseau les liens qu'aucun extracteur ne prend en charge
+        unsupported = [url for url in urls if not self.downloader.is_supported(url)]
+        if unsupported:
+            await update.message.reply_text(
+                f"{MESSAGES['invalid_url']}\n\n" + '\n'.join(f"🔗 <code>{url}</code>" for url in unsupported),
+                parse_mode=ParseMode.HTML
+            )
+            urls = [url for url in urls if url not in unsupported]
+            if not urls:
+                return
+        
+        # Un seul lien: message de statut et envoi dédiés
+        if len(urls) == 1:
+            await self._process_video_url(update, context, urls[0], user_id)
+        else:
+            await self._process_url_batch(update, context, urls, user_id)
+    
+    def _render_status(self, job_id: int, ticket, url: str) -> str:
+        """Construit le message de statut d'une tâche (file d'attente ou progression)"""
+        if ticket is not None and not ticket.granted:
+            return (
+                f"{MESSAGES['queued'].format(position=ticket.position)}\n\n"
+                f"🔗 URL: <code>{url}</code>"
+            )
+        return self.downloader.format_progress_message(job_id)
     
-    def _extract_urls(self, text: str) -> list:
-        """Extrait les URLs d'un texte"""
-        url_pattern = re.compile(
-            r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?'
+    def _render_upload(self, file_info: dict, upload_progress: DownloadProgress) -> str:
+        """Construit le message de progression de l'envoi"""
+        percentage = upload_progress.percentage
+        bar_length = 20
+        filled_length = int(bar_length * percentage / 100)
+        bar = '█' * filled_length + '░' * (bar_length - filled_length)
+        
+        return (
+            f"📤 <b>Envoi en cours...</b>\n\n"
+            f"📁 Fichier: <code>{file_info.get('name', 'video')}</code>\n"
+            f"📊 Taille: <code>{file_info.get('size_mb', 0):.2f} MB</code>\n\n"
+            f"📊 <b>Progression:</b> {percentage:.1f}%\n"
+            f"<code>{bar}</code>\n"
+            f"⚡ <b>Vitesse:</b> {upload_progress.speed / 1024 / 1024:.2f} MB/s"
+        )
+    
+    def _build_caption(self, name: str, size_mb: float, url: str) -> str:
+        """Construit la légende de la vidéo envoyée"""
+        return (
+            f"🎬 <b>Vidéo téléchargée avec succès!</b>\n\n"
+            f"📁 Nom: <code>{name}</code>\n"
+            f"📊 Taille: <code>{size_mb:.2f} MB</code>\n"
+            f"🔗 Source: <code>{url}</code>\n"
+            f"✅ Téléchargement terminé"
         )
-        return url_pattern.findall(text)
     
-    async def _update_progress(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int, status_message):
-        """Met à jour le message de progression"""
+    async def _send_cached_video(self, bot, chat_id: int, url: str, status_message) -> bool:
+        """
+        Renvoie une vidéo déjà envoyée via son file_id
+        
+        Returns:
+            True si la vidéo a été envoyée depuis le cache
+        """
+        format_spec = self.downloader.format_spec
+        cached = self.file_id_cache.get(url, format_spec)
+        if not cached:
+            return False
+        
+        name = cached.get('name') or 'video'
+        size_mb = (cached.get('size') or 0) / 1024 / 1024
         try:
-            while user_id in self.active_downloads:
-                # Obtenir les informations de progression
-                progress_message = self.downloader.format_progress_message(user_id)
-                
-                # Mettre à jour le message
-                await status_message.edit_text(
-                    progress_message,
-                    parse_mode=ParseMode.HTML
+            await bot.send_video(
+                chat_id=chat_id,
+                video=cached['file_id'],
+                caption=self._build_caption(name, size_mb, url),
+                parse_mode=ParseMode.HTML
+            )
+        except BadRequest as e:
+            # file_id expiré ou invalide: repasser par le téléchargement
+            logger.warning(f"file_id rejeté pour {url}: {e}")
+            self.file_id_cache.invalidate(url, format_spec)
+            return False
+        
+        logger.info(f"Vidéo renvoyée depuis le cache: {url}")
+        await status_message.edit_text(
+            f"✅ <b>Vidéo envoyée depuis le cache!</b>\n\n"
+            f"📁 Fichier: <code>{name}</code>\n"
+            f"📊 Taille: <code>{size_mb:.2f} MB</code>\n"
+            f"🎉 Vidéo envoyée avec succès!",
+            parse_mode=ParseMode.HTML
+        )
+        return True
+    
+    async def _follow_inflight(self, job, bot, chat_id: int, url: str, status_message,
+                               deliver: bool = True) -> Optional[dict]:
+        """
+        Attend un téléchargement déjà en cours pour le même lien et renvoie son résultat
+        
+        Args:
+            deliver: False pour un élément d'album: la vidéo n'est pas envoyée
+                ici mais rendue à l'appelant (les parties d'une vidéo découpée
+                sont envoyées tout de suite)
+        
+        Returns:
+            Le résultat du téléchargement suivi (sans son message déposé) ou
+            None; {'playlist': True} si le lien est une playlist: l'appelant la
+            traite lui-même
+        """
+        key = ('follow', status_message.chat_id, status_message.message_id)
+        self.progress_renderer.track(
+            key, status_message,
+            lambda: self._remote_status.get(job.job_id) or self.downloader.format_progress_message(job.job_id)
+        )
+        try:
+            result = await job.wait()
+        finally:
+            await self.progress_renderer.untrack(key)
+        
+        if not result:
+            await status_message.edit_text(
+                f"❌ <b>Échec du téléchargement</b>\n\n"
+                f"🔗 URL: <code>{url}</code>\n"
+                f"💡 Vérifiez que le lien est valide et accessible.",
+                parse_mode=ParseMode.HTML
+            )
+            return None
+        if result.get('playlist'):
+            return result
+        
+        # Le message déposé appartient à la demande qui a téléchargé la vidéo
+        result = {key: value for key, value in result.items() if key != 'staged'}
+        name = result.get('name') or 'video'
+        size_mb = (result.get('size') or 0) / 1024 / 1024
+        if not deliver and result.get('file_id'):
+            await status_message.edit_text(
+                f"✅ <b>Vidéo prête</b>\n\n"
+                f"📁 Fichier: <code>{name}</code>\n"
+                f"📊 Taille: <code>{size_mb:.2f} MB</code>",
+                parse_mode=ParseMode.HTML
+            )
+            return result
+        if result.get('file_ids'):
+            await self._send_video_group(bot, chat_id, result['file_ids'], self._build_caption(name, size_mb, url))
+        else:
+            await bot.send_video(
+                chat_id=chat_id,
+                video=result['file_id'],
+                caption=self._build_caption(name, size_mb, url),
+                parse_mode=ParseMode.HTML
+            )
+        await status_message.edit_text(
+            f"✅ <b>Téléchargement et envoi terminés!</b>\n\n"
+            f"📁 Fichier: <code>{name}</code>\n"
+            f"📊 Taille: <code>{size_mb:.2f} MB</code>\n"
+            f"🎉 Vidéo envoyée avec succès!",
+            parse_mode=ParseMode.HTML
+        )
+        return result
+    
+    async def _send_video_group(self, bot, chat_id: int, file_ids: list, caption: str = None,
+                                captions: list = None):
+        """
+        Envoie des vidéos déjà téléversées en albums ordonnés (10 éléments au plus par album)
+        
+        Args:
+            caption: Légende commune (parties d'une même vidéo, numérotées)
+            captions: Légende propre à chaque vidéo (vidéos de liens différents)
+        """
+        count = len(file_ids)
+        if captions is None:
+            captions = [
+                (f"{caption}\n" if index == 0 else "") + f"🧩 Partie {index + 1}/{count}" for index in range(count)
+            ]
+        for start in range(0, count, 10):
+            if start + 1 == count:
+                # Un album compte au moins deux éléments
+                await bot.send_video(chat_id=chat_id, video=file_ids[start], caption=captions[start],
+                                     parse_mode=ParseMode.HTML)
+                break
+            media = [
+                InputMediaVideo(media=file_id, caption=item_caption, parse_mode=ParseMode.HTML, supports_streaming=True)
+                for file_id, item_caption in zip(file_ids[start:start + 10], captions[start:start + 10])
+            ]
+            await bot.send_media_group(chat_id=chat_id, media=media)
+    
+    def _staging_chat_id(self, chat_id: int) -> int:
+        """Chat de dépôt des vidéos envoyées ensuite en album"""
+        return int(UPLOAD_STAGING_CHAT_ID) if UPLOAD_STAGING_CHAT_ID else chat_id
+    
+    async def _send_parts(self, bot, chat_id: int, url: str, job_id: int, name: str, parts: list,
+                          status_message) -> dict:
+        """
+        Envoie les parties d'une vidéo découpée
+        
+        Les parties sont téléversées en parallèle (UPLOAD_CONCURRENCY au plus)
+        dans le chat de dépôt, puis renvoyées dans l'ordre sous forme d'album
+        via leurs file_id; les messages de dépôt sont ensuite supprimés.
+        
+        Returns:
+            Le résultat partagé avec les demandes regroupées (file_ids, nom, taille)
+        """
+        sizes = [os.path.getsize(part) for part in parts]
+        total = sum(sizes)
+        sent_bytes = [0] * len(parts)
+        file_info = {'name': f"{name} ({len(parts)} parties)", 'size_mb': total / 1024 / 1024}
+        upload_progress = DownloadProgress(job_id)
+        staging_chat_id = self._staging_chat_id(chat_id)
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+        
+        async def upload(index: int, part: str):
+            def on_progress(sent: int, _total: int):
+                sent_bytes[index] = sent
+                upload_progress.update({'downloaded_bytes': sum(sent_bytes), 'total_bytes': total})
+            
+            async with semaphore:
+                metadata = await self.postprocessor.probe(part)
+                return await self.uploader.send_video(
+                    bot, staging_chat_id, part, progress=on_progress,
+                    disable_notification=True,
+                    thumbnail=metadata.get('thumbnail'),
+                    duration=metadata.get('duration'),
+                    width=metadata.get('width'),
+                    height=metadata.get('height'),
+                    supports_streaming=metadata.get('supports_streaming')
                 )
-                
-                # Attendre 2 secondes avant la prochaine mise à jour
-                await asyncio.sleep(2)
-                
-        except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour de progression: {e}")
+        
+        self.journal.update(job_id, status='uploading')
+        self.progress_renderer.track(job_id, status_message, lambda: self._render_upload(file_info, upload_progress))
+        try:
+            results = await asyncio.gather(*(upload(i, part) for i, part in enumerate(parts)), return_exceptions=True)
+        finally:
+            await self.progress_renderer.untrack(job_id)
+        
+        staged = [message for message in results if not isinstance(message, BaseException)]
+        try:
+            errors = [error for error in results if isinstance(error, BaseException)]
+            if errors:
+                raise errors[0]
+            
+            file_ids = [(message.video or message.document).file_id for message in staged]
+            await self._send_video_group(bot, chat_id, file_ids, self._build_caption(name, total / 1024 / 1024, url))
+        finally:
+            # Les messages de dépôt ne servent qu'à obtenir les file_id
+            for message in staged:
+                try:
+                    await bot.delete_message(staging_chat_id, message.message_id)
+                except TelegramError as e:
+                    logger.warning(f"Message de dépôt non supprimé: {e}")
+        
+        await status_message.edit_text(
+            f"✅ <b>Téléchargement et envoi terminés!</b>\n\n"
+            f"📁 Fichier: <code>{name}</code>\n"
+            f"📊 Taille: <code>{total / 1024 / 1024:.2f} MB</code> en {len(parts)} parties\n"
+            f"🎉 Vidéo envoyée avec succès!",
+            parse_mode=ParseMode.HTML
+        )
+        return {'file_ids': file_ids, 'name': name, 'size': total}
     
     async def _process_video_url(self, update: Update, context: ContextTypes.DEFAULT_TYPE, url: str, user_id: int):
         """Traite une URL de vidéo avec suivi de progression"""
@@ -125,31 +426,437 @@ class VideoUploaderBot:
                 parse_mode=ParseMode.HTML
             )
             
-            # Vérifier si l'utilisateur a déjà un téléchargement en cours
-            if user_id in self.active_downloads:
-                await status_message.edit_text(
-                    "⚠️ Vous avez déjà un téléchargement en cours.\n"
-                    "Veuillez attendre qu'il se termine.",
-                    parse_mode=ParseMode.HTML
-                )
+            # Répondre directement si la vidéo a déjà été envoyée
+            if await self._send_cached_video(context.bot, update.effective_chat.id, url, status_message):
                 return
             
-            # Marquer le téléchargement comme actif
-            self.active_downloads[user_id] = True
-            
-            # Démarrer la tâche de mise à jour de progression
-            progress_task = asyncio.create_task(
-                self._update_progress(update, context, user_id, status_message)
+            if self.job_queue is not None:
+                await self._submit_job(context.bot, update.effective_chat.id, user_id, url, await self._new_job_id(),
+                                       status_message)
+            else:
+                await self._run_job(context.bot, update.effective_chat.id, user_id, url, await self._new_job_id(),
+                                    status_message)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement de l'URL {url}: {e}")
+            await update.message.reply_text(
+                f"❌ <b>Erreur lors du traitement</b>\n\n"
+                f"🔗 URL: <code>{url}</code>\n"
+                f"💡 Veuillez réessayer plus tard.",
+                parse_mode=ParseMode.HTML
             )
-            self.progress_tasks[user_id] = progress_task
+    
+    def _summarize_item(self, item: _BatchItemStatus) -> str:
+        """Résumé d'une ligne du statut d'un élément (première ligne et pourcentage)"""
+        text = item.text or MESSAGES['processing']
+        summary = text.split('\n', 1)[0]
+        percentage = re.search(r'(\d+(?:\.\d+)?)%', text)
+        if percentage and not item.done:
+            summary += f" {percentage.group(1)}%"
+        return summary
+    
+    def _render_batch(self, urls: list, items: list, header: str = None) -> str:
+        """Construit le statut agrégé d'un message à plusieurs liens (une ligne par lien)"""
+        done = sum(1 for item in items if item.done)
+        lines = [header or f"📦 <b>Traitement de {len(urls)} liens</b> ({done}/{len(urls)} terminés)", ""]
+        for index, (url, item) in enumerate(zip(urls, items), 1):
+            lines.append(f"{index}. {self._summarize_item(item)}\n<code>{url}</code>")
+        return '\n'.join(lines)
+    
+    async def _process_item(self, bot, chat_id: int, user_id: int, url: str, item: _BatchItemStatus,
+                            remote: bool = True, allowance: Optional[int] = None) -> Optional[dict]:
+        """
+        Prépare la vidéo d'un élément d'album (lien d'un message ou élément de playlist)
+        
+        La vidéo vient du cache de file_id ou est déposée dans le chat de dépôt.
+        
+        Args:
+            remote: Confier le téléchargement à la file de tâches s'il y en a
+                une (False dans un worker, qui traite lui-même les éléments)
+            allowance: Téléchargements simultanés permis pour les éléments (voir
+                DownloadScheduler.enqueue)
+        
+        Returns:
+            Le résultat (file_id ou file_ids, nom, taille, message déposé) ou None
+        """
+        try:
+            cached = self.file_id_cache.get(url, self.downloader.format_spec)
+            if cached:
+                await item.edit_text("♻️ <b>Vidéo en cache</b>")
+                return dict(cached, cached=True)
+            if remote and self.job_queue is not None:
+                return await self._submit_job(bot, chat_id, user_id, url, await self._new_job_id(), item,
+                                              deliver=False, allowance=allowance)
+            return await self._run_job(bot, chat_id, user_id, url, await self._new_job_id(), item,
+                                       deliver=False, allowance=allowance)
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement de l'URL {url}: {e}")
+            await item.edit_text("❌ <b>Erreur lors du traitement</b>")
+            return None
+        finally:
+            item.done = True
+    
+    async def _deliver_album(self, bot, chat_id: int, ready: list) -> int:
+        """
+        Envoie des vidéos prêtes en albums de 10 au plus, dans l'ordre
+        
+        Args:
+            ready: Couples (url, résultat de _process_item) avec un file_id
+        
+        Returns:
+            Le nombre de vidéos envoyées
+        """
+        format_spec = self.downloader.format_spec
+        delivered = 0
+        try:
+            for start in range(0, len(ready), 10):
+                chunk = ready[start:start + 10]
+                file_ids = [result['file_id'] for _, result in chunk]
+                captions = [
+                    self._build_caption(result.get('name') or 'video', (result.get('size') or 0) / 1024 / 1024, url)
+                    for url, result in chunk
+                ]
+                try:
+                    await self._send_video_group(bot, chat_id, file_ids, captions=captions)
+                    delivered += len(chunk)
+                except BadRequest as e:
+                    # Un file_id du cache a pu expirer: envoyer les vidéos de l'album une à une
+                    logger.warning(f"Album refusé, envoi des vidéos une à une: {e}")
+                    for (url, result), file_id, caption in zip(chunk, file_ids, captions):
+                        try:
+                            await bot.send_video(chat_id=chat_id, video=file_id, caption=caption,
+                                                 parse_mode=ParseMode.HTML)
+                            delivered += 1
+                        except BadRequest as e:
+                            logger.warning(f"file_id rejeté pour {url}: {e}")
+                            if result.get('cached'):
+                                self.file_id_cache.invalidate(url, format_spec)
+        finally:
+            # Les messages de dépôt ne servent qu'à obtenir les file_id
+            for _, result in ready:
+                if result.get('staged'):
+                    staged_chat_id, message_id = result['staged']
+                    try:
+                        await bot.delete_message(staged_chat_id, message_id)
+                    except TelegramError as e:
+                        logger.warning(f"Message de dépôt non supprimé: {e}")
+        return delivered
+    
+    async def _process_url_batch(self, update: Update, context: ContextTypes.DEFAULT_TYPE, urls: list, user_id: int):
+        """
+        Traite les liens d'un même message en parallèle
+        
+        Les liens sont traités MESSAGE_URL_CONCURRENCY à la fois, extraction
+        comprise: le message dispose d'autant de places dans le planificateur,
+        sous la limite globale, même au-delà de MAX_DOWNLOADS_PER_USER. Un
+        seul message de statut agrégé. Les vidéos obtenues sont déposées dans
+        le chat de dépôt puis envoyées ensemble en albums de 10 au plus.
+        """
+        bot = context.bot
+        chat_id = update.effective_chat.id
+        status_message = await update.message.reply_text(
+            f"⏳ <b>Traitement de {len(urls)} liens...</b>", parse_mode=ParseMode.HTML
+        )
+        items = [_BatchItemStatus(status_message.chat_id, (status_message.message_id, i)) for i in range(len(urls))]
+        semaphore = asyncio.Semaphore(MESSAGE_URL_CONCURRENCY)
+        
+        async def process(index: int, url: str) -> Optional[dict]:
+            async with semaphore:
+                return await self._process_item(bot, chat_id, user_id, url, items[index],
+                                                allowance=MESSAGE_URL_CONCURRENCY)
+        
+        key = ('batch', status_message.chat_id, status_message.message_id)
+        self.progress_renderer.track(key, status_message, lambda: self._render_batch(urls, items))
+        try:
+            results = await asyncio.gather(*(process(index, url) for index, url in enumerate(urls)))
+        finally:
+            await self.progress_renderer.untrack(key)
+        
+        # Vidéos à envoyer en album (les vidéos découpées ont déjà été envoyées en parties)
+        ready = [(url, result) for url, result in zip(urls, results) if result and result.get('file_id')]
+        delivered = sum(1 for result in results if result and result.get('file_ids'))
+        delivered += await self._deliver_album(bot, chat_id, ready)
+        
+        header = f"✅ <b>{delivered}/{len(urls)} vidéos envoyées</b>"
+        await status_message.edit_text(self._render_batch(urls, items, header), parse_mode=ParseMode.HTML)
+    
+    def _render_playlist(self, title: str, entries: list, delivered: int, complete: bool) -> str:
+        """Construit le statut d'une playlist (compteurs et éléments en cours)"""
+        done = sum(1 for _, item in entries if item.done)
+        total = f"{len(entries)}" if complete else f"{len(entries)}+"
+        lines = [
+            f"📃 <b>Playlist</b>: <code>{title}</code>",
+            f"✅ Traités: {done}/{total} — 📤 Envoyés: {delivered}",
+            "",
+        ]
+        for index, (entry, item) in enumerate(entries, 1):
+            if not item.done:
+                lines.append(f"{index}. {self._summarize_item(item)}\n<code>{entry['url']}</code>")
+        return '\n'.join(lines)
+    
+    async def _run_playlist(self, bot, chat_id: int, user_id: int, url: str, title: str, status_message,
+                            remote: bool = True):
+        """
+        Télécharge et envoie les éléments d'une playlist en pipeline
+        
+        Les éléments sont énumérés au fur et à mesure (PLAYLIST_MAX_ITEMS au
+        plus). Chaque élément est téléchargé puis déposé dans le chat de dépôt
+        par sa propre tâche; PLAYLIST_PREFETCH éléments sont préparés d'avance
+        pendant que l'élément suivant dans l'ordre est envoyé: le
+        téléchargement de l'élément N+1 recouvre l'envoi de l'élément N. Les
+        vidéos sont livrées dans l'ordre, en albums de 10.
+        """
+        entries = []  # (élément, statut)
+        window = deque()  # tâches des éléments en cours, dans l'ordre de la playlist
+        ready = []  # vidéos prêtes pour le prochain album
+        delivered = 0
+        complete = False
+        
+        async def deliver_next():
+            nonlocal delivered, ready
+            entry, result = await window.popleft()
+            if result and result.get('file_ids'):
+                delivered += 1
+            elif result and result.get('file_id'):
+                ready.append((entry['url'], result))
+            if len(ready) == 10:
+                delivered += await self._deliver_album(bot, chat_id, ready)
+                ready = []
+        
+        async def process(entry: dict, item: _BatchItemStatus):
+            return entry, await self._process_item(bot, chat_id, user_id, entry['url'], item, remote)
+        
+        key = ('playlist', status_message.chat_id, status_message.message_id)
+        self.progress_renderer.track(
+            key, status_message, lambda: self._render_playlist(title, entries, delivered, complete)
+        )
+        try:
+            async for entry in self.downloader.iter_playlist(url):
+                item = _BatchItemStatus(status_message.chat_id, (status_message.message_id, len(entries)))
+                entries.append((entry, item))
+                window.append(asyncio.create_task(process(entry, item)))
+                while len(window) > PLAYLIST_PREFETCH:
+                    await deliver_next()
+            complete = True
+            while window:
+                await deliver_next()
+            if ready:
+                delivered += await self._deliver_album(bot, chat_id, ready)
+        finally:
+            # Arrêt ou erreur d'énumération: abandonner les éléments en cours
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+            await self.progress_renderer.untrack(key)
+        
+        await status_message.edit_text(
+            f"✅ <b>Playlist terminée</b>: <code>{title}</code>\n\n"
+            f"📤 {delivered}/{len(entries)} vidéos envoyées\n"
+            f"🔗 URL: <code>{url}</code>",
+            parse_mode=ParseMode.HTML
+        )
+    
+    
+    def _ensure_event_pump(self):
+        """Démarre la lecture des événements publiés par les workers"""
+        if self._event_pump is None or self._event_pump.done():
+            self._event_pump = asyncio.create_task(self._pump_events())
+    
+    async def _pump_events(self):
+        """Relaie les statuts et résultats des workers vers les tâches en attente"""
+        while True:
+            try:
+                events = await self.job_queue.events(self._event_seq, timeout=30)
+            except Exception as e:
+                logger.error(f"Erreur lors de la lecture des événements des workers: {e}")
+                await asyncio.sleep(1)
+                continue
+            
+            for seq, job_id, event in events:
+                self._event_seq = seq
+                if event['type'] == 'status':
+                    if job_id in self._remote_jobs:
+                        self._remote_status[job_id] = event['text']
+                elif event['type'] == 'result':
+                    # Les résultats des tâches d'un autre frontal lui sont laissés
+                    future = self._remote_jobs.get(job_id)
+                    if future is None:
+                        continue
+                    if not future.done():
+                        future.set_result(event['result'])
+                    await self.job_queue.purge(job_id)
+    
+    async def _submit_job(self, bot, chat_id: int, user_id: int, url: str, job_id: int, status_message,
+                          submit: bool = True, deliver: bool = True,
+                          allowance: Optional[int] = None) -> Optional[dict]:
+        """
+        Confie une tâche aux workers et relaie son statut dans le chat
+        
+        Le message de statut est modifié par le moteur de rendu du frontal à
+        partir des textes publiés par le worker; le file_id obtenu alimente le
+        cache et les demandes regroupées.
+        
+        Args:
+            submit: False pour une tâche déjà en file (suivie après un redémarrage)
+            deliver: False pour déposer la vidéo dans le chat de dépôt (voir _run_job)
+            allowance: Téléchargements simultanés permis à l'utilisateur (voir _run_job)
+        
+        Returns:
+            Le résultat du worker (file_id ou file_ids, nom, taille) ou None
+        """
+        inflight_key = f"{normalize_url(url)}|{self.downloader.format_spec}"
+        inflight_job, is_leader = self.inflight.join(inflight_key, job_id)
+        if not is_leader:
+            followed = await self._follow_inflight(inflight_job, bot, chat_id, url, status_message, deliver)
+            if not (followed and followed.get('playlist')):
+                self._remote_jobs.pop(job_id, None)
+                return followed
+            # Playlist: pas de regroupement, chaque demande a sa tâche (les éléments restent regroupés)
+            inflight_job = None
+        
+        waiting_text = f"{MESSAGES['waiting_worker']}\n\n🔗 URL: <code>{url}</code>"
+        result = None
+        # Tâche reprise: son attente a été inscrite avant le démarrage de la lecture des événements
+        future = self._remote_jobs.get(job_id) or asyncio.get_running_loop().create_future()
+        self._remote_jobs[job_id] = future
+        self.progress_renderer.track(job_id, status_message, lambda: self._remote_status.get(job_id) or waiting_text)
+        try:
+            self._ensure_event_pump()
+            if submit:
+                await self.job_queue.put({
+                    'job_id': job_id, 'url': url, 'chat_id': chat_id, 'user_id': user_id,
+                    'message_id': status_message.message_id, 'format_spec': self.downloader.format_spec,
+                    'deliver': deliver, 'allowance': allowance,
+                })
+            result = await future
+        finally:
+            await self.progress_renderer.untrack(job_id)
+            self._remote_jobs.pop(job_id, None)
+            final_text = self._remote_status.pop(job_id, None)
+            if inflight_job:
+                self.inflight.finish(inflight_job, result)
+        
+        # Dernier statut du worker (succès ou échec), qui n'a peut-être pas encore été affiché
+        if final_text:
+            try:
+                await status_message.edit_text(final_text, parse_mode=ParseMode.HTML)
+            except BadRequest as e:
+                if 'not modified' not in str(e).lower():
+                    logger.warning(f"Statut final non affiché pour la tâche {job_id}: {e}")
+        
+        if result and result.get('file_id'):
+            self.file_id_cache.put(url, self.downloader.format_spec, result['file_id'],
+                                   result.get('name'), result.get('size'))
+        return result
+    
+    async def _run_job(self, bot, chat_id: int, user_id: int, url: str, job_id: int, status_message,
+                       resumed: bool = False, group: bool = True, deliver: bool = True,
+                       allowance: Optional[int] = None) -> Optional[dict]:
+        """
+        Télécharge puis envoie une vidéo (nouvelle tâche ou tâche reprise du journal)
+        
+        La tâche reste inscrite au journal tant qu'elle n'est pas terminée: si le
+        bot s'arrête entre-temps, elle est reprise au démarrage suivant.
+        
+        Args:
+            group: Regrouper avec les demandes simultanées du même lien (False
+                pour un worker: le frontal a déjà regroupé les demandes)
+            deliver: False pour déposer la vidéo dans le chat de dépôt sans
+                notification: elle est envoyée ensuite dans un album (le message
+                déposé est indiqué dans le résultat, sous 'staged')
+            allowance: Téléchargements simultanés permis à l'utilisateur pour
+                celui-ci (liens d'un même message, voir DownloadScheduler.enqueue)
+        
+        Returns:
+            Le résultat de l'envoi (file_id ou file_ids, nom, taille),
+            {'playlist': True} pour une playlist (envoyée élément par élément)
+            ou None
+        """
+        ticket = None
+        inflight_job = None
+        shared_result = None
+        interrupted = False
+        playlist = None
+        try:
+            # Regrouper les demandes simultanées du même lien en un seul téléchargement
+            if group:
+                inflight_key = f"{normalize_url(url)}|{self.downloader.format_spec}"
+                inflight_job, is_leader = self.inflight.join(inflight_key, job_id)
+                if not is_leader:
+                    leader_job, inflight_job = inflight_job, None
+                    followed = await self._follow_inflight(leader_job, bot, chat_id, url, status_message, deliver)
+                    if not (followed and followed.get('playlist')):
+                        return followed
+                    # Playlist: pas de regroupement, chaque demande l'énumère (les éléments restent regroupés)
+            
+            if not resumed:
+                self.journal.create(job_id, url, chat_id, user_id, self.downloader.format_spec)
+            
+            ticket = self.scheduler.enqueue(user_id, allowance)
+            
+            # Confier le message de statut au moteur de rendu (position puis progression)
+            self.progress_renderer.track(job_id, status_message, lambda: self._render_status(job_id, ticket, url))
+            
+            # Attendre une place dans la file de téléchargement
+            await ticket.wait()
+            
+            # Marquer le téléchargement comme actif
+            self.active_downloads[job_id] = user_id
             
             # Télécharger la vidéo avec suivi de progression
-            downloaded_file = await self.downloader.download_video(url, user_id)
+            try:
+                downloaded_file = await self.downloader.download_video(url, user_id, job_id=job_id)
+            except PlaylistError as e:
+                # Traitée après avoir libéré la place: les éléments passent eux-mêmes par la file
+                playlist = e
+                downloaded_file = None
+            except FileTooLargeError as e:
+                # Transfert interrompu dès le dépassement, fichier partiel supprimé
+                await self.progress_renderer.untrack(job_id)
+                await status_message.edit_text(
+                    f"{MESSAGES['file_too_large']}\n\n"
+                    f"📊 Taille: <code>{e.size / 1024 / 1024:.2f} MB</code>\n"
+                    f"🔗 URL: <code>{url}</code>",
+                    parse_mode=ParseMode.HTML
+                )
+                return
+            except InsufficientStorageError as e:
+                logger.warning(f"Tâche {job_id} refusée: {e}")
+                await self.progress_renderer.untrack(job_id)
+                await status_message.edit_text(
+                    f"{MESSAGES['no_space']}\n\n"
+                    f"🔗 URL: <code>{url}</code>",
+                    parse_mode=ParseMode.HTML
+                )
+                return
+            finally:
+                # Libérer la place pour le téléchargement suivant
+                ticket.release()
+            
+            # Arrêter le rendu de la progression avant les messages finaux
+            await self.progress_renderer.untrack(job_id)
             
-            # Arrêter la tâche de progression
-            if user_id in self.progress_tasks:
-                self.progress_tasks[user_id].cancel()
-                del self.progress_tasks[user_id]
+            if playlist is not None:
+                self.active_downloads.pop(job_id, None)
+                # Les demandes regroupées traitent la playlist elles-mêmes, sans attendre celle-ci
+                shared_result = {'playlist': True}
+                if inflight_job:
+                    self.inflight.finish(inflight_job, shared_result)
+                    inflight_job = None
+                # Les éléments ont leur propre entrée au journal: reprendre la playlist
+                # après un redémarrage les enverrait une seconde fois
+                self.journal.remove(job_id)
+                if PLAYLIST_MAX_ITEMS <= 0 or not deliver:
+                    # Pas de playlist dans un album (message à plusieurs liens)
+                    await status_message.edit_text(
+                        f"{MESSAGES['playlist_disabled']}\n\n"
+                        f"🔗 URL: <code>{url}</code>",
+                        parse_mode=ParseMode.HTML
+                    )
+                    return shared_result
+                await self._run_playlist(bot, chat_id, user_id, url, playlist.title or url, status_message,
+                                         remote=group)
+                return shared_result
             
             if not downloaded_file:
                 await status_message.edit_text(
@@ -160,6 +867,55 @@ class VideoUploaderBot:
                 )
                 return
             
+            # Post-traitement (MP4 lisible en streaming, réencodage si trop volumineux)
+            if self.postprocessor.needs_processing(downloaded_file):
+                await status_message.edit_text(
+                    f"⚙️ <b>Conversion de la vidéo...</b>\n\n"
+                    f"🔗 URL: <code>{url}</code>",
+                    parse_mode=ParseMode.HTML
+                )
+                downloaded_file = await self.postprocessor.process(downloaded_file)
+                self.journal.update(job_id, file_path=downloaded_file)
+            
+            file_size = os.path.getsize(downloaded_file)
+            if file_size > MAX_FILE_SIZE and SPLIT_OVERSIZED:
+                # Découper sans réencodage puis envoyer les parties en album
+                await status_message.edit_text(
+                    f"{MESSAGES['splitting']}\n\n"
+                    f"📊 Taille: <code>{file_size / 1024 / 1024:.2f} MB</code>\n"
+                    f"🔗 URL: <code>{url}</code>",
+                    parse_mode=ParseMode.HTML
+                )
+                name = os.path.basename(downloaded_file)
+                parts = await self.postprocessor.split(downloaded_file)
+                if parts:
+                    try:
+                        shared_result = await self._send_parts(bot, chat_id, url, job_id, name, parts, status_message)
+                    except asyncio.CancelledError:
+                        interrupted = True
+                        raise
+                    except Exception as e:
+                        logger.error(f"Erreur lors de l'envoi des parties: {e}")
+                        await status_message.edit_text(
+                            f"❌ <b>Erreur lors de l'envoi</b>\n\n"
+                            f"🔗 URL: <code>{url}</code>",
+                            parse_mode=ParseMode.HTML
+                        )
+                    finally:
+                        if not interrupted:
+                            await self.downloader.cleanup_file(parts[0])
+                    return shared_result
+            
+            if file_size > MAX_FILE_SIZE:
+                await self.downloader.cleanup_file(downloaded_file)
+                await status_message.edit_text(
+                    f"{MESSAGES['file_too_large']}\n\n"
+                    f"📊 Taille: <code>{file_size / 1024 / 1024:.2f} MB</code>\n"
+                    f"🔗 URL: <code>{url}</code>",
+                    parse_mode=ParseMode.HTML
+                )
+                return
+            
             # Obtenir les informations du fichier
             file_info = self.downloader.get_file_info(downloaded_file)
             
@@ -172,19 +928,51 @@ class VideoUploaderBot:
                 parse_mode=ParseMode.HTML
             )
             
-            # Envoyer la vidéo
+            # Durée, dimensions et miniature: la vidéo est lisible en streaming dès sa réception
+            entry = self.journal.get(job_id) or {}
+            metadata = await self.postprocessor.probe(
+                downloaded_file, self.downloader.info_cache.get(url), entry.get('format_id')
+            )
+            
+            # Envoyer la vidéo en flux depuis le disque avec suivi de progression
+            upload_progress = DownloadProgress(job_id)
+            self.progress_renderer.track(job_id, status_message, lambda: self._render_upload(file_info, upload_progress))
+            target_chat_id = chat_id if deliver else self._staging_chat_id(chat_id)
+            delivery = {} if deliver else {'disable_notification': True}
             try:
-                with open(downloaded_file, 'rb') as video_file:
-                    await context.bot.send_video(
-                        chat_id=update.effective_chat.id,
-                        video=video_file,
-                        caption=f"🎬 <b>Vidéo téléchargée avec succès!</b>\n\n"
-                                f"📁 Nom: <code>{file_info.get('name', 'video')}</code>\n"
-                                f"📊 Taille: <code>{file_info.get('size_mb', 0):.2f} MB</code>\n"
-                                f"🔗 Source: <code>{url}</code>\n"
-                                f"✅ Téléchargement terminé",
-                        parse_mode=ParseMode.HTML
+                try:
+                    self.journal.update(job_id, status='uploading')
+                    sent_message = await self.uploader.send_video(
+                        bot,
+                        target_chat_id,
+                        downloaded_file,
+                        progress=lambda sent, total: upload_progress.update({'downloaded_bytes': sent, 'total_bytes': total}),
+                        caption=self._build_caption(file_info.get('name', 'video'), file_info.get('size_mb', 0), url),
+                        parse_mode=ParseMode.HTML,
+                        thumbnail=metadata.get('thumbnail'),
+                        duration=metadata.get('duration'),
+                        width=metadata.get('width'),
+                        height=metadata.get('height'),
+                        supports_streaming=metadata.get('supports_streaming'),
+                        **delivery
+                    )
+                finally:
+                    await self.progress_renderer.untrack(job_id)
+                
+                # Mémoriser le file_id pour les prochaines demandes du même lien
+                sent_media = sent_message.video or sent_message.document
+                if sent_media:
+                    self.file_id_cache.put(
+                        url, self.downloader.format_spec, sent_media.file_id,
+                        file_info.get('name'), file_info.get('size')
                     )
+                    shared_result = {
+                        'file_id': sent_media.file_id,
+                        'name': file_info.get('name'),
+                        'size': file_info.get('size'),
+                    }
+                    if not deliver:
+                        shared_result['staged'] = [target_chat_id, sent_message.message_id]
                 
                 # Message de succès final
                 await status_message.edit_text(
@@ -194,6 +982,10 @@ class VideoUploaderBot:
                     f"🎉 Vidéo envoyée avec succès!",
                     parse_mode=ParseMode.HTML
                 )
+            
+            except asyncio.CancelledError:
+                interrupted = True
+                raise
                 
             except Exception as e:
                 logger.error(f"Erreur lors de l'envoi de la vidéo: {e}")
@@ -205,26 +997,58 @@ class VideoUploaderBot:
                 )
             
             finally:
-                # Nettoyer le fichier téléchargé
-                await self.downloader.cleanup_file(downloaded_file)
-                
-        except Exception as e:
-            logger.error(f"Erreur lors du traitement de l'URL {url}: {e}")
-            await update.message.reply_text(
-                f"❌ <b>Erreur lors du traitement</b>\n\n"
-                f"🔗 URL: <code>{url}</code>\n"
-                f"💡 Veuillez réessayer plus tard.",
-                parse_mode=ParseMode.HTML
-            )
+                # Nettoyer le fichier téléchargé (sauf arrêt du bot pendant l'envoi)
+                if not interrupted:
+                    await self.downloader.cleanup_file(downloaded_file)
+        
+        except asyncio.CancelledError:
+            # Arrêt du bot: la tâche reste au journal pour être reprise
+            interrupted = True
+            raise
         
         finally:
+            # Quitter la file si le téléchargement n'a pas abouti
+            if ticket:
+                ticket.release()
+            
+            # Tâche traitée (réussie ou en échec définitif): la retirer du journal
+            if not interrupted:
+                self.journal.remove(job_id)
+            
+            # Transmettre le résultat aux demandes regroupées
+            if inflight_job:
+                self.inflight.finish(inflight_job, shared_result)
+            
             # Retirer le téléchargement de la liste active
-            self.active_downloads.pop(user_id, None)
+            self.active_downloads.pop(job_id, None)
             
-            # Annuler la tâche de progression si elle existe encore
-            if user_id in self.progress_tasks:
-                self.progress_tasks[user_id].cancel()
-                del self.progress_tasks[user_id]
+            # Arrêter le rendu de la progression s'il est encore actif
+            await self.progress_renderer.untrack(job_id)
+        
+        return shared_result
+    
+    async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Commande /stats"""
+        stats = self.file_id_cache.get_stats()
+        disk_usage = await asyncio.to_thread(self.downloader.storage.usage)
+        remote = ""
+        if self.job_queue is not None:
+            remote = f"\n🛰️ Tâches confiées aux workers: <code>{len(self._remote_jobs)}</code>"
+        await update.message.reply_text(
+            f"📊 <b>Statistiques</b>\n\n"
+            f"🗃️ Vidéos en cache: <code>{stats['entries']}</code>\n"
+            f"✅ Succès du cache: <code>{stats['hits']}</code>\n"
+            f"❌ Échecs du cache: <code>{stats['misses']}</code>\n"
+            f"♻️ file_id invalidés: <code>{stats['invalidations']}</code>\n"
+            f"📥 Téléchargements actifs: <code>{self.scheduler.running_count}</code>\n"
+            f"⚡ Débit total: <code>{self.downloader.total_speed / 1024 / 1024:.2f} MB/s</code>\n"
+            f"🕒 En file d'attente: <code>{self.scheduler.queued_count}</code>\n"
+            f"⚙️ Conversions en cours: <code>{self.postprocessor.queued_count}</code>\n"
+            f"💾 Disque utilisé: <code>{disk_usage / 1024 / 1024:.1f} MB</code>"
+            f" (réservé: <code>{self.downloader.storage.reserved / 1024 / 1024:.1f} MB</code>)"
+            f"{remote}",
+            parse_mode=ParseMode.HTML
+        )
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Gère les callbacks des boutons inline"""
@@ -232,7 +1056,7 @@ class VideoUploaderBot:
         await query.answer()
         
         if query.data == "download_info":
-            help_text = """
+            help_text = f"""
 📥 <b>Comment télécharger une vidéo:</b>
 
 1. <b>Copiez le lien</b> de la vidéo que vous voulez télécharger
@@ -253,7 +1077,7 @@ class VideoUploaderBot:
 • Barre de progression visuelle
 
 <b>Limitations:</b>
-• Taille maximale: 50MB
+• Taille maximale: {MAX_FILE_SIZE_MB}MB
 • Formats supportés: MP4, AVI, MOV, MKV, WEBM
             """
             await query.edit_message_text(help_text, parse_mode=ParseMode.HTML)
@@ -270,20 +1094,162 @@ class VideoUploaderBot:
                 "❌ Une erreur s'est produite. Veuillez réessayer plus tard."
             )
     
-    def run(self):
-        """Lance le bot"""
+    async def _resume_job(self, bot, entry: dict):
+        """Reprend une tâche interrompue par un arrêt du bot"""
+        url = entry['url']
+        try:
+            status_message = await bot.send_message(
+                entry['chat_id'],
+                f"🔄 <b>Reprise du téléchargement interrompu...</b>\n\n"
+                f"🔗 URL: <code>{url}</code>",
+                parse_mode=ParseMode.HTML
+            )
+            await self._run_job(bot, entry['chat_id'], entry['user_id'], url, entry['job_id'], status_message,
+                                resumed=True)
+        except Exception as e:
+            logger.error(f"Erreur lors de la reprise de la tâche {entry['job_id']}: {e}")
+            self.journal.remove(entry['job_id'])
+    
+    def _journaled_dirs(self) -> list:
+        """Dossiers de travail des tâches du journal (à ne pas nettoyer)"""
+        return [entry['job_dir'] for entry in self.journal.pending() if entry['job_dir']]
+    
+    async def _post_init(self, application: Application):
+        """Reprend au démarrage les tâches restées dans le journal et nettoie les orphelins"""
+        if self.job_queue is not None and not isinstance(self.job_queue, MemoryJobQueue):
+            await self._attach_workers(application)
+            return
+        
+        resumable = []
+        for entry in self.journal.pending():
+            if entry['attempts'] >= JOB_MAX_RESUMES:
+                # Tâche qui échoue à chaque reprise: l'abandonner
+                logger.warning(f"Tâche {entry['job_id']} abandonnée après {entry['attempts']} reprises: {entry['url']}")
+                self.journal.remove(entry['job_id'])
+                continue
+            resumable.append(entry)
+        
+        # Compiler les motifs des extracteurs avant le premier message
+        application.create_task(asyncio.to_thread(self.downloader.extractor_matcher.warm_up))
+        
+        # Tout ce qui n'appartient pas à une tâche à reprendre est orphelin
+        storage = self.downloader.storage
+        freed = await asyncio.to_thread(storage.sweep, self._journaled_dirs(), 0)
+        if freed:
+            logger.info(f"Orphelins supprimés au démarrage: {freed / 1024 / 1024:.1f} MB")
+        storage.start_sweeper(self._journaled_dirs)
+        
+        for entry in resumable:
+            self.journal.update(entry['job_id'], attempts=entry['attempts'] + 1)
+            logger.info(f"Reprise de la tâche {entry['job_id']} ({entry['status']}): {entry['url']}")
+            application.create_task(self._resume_job(application.bot, entry))
+        
+        if self.job_queue is not None:
+            # File en mémoire: le worker tourne dans le processus du bot
+            self._local_worker = asyncio.create_task(DownloadWorker(self.job_queue, self).run(application.bot))
+            self._ensure_event_pump()
+    
+    async def _attach_workers(self, application: Application):
+        """
+        Démarrage d'un frontal relié à des workers par une file partagée
+        
+        Les workers tiennent le journal des tâches et gèrent le dossier de
+        téléchargement: le frontal ne reprend ni ne nettoie rien lui-même. Il
+        continue à relayer le statut des tâches déposées avant son redémarrage.
+        """
+        application.create_task(asyncio.to_thread(self.downloader.extractor_matcher.warm_up))
+        
+        # Inscrire l'attente de chaque tâche avant de lire les événements: aucun résultat n'est perdu
+        loop = asyncio.get_running_loop()
+        pending = await self.job_queue.pending()
+        for job in pending:
+            self._remote_jobs[job['job_id']] = loop.create_future()
+        for job in pending:
+            status_message = _StatusMessageRef(application.bot, job['chat_id'], job['message_id'])
+            application.create_task(self._submit_job(
+                application.bot, job['chat_id'], job['user_id'], job['url'], job['job_id'], status_message,
+                submit=False, deliver=job.get('deliver', True)
+            ))
+        self._ensure_event_pump()
+    
+    async def _post_shutdown(self, application: Application):
+        """Libère les ressources à l'arrêt du bot"""
+        for task in (self._local_worker, self._event_pump):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self.job_queue is not None:
+            await self.job_queue.close()
+        await self.progress_renderer.stop()
+        await self.downloader.storage.stop()
+        await self.uploader.close()
+        await self.downloader.close()
+        self.postprocessor.shutdown()
+        self.file_id_cache.close()
+        self.journal.close()
+    
+    def build_application(self) -> Application:
+        """Construit l'application et enregistre les handlers"""
         # Créer l'application
-        application = Application.builder().token(BOT_TOKEN).build()
+        builder = (
+            Application.builder()
+            .token(BOT_TOKEN)
+            .concurrent_updates(True)
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+        )
+        
+        # Serveur Bot API local: fichiers jusqu'à 2GB, envoyés par chemin
+        if LOCAL_MODE:
+            builder = (
+                builder
+                .base_url(f"{LOCAL_BOT_API_URL}/bot")
+                .base_file_url(f"{LOCAL_BOT_API_URL}/file/bot")
+                .local_mode(True)
+            )
+            logger.info(f"Mode serveur Bot API local: {LOCAL_BOT_API_URL}")
+        
+        application = builder.build()
         
         # Ajouter les handlers
         application.add_handler(CommandHandler("start", self.start_command))
         application.add_handler(CommandHandler("help", self.help_command))
+        application.add_handler(CommandHandler("stats", self.stats_command))
         application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_url_message))
         application.add_handler(CallbackQueryHandler(self.button_callback))
         
         # Ajouter le gestionnaire d'erreurs
         application.add_error_handler(self.error_handler)
+        return application
+    
+    def run(self, mode: str = BOT_MODE, webhook_url: str = WEBHOOK_URL, listen: str = WEBHOOK_LISTEN,
+            port: int = WEBHOOK_PORT, secret_token: str = WEBHOOK_SECRET_TOKEN):
+        """
+        Lance le bot
+        
+        Args:
+            mode: 'polling' (long polling) ou 'webhook' (serveur HTTP intégré)
+            webhook_url: URL publique du webhook (mode webhook)
+            listen: Adresse d'écoute du serveur webhook
+            port: Port d'écoute du serveur webhook
+            secret_token: Jeton secret attendu dans les requêtes du webhook
+        """
+        if mode not in ('polling', 'webhook'):
+            raise ValueError(f"Mode inconnu: {mode} (polling ou webhook)")
+        if mode == 'webhook' and not webhook_url:
+            raise ValueError("WEBHOOK_URL est requis en mode webhook")
+        
+        application = self.build_application()
         
         # Démarrer le bot
-        logger.info("Bot démarré avec suivi de progression en temps réel...")
-        application.run_polling(allowed_updates=Update.ALL_TYPES) 
\ No newline at end of file
+        logger.info(f"Bot démarré ({mode}) avec suivi de progression en temps réel...")
+        if mode == 'webhook':
+            from webhook_server import run_webhook  # aiohttp n'est chargé qu'en mode webhook
+            
+            asyncio.run(run_webhook(application, webhook_url, listen, port, secret_token,
+                                    delete_webhook=WEBHOOK_DELETE_ON_SHUTDOWN))
+        else:
+            application.run_polling(allowed_updates=Update.ALL_TYPES)
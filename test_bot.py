@@ -11,6 +11,14 @@ import logging
 # Ajouter le répertoire courant au path Python
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+def make_test_bot(tmp_dir: str, **kwargs):
+    """Instance du bot dont le journal et le cache de file_id sont dans un répertoire temporaire"""
+    from telegram_bot import VideoUploaderBot
+    from job_journal import JobJournal
+    from file_id_cache import FileIdCache
+    return VideoUploaderBot(journal=JobJournal(os.path.join(tmp_dir, 'jobs.db')),
+                            file_id_cache=FileIdCache(os.path.join(tmp_dir, 'file_ids.db')), **kwargs)
+
 def test_imports():
     """Teste l'importation des modules"""
     print("🔍 Test des importations...")
@@ -82,7 +90,7 @@ def test_video_downloader():
         ]
         
         for url in test_urls:
-            is_valid = downloader._is_valid_url(url)
+            is_valid = downloader.is_supported(url)
             status = "✅" if is_valid else "❌"
             print(f"   {status} {url}")
         
@@ -91,15 +99,75 @@ def test_video_downloader():
         print(f"❌ Erreur module de téléchargement: {e}")
         return False
 
+def test_output_path():
+    """Teste le chemin du fichier produit par yt-dlp et le dossier de travail des tâches"""
+    print("\n📂 Test du chemin de sortie et du dossier de travail...")
+    
+    try:
+        import tempfile
+        from video_downloader import VideoDownloader, _resolve_output_path
+        from download_executor import DownloadExecutor
+        from storage import StorageManager
+        
+        # Chemin final: téléchargement demandé, puis champs de premier niveau
+        assert _resolve_output_path({'requested_downloads': [{'filepath': '/a.mp4', '_filename': '/x.mp4'}]}) == '/a.mp4'
+        assert _resolve_output_path({'requested_downloads': [{'_filename': '/b.mp4'}], 'filepath': '/x.mp4'}) == '/b.mp4'
+        assert _resolve_output_path({'requested_downloads': [{}], 'filepath': '/c.mp4'}) == '/c.mp4'
+        assert _resolve_output_path({'_filename': '/d.mp4'}) == '/d.mp4'
+        assert _resolve_output_path({}) is None
+        
+        with tempfile.TemporaryDirectory() as root:
+            executor = DownloadExecutor(max_workers=1, mode='thread')
+            downloader = VideoDownloader(executor=executor, storage=StorageManager(root, quota=0, min_free=0))
+            job_dirs = []
+            
+            async def fake_ytdlp(url, allocate, hook, job_id, format_id, complete=True):
+                job_dir = await allocate(1024)
+                job_dirs.append(job_dir)
+                path = os.path.join(job_dir, 'video.mp4' if complete else 'video.mp4.part')
+                with open(path, 'wb') as f:
+                    f.write(b'\0' * 1024)
+                return path if complete else None
+            
+            async def run():
+                # Livraison: le dossier de la tâche existe jusqu'au nettoyage après l'envoi
+                downloader._download_with_ytdlp = fake_ytdlp
+                path = await downloader.download_video("https://example.com/watch/1", user_id=1, job_id=1)
+                assert path and os.path.dirname(path) == job_dirs[0], f"Fichier hors du dossier de la tâche: {path}"
+                assert os.path.dirname(job_dirs[0]) == os.path.abspath(root)
+                await downloader.cleanup_file(path)
+                assert not os.path.exists(job_dirs[0]), "Dossier de travail conservé après l'envoi"
+                
+                # Échec: le dossier et le fichier partiel sont supprimés
+                downloader._download_with_ytdlp = lambda *args: fake_ytdlp(*args, complete=False)
+                assert await downloader.download_video("https://example.com/watch/2", user_id=1, job_id=2) is None
+                assert not os.path.exists(job_dirs[1]), "Dossier de travail conservé après un échec"
+            
+            try:
+                asyncio.run(run())
+            finally:
+                executor.shutdown()
+            assert os.listdir(root) == [], f"Fichiers restants: {os.listdir(root)}"
+        
+        print("✅ Chemin de sortie résolu, dossiers de travail créés puis supprimés")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur chemin de sortie: {e}")
+        return False
+
 def test_telegram_bot():
     """Teste le module du bot Telegram"""
     print("\n🤖 Test du module bot Telegram...")
     
     try:
-        from telegram_bot import VideoUploaderBot
+        import tempfile
+        from url_utils import extract_urls
         
         # Créer une instance
-        bot = VideoUploaderBot()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = make_test_bot(tmp_dir)
+            bot.journal.close()
+            bot.file_id_cache.close()
         print("✅ Instance VideoUploaderBot créée")
         
         # Tester l'extraction d'URLs
@@ -111,7 +179,7 @@ def test_telegram_bot():
         ]
         
         for text in test_texts:
-            urls = bot._extract_urls(text)
+            urls = extract_urls(text)
             print(f"   📝 '{text[:30]}...' -> {len(urls)} URL(s) trouvée(s)")
         
         return True
@@ -119,6 +187,1564 @@ def test_telegram_bot():
         print(f"❌ Erreur module bot Telegram: {e}")
         return False
 
+def test_download_executor():
+    """Teste le pool de téléchargement"""
+    print("\n⚙️ Test du pool de téléchargement...")
+    
+    try:
+        import time
+        from download_executor import DownloadExecutor
+        
+        executor = DownloadExecutor(max_workers=2, mode='thread')
+        
+        def blocking_job(value, progress=None):
+            if progress:
+                progress({'status': 'downloading'})
+            time.sleep(0.2)
+            return value * 2
+        
+        async def run_jobs():
+            ticks = 0
+            
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+            
+            tick_task = asyncio.create_task(ticker())
+            received = []
+            start = time.monotonic()
+            results = await asyncio.gather(
+                executor.submit(blocking_job, 1, progress=received.append),
+                executor.submit(blocking_job, 2),
+            )
+            elapsed = time.monotonic() - start
+            tick_task.cancel()
+            return results, elapsed, ticks, received
+        
+        results, elapsed, ticks, received = asyncio.run(run_jobs())
+        executor.shutdown()
+        
+        assert results == [2, 4], f"Résultats inattendus: {results}"
+        assert elapsed < 0.35, f"Les tâches ne tournent pas en parallèle ({elapsed:.2f}s)"
+        assert ticks > 5, "La boucle asyncio a été bloquée"
+        assert received, "Progression non reçue"
+        
+        print(f"✅ 2 tâches exécutées en parallèle en {elapsed:.2f}s")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur pool de téléchargement: {e}")
+        return False
+
+def test_scheduler():
+    """Teste le planificateur de téléchargements"""
+    print("\n🕒 Test du planificateur...")
+    
+    try:
+        from scheduler import DownloadScheduler
+        
+        async def run_scheduler():
+            scheduler = DownloadScheduler(max_concurrent=1, max_per_user=1)
+            first = scheduler.enqueue(1)
+            a2 = scheduler.enqueue(1)
+            a3 = scheduler.enqueue(1)
+            b1 = scheduler.enqueue(2)
+            
+            assert first.granted, "Le premier téléchargement doit démarrer"
+            assert (a2.position, b1.position, a3.position) == (1, 2, 3), "Positions incorrectes"
+            
+            # Le tourniquet doit servir l'utilisateur 2 avant le 3e lien de l'utilisateur 1
+            first.release()
+            assert a2.granted and not b1.granted
+            a2.release()
+            assert b1.granted and not a3.granted, "Tourniquet non équitable"
+            
+            # Quitter la file libère la position
+            b1.release()
+            a3.release()
+            return scheduler.running_count, scheduler.queued_count
+
+        async def run_allowance():
+            # Les liens d'un même message ont leur propre limite, sous la limite globale
+            scheduler = DownloadScheduler(max_concurrent=3, max_per_user=1)
+            batch = [scheduler.enqueue(1, allowance=4) for _ in range(4)]
+            single = scheduler.enqueue(2)
+            granted = [ticket.granted for ticket in batch] + [single.granted]
+            batch[0].release()
+            batch[1].release()
+            granted_after = batch[3].granted and single.granted
+            for ticket in batch + [single]:
+                ticket.release()
+            return granted, granted_after, scheduler.running_count
+
+        running, queued = asyncio.run(run_scheduler())
+        assert (running, queued) == (0, 0), "Places non libérées"
+        granted, granted_after, running = asyncio.run(run_allowance())
+        assert granted == [True, True, True, False, False], f"Places accordées: {granted}"
+        assert granted_after and running == 0, "Tourniquet non respecté avec une limite propre"
+
+        print("✅ File équitable et positions correctes")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur planificateur: {e}")
+        return False
+
+def test_info_cache():
+    """Teste le cache des informations extraites"""
+    print("\n🗃️ Test du cache d'informations...")
+    
+    try:
+        import time
+        from info_cache import InfoCache, normalize_url
+        
+        assert normalize_url("HTTPS://Example.com/v/?b=2&a=1#t") == normalize_url("https://example.com/v?a=1&b=2")
+        
+        cache = InfoCache(max_entries=2, ttl=60)
+        cache.put("https://a.com/1", {'title': 'a'})
+        cache.put("https://a.com/2", {'title': 'b'})
+        assert cache.get("https://a.com/1") == {'title': 'a'}
+        cache.put("https://a.com/3", {'title': 'c'})
+        assert cache.get("https://a.com/2") is None, "L'entrée la moins récente doit être évincée"
+        
+        expiring = InfoCache(max_entries=2, ttl=0.01)
+        expiring.put("https://a.com/1", {'title': 'a'})
+        time.sleep(0.02)
+        assert expiring.get("https://a.com/1") is None, "L'entrée doit expirer"
+        
+        print(f"✅ LRU et expiration OK ({cache.hits} succès, {cache.misses} échec)")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur cache d'informations: {e}")
+        return False
+
+def test_file_id_cache():
+    """Teste le cache persistant des file_id"""
+    print("\n💾 Test du cache de file_id...")
+    
+    try:
+        import tempfile
+        from file_id_cache import FileIdCache
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, 'file_ids.db')
+            cache = FileIdCache(db_path)
+            url = "https://example.com/video.mp4"
+            
+            assert cache.get(url, 'best') is None
+            cache.put(url, 'best', 'FILE_ID_1', 'video.mp4', 1024)
+            cache.close()
+            
+            # Les entrées survivent à un redémarrage
+            cache = FileIdCache(db_path)
+            assert cache.get(url + "#t=1", 'best')['file_id'] == 'FILE_ID_1'
+            assert cache.get(url, 'worst') is None, "Le format fait partie de la clé"
+            
+            cache.invalidate(url, 'best')
+            assert cache.get(url, 'best') is None
+            stats = cache.get_stats()
+            cache.close()
+        
+        print(f"✅ Cache persistant OK ({stats['hits']} succès, {stats['misses']} échecs)")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur cache de file_id: {e}")
+        return False
+
+def test_inflight_registry():
+    """Teste le regroupement des demandes simultanées"""
+    print("\n🔗 Test du regroupement des demandes...")
+    
+    try:
+        from inflight import InFlightRegistry
+        
+        async def run_registry():
+            registry = InFlightRegistry()
+            job, leader = registry.join("https://a.com/v", 1)
+            followers = [registry.join("https://a.com/v", user_id) for user_id in (2, 3)]
+            assert leader and not any(is_leader for _, is_leader in followers)
+            assert all(follower is job for follower, _ in followers), "Un seul téléchargement par lien"
+            
+            waiting = [asyncio.create_task(follower.wait()) for follower, _ in followers]
+            registry.finish(job, {'file_id': 'FILE_ID'})
+            results = await asyncio.gather(*waiting)
+            
+            # Une nouvelle demande après la fin relance un téléchargement
+            _, new_leader = registry.join("https://a.com/v", 4)
+            return results, new_leader
+        
+        results, new_leader = asyncio.run(run_registry())
+        assert all(result['file_id'] == 'FILE_ID' for result in results)
+        assert new_leader
+        
+        print(f"✅ Résultat partagé avec {len(results)} demandes regroupées")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur regroupement des demandes: {e}")
+        return False
+
+def test_download_progress():
+    """Teste la progression par tâche"""
+    print("\n📊 Test de la progression par tâche...")
+    
+    try:
+        from progress import DownloadProgress
+        from video_downloader import VideoDownloader
+        
+        progress = DownloadProgress(job_id=1)
+        for i in range(20):
+            progress({'status': 'downloading', 'downloaded_bytes': i * 1024, 'total_bytes': 100 * 1024, 'speed': 512})
+        assert len(progress._samples) == DownloadProgress.SAMPLE_COUNT, "Le tampon doit rester borné"
+        assert 0 < progress.percentage < 100
+        assert not hasattr(progress, '__dict__'), "La progression doit utiliser __slots__"
+        
+        # Flux fragmenté: les octets de tous les fragments sont cumulés
+        fragmented = DownloadProgress(job_id=2)
+        fragmented({'status': 'downloading', 'downloaded_bytes': 0, 'total_bytes_estimate': 4096,
+                    'fragment_index': 0, 'fragment_count': 8})
+        fragmented({'status': 'downloading', 'downloaded_bytes': 2048, 'total_bytes_estimate': 4096,
+                    'fragment_index': 4, 'fragment_count': 8})
+        assert fragmented.fragment_count == 8 and fragmented.speed > 0
+        
+        # La progression est libérée même en cas d'échec
+        downloader = VideoDownloader()
+        result = asyncio.run(downloader.download_video("invalid_url", user_id=1, job_id=42))
+        assert result is None and not downloader.download_progress, "Progression non libérée"
+        
+        print(f"✅ Progression par tâche OK ({progress.percentage:.0f}%)")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur progression par tâche: {e}")
+        return False
+
+def test_progress_renderer():
+    """Teste le moteur de rendu de la progression"""
+    print("\n🖥️ Test du moteur de rendu de la progression...")
+    
+    try:
+        from telegram.error import RetryAfter
+        from progress_renderer import ProgressRenderer
+        
+        class FakeMessage:
+            def __init__(self, chat_id, fail_first=False):
+                self.chat_id = chat_id
+                self.texts = []
+                self.fail_first = fail_first
+            
+            async def edit_text(self, text, parse_mode=None):
+                if self.fail_first:
+                    self.fail_first = False
+                    raise RetryAfter(1)
+                self.texts.append(text)
+        
+        async def run_renderer():
+            renderer = ProgressRenderer(min_interval=0.05, global_rate=100, chat_rate_per_minute=6000)
+            renderer.TICK = 0.01
+            static = FakeMessage(1)
+            flooded = FakeMessage(2, fail_first=True)
+            renderer.track('static', static, lambda: "même texte")
+            renderer.track('flooded', flooded, lambda: "progression")
+            await asyncio.sleep(0.5)
+            blocked = not flooded.texts
+            await asyncio.sleep(0.8)
+            await renderer.untrack('static')
+            await renderer.stop()
+            return static, flooded, blocked, renderer
+        
+        static, flooded, blocked, renderer = asyncio.run(run_renderer())
+        assert static.texts == ["même texte"], "Un texte identique ne doit pas être renvoyé"
+        assert renderer.skipped > 0
+        assert blocked, "RetryAfter doit suspendre les modifications"
+        assert flooded.texts == ["progression"], "Les modifications doivent reprendre après la pause"
+        assert ProgressRenderer(min_interval=2, global_rate=20).interval == 2
+        
+        print(f"✅ {renderer.edits} modification(s), {renderer.skipped} ignorée(s)")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur moteur de rendu: {e}")
+        return False
+
+def test_streaming_upload():
+    """Teste l'envoi en flux contre un faux serveur Bot API local"""
+    print("\n📤 Test de l'envoi en flux...")
+    
+    try:
+        import tempfile
+        from aiohttp import web
+        from telegram import Bot
+        from uploader import StreamingUploader
+        
+        received = {}
+        
+        async def send_video(request):
+            if request.content_type != 'multipart/form-data':
+                received['video_uri'] = (await request.post())['video']
+                return web.json_response({'ok': True, 'result': {
+                    'message_id': 2, 'date': 0, 'chat': {'id': 42, 'type': 'private'},
+                }})
+            
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name == 'video':
+                    size = 0
+                    while chunk := await part.read_chunk():
+                        size += len(chunk)
+                    received['size'] = size
+                elif part.name == 'thumbnail_file':
+                    received['thumbnail_size'] = len(await part.read())
+                else:
+                    received[part.name] = await part.text()
+            return web.json_response({'ok': True, 'result': {
+                'message_id': 1, 'date': 0, 'chat': {'id': int(received['chat_id']), 'type': 'private'},
+                'video': {'file_id': 'FILE_ID', 'file_unique_id': 'U', 'width': 1, 'height': 1, 'duration': 1},
+            }})
+        
+        async def run_upload(file_path, thumbnail_path):
+            app = web.Application()
+            app.router.add_post('/bot123:TEST/sendVideo', send_video)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            
+            bot = Bot('123:TEST', base_url=f'http://127.0.0.1:{port}/bot')
+            uploader = StreamingUploader(local_mode=False)
+            local_uploader = StreamingUploader(local_mode=True)
+            sent = []
+            try:
+                message = await uploader.send_video(
+                    bot, 42, file_path, progress=lambda done, total: sent.append((done, total)), caption="test",
+                    thumbnail=thumbnail_path, duration=12, width=640, height=360, supports_streaming=True
+                )
+                # Mode serveur local: seul le chemin du fichier est transmis
+                await local_uploader.send_video(bot, 42, file_path)
+            finally:
+                await uploader.close()
+                await local_uploader.close()
+                await runner.cleanup()
+            return message, sent
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'video.mp4')
+            with open(file_path, 'wb') as f:
+                f.write(os.urandom(1024 * 1024))
+            thumbnail_path = os.path.join(tmp_dir, 'video.thumb.jpg')
+            with open(thumbnail_path, 'wb') as f:
+                f.write(b'\xff\xd8' + b'\0' * 510)
+            message, sent = asyncio.run(run_upload(file_path, thumbnail_path))
+        
+        assert message.video.file_id == 'FILE_ID'
+        assert received['size'] == 1024 * 1024 and received['caption'] == "test"
+        assert received['thumbnail'] == 'attach://thumbnail_file' and received['thumbnail_size'] == 512
+        assert received['width'] == '640' and received['supports_streaming'] == 'true', "Métadonnées absentes"
+        assert len(sent) > 1 and sent[-1] == (1024 * 1024, 1024 * 1024), "Progression de l'envoi incomplète"
+        assert received['video_uri'].startswith('file://') and received['video_uri'].endswith('video.mp4')
+        
+        print(f"✅ 1 MB envoyé en {len(sent)} morceaux")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur envoi en flux: {e}")
+        return False
+
+def test_format_selector():
+    """Teste le choix du format selon la taille maximale"""
+    print("\n🎞️ Test du choix de format...")
+    
+    try:
+        from format_selector import select_format, estimate_size
+        
+        MB = 1024 * 1024
+        info = {'duration': 100, 'formats': [
+            {'format_id': '18', 'vcodec': 'avc1', 'acodec': 'mp4a', 'height': 360, 'filesize': 10 * MB},
+            {'format_id': '22', 'vcodec': 'avc1', 'acodec': 'mp4a', 'height': 720, 'filesize': 80 * MB},
+            {'format_id': '136', 'vcodec': 'avc1', 'acodec': 'none', 'height': 720, 'tbr': 2400},
+            {'format_id': '137', 'vcodec': 'avc1', 'acodec': 'none', 'height': 1080, 'filesize_approx': 100 * MB},
+            {'format_id': '140', 'vcodec': 'none', 'acodec': 'mp4a', 'tbr': 128},
+        ]}
+        
+        assert estimate_size(info['formats'][2], 100) == 30_000_000, "Estimation débit × durée"
+        merged = select_format(info, 50 * MB, allow_merge=True)
+        assert merged.format_id == '136+140', f"Format fusionné attendu, obtenu {merged}"
+        single = select_format(info, 50 * MB, allow_merge=False)
+        assert single.format_id == '18', f"Format unique attendu, obtenu {single}"
+        too_small = select_format(info, 1 * MB, allow_merge=False)
+        assert too_small.estimated_size > 1 * MB, "Aucun format ne doit tenir"
+        assert select_format({'formats': [{'format_id': 'x'}]}, 50 * MB) is None
+        
+        print(f"✅ Format choisi: {merged.format_id} ({merged.reason})")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur choix de format: {e}")
+        return False
+
+def test_size_guard():
+    """Teste le garde-fou de taille pendant le téléchargement"""
+    print("\n🛑 Test du garde-fou de taille...")
+    
+    try:
+        from size_guard import SizeGuard, FileTooLargeError
+        
+        guard = SizeGuard(max_size=1000)
+        guard({'status': 'downloading', 'downloaded_bytes': 500, 'total_bytes': None, 'total_bytes_estimate': None})
+        guard({'status': 'finished', 'downloaded_bytes': 600, 'total_bytes': 600})
+        
+        # Le flux audio s'ajoute au flux vidéo déjà terminé
+        try:
+            guard({'status': 'downloading', 'downloaded_bytes': 100, 'total_bytes': 500})
+            raise AssertionError("Le dépassement de la taille annoncée doit interrompre le transfert")
+        except FileTooLargeError as e:
+            assert e.size == 1100
+        
+        unknown = SizeGuard(max_size=1000)
+        try:
+            unknown({'status': 'downloading', 'downloaded_bytes': 1001})
+            raise AssertionError("Le dépassement des octets reçus doit interrompre le transfert")
+        except FileTooLargeError as e:
+            reason = str(e)
+        
+        print(f"✅ Transfert interrompu: {reason}")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur garde-fou de taille: {e}")
+        return False
+
+def test_direct_downloader():
+    """Teste le téléchargement direct segmenté contre un serveur local"""
+    print("\n⚡ Test du téléchargement direct...")
+    
+    try:
+        import time
+        import tempfile
+        from aiohttp import web
+        from direct_downloader import DirectDownloader
+        
+        async def run_download(source_dir, dest_dir):
+            app = web.Application()
+            app.router.add_static('/media', source_dir)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            
+            downloader = DirectDownloader(segments=4, min_segment_size=256 * 1024, max_connections_per_host=2)
+            events = []
+            try:
+                url = f'http://127.0.0.1:{port}/media/video.mp4'
+                assert downloader.is_direct_url(url)
+                path = await downloader.download(url, dest_dir, max_size=10 * 1024 * 1024, progress=events.append)
+                session = await downloader._get_session()
+                assert session.connector.limit_per_host == 2, "Plafond de connexions par hôte absent"
+                
+                # Un segment en échec interrompt les autres avant la suppression du fichier partiel
+                import aiohttp
+                running = {'now': 0}
+                
+                async def failing_fetch(url, part_path, offset, end, report):
+                    running['now'] += 1
+                    try:
+                        await asyncio.sleep(0.01 if offset == 0 else 5)
+                        raise aiohttp.ClientPayloadError("Connexion coupée")
+                    finally:
+                        running['now'] -= 1
+                
+                failing = DirectDownloader(segments=4, min_segment_size=256 * 1024)
+                failing._fetch_segment = failing_fetch
+                failed_dir = os.path.join(dest_dir, 'failed')
+                os.makedirs(failed_dir)
+                started = time.monotonic()
+                try:
+                    await failing.download(url, failed_dir, max_size=10 * 1024 * 1024)
+                    raise AssertionError("Échec d'un segment ignoré")
+                except aiohttp.ClientPayloadError:
+                    pass
+                finally:
+                    await failing.close()
+                assert running['now'] == 0, f"{running['now']} segment(s) encore en cours"
+                assert time.monotonic() - started < 1, "Segments restants non interrompus"
+                assert os.listdir(failed_dir) == [], "Fichier partiel restant après l'échec"
+                os.rmdir(failed_dir)
+            finally:
+                await downloader.close()
+                await runner.cleanup()
+            return path, events
+        
+        with tempfile.TemporaryDirectory() as source_dir, tempfile.TemporaryDirectory() as dest_dir:
+            content = os.urandom(2 * 1024 * 1024 + 123)
+            with open(os.path.join(source_dir, 'video.mp4'), 'wb') as f:
+                f.write(content)
+            path, events = asyncio.run(run_download(source_dir, dest_dir))
+            with open(path, 'rb') as f:
+                assert f.read() == content, "Contenu des segments incorrect"
+            assert os.listdir(dest_dir) == ['video.mp4'], "Fichier partiel restant"
+        
+        assert events[-1]['status'] == 'finished' and events[-1]['downloaded_bytes'] == len(content)
+        assert events[-2]['fragment_count'] == 4, "Nombre de segments absent de la progression"
+        
+        # Serveur injoignable: la sonde échoue et l'extracteur yt-dlp prend le relais
+        from video_downloader import VideoDownloader
+        from storage import StorageManager
+        with tempfile.TemporaryDirectory() as root:
+            downloader = VideoDownloader(storage=StorageManager(root, quota=0, min_free=0))
+            fallback = []
+            
+            async def fake_ytdlp(url, allocate, hook, job_id, format_id):
+                fallback.append(url)
+                return None
+            
+            downloader._download_with_ytdlp = fake_ytdlp
+            
+            async def run_unreachable():
+                try:
+                    return await downloader.download_video('http://127.0.0.1:1/video.mp4', user_id=1, job_id=1)
+                finally:
+                    await downloader.close()
+            
+            assert asyncio.run(run_unreachable()) is None
+            assert fallback == ['http://127.0.0.1:1/video.mp4'], "Pas de repli sur yt-dlp après l'échec de la sonde"
+        
+        print(f"✅ {len(content) / 1024 / 1024:.1f} MB téléchargés en 4 segments, repli sur yt-dlp si injoignable")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur téléchargement direct: {e}")
+        return False
+
+def test_job_journal():
+    """Teste le journal des tâches et la reprise des téléchargements"""
+    print("\n🔄 Test de la reprise des téléchargements...")
+    
+    try:
+        import tempfile
+        import json
+        from aiohttp import web
+        from job_journal import JobJournal
+        from direct_downloader import DirectDownloader
+        from video_downloader import VideoDownloader
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            journal = JobJournal(os.path.join(tmp_dir, 'jobs.db'))
+            journal.create(7, 'https://example.com/v', chat_id=10, user_id=1, format_spec='best')
+            journal.update(7, format_id='18', status='downloading')
+            assert journal.last_job_id() == 7
+            assert journal.pending()[0]['format_id'] == '18', "Format non journalisé"
+            
+            # Une tâche dont le fichier est complet est reprise sans téléchargement
+            video_path = os.path.join(tmp_dir, 'video.mp4')
+            with open(video_path, 'wb') as f:
+                f.write(b'\0' * 1024)
+            journal.update(7, file_path=video_path, status='downloaded')
+            downloader = VideoDownloader(journal=journal)
+            result = asyncio.run(downloader.download_video('https://example.com/v', user_id=1, job_id=7))
+            assert result == video_path, "Fichier déjà téléchargé non réutilisé"
+            downloader.shutdown()
+            
+            journal.remove(7)
+            assert not journal.pending()
+            journal.close()
+            
+            # Journal d'une version précédente: la colonne du propriétaire est ajoutée
+            import sqlite3
+            legacy_path = os.path.join(tmp_dir, 'legacy.db')
+            conn = sqlite3.connect(legacy_path)
+            conn.execute("CREATE TABLE jobs (job_id INTEGER PRIMARY KEY, url TEXT NOT NULL, chat_id INTEGER NOT NULL,"
+                         " user_id INTEGER, format_spec TEXT, format_id TEXT, job_dir TEXT, file_path TEXT,"
+                         " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL,"
+                         " updated_at REAL NOT NULL)")
+            conn.commit()
+            conn.close()
+            journal = JobJournal(legacy_path, owner='w1')
+            journal.create(8, 'https://example.com/w', chat_id=10)
+            assert journal.get(8)['owner'] == 'w1', "Propriétaire non journalisé"
+            journal.close()
+        
+        # Téléchargement direct interrompu à mi-parcours de chaque segment
+        async def run_resume(source_dir, dest_dir):
+            app = web.Application()
+            app.router.add_static('/media', source_dir)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            
+            direct = DirectDownloader(segments=2, min_segment_size=256 * 1024)
+            events = []
+            try:
+                url = f'http://127.0.0.1:{port}/media/video.mp4'
+                path = await direct.download(url, dest_dir, max_size=10 * 1024 * 1024, progress=events.append)
+            finally:
+                await direct.close()
+                await runner.cleanup()
+            return path, events
+        
+        with tempfile.TemporaryDirectory() as source_dir, tempfile.TemporaryDirectory() as dest_dir:
+            content = os.urandom(1024 * 1024)
+            with open(os.path.join(source_dir, 'video.mp4'), 'wb') as f:
+                f.write(content)
+            
+            half = len(content) // 2
+            segments = [[0, half - 1, half // 2], [half, len(content) - 1, half + half // 2]]
+            part_path = os.path.join(dest_dir, 'video.mp4.part')
+            with open(part_path, 'wb') as f:
+                f.truncate(len(content))
+                for start, _, offset in segments:
+                    f.seek(start)
+                    f.write(content[start:offset])
+            with open(part_path + '.state', 'w') as f:
+                json.dump({'size': len(content), 'segments': segments}, f)
+            
+            path, events = asyncio.run(run_resume(source_dir, dest_dir))
+            with open(path, 'rb') as f:
+                assert f.read() == content, "Contenu repris incorrect"
+            assert os.listdir(dest_dir) == ['video.mp4'], "Fichiers de reprise restants"
+            assert events[0]['downloaded_bytes'] > half, "Les octets déjà reçus ont été retéléchargés"
+        
+        print("✅ Tâche journalisée et téléchargement repris à mi-parcours")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur reprise des téléchargements: {e}")
+        return False
+
+def test_postprocessor():
+    """Teste l'étape de post-traitement ffmpeg"""
+    print("\n⚙️ Test du post-traitement...")
+    
+    try:
+        import struct
+        import tempfile
+        from download_executor import DownloadExecutor
+        from postprocessor import PostProcessor, is_faststart, target_video_bitrate
+        
+        def box(box_type, payload=b''):
+            return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fast = os.path.join(tmp_dir, 'fast.mp4')
+            slow = os.path.join(tmp_dir, 'slow.mp4')
+            with open(fast, 'wb') as f:
+                f.write(box(b'ftyp', b'isom') + box(b'moov', b'\0' * 16) + box(b'mdat', b'\0' * 64))
+            with open(slow, 'wb') as f:
+                f.write(box(b'ftyp', b'isom') + box(b'mdat', b'\0' * 64) + box(b'moov', b'\0' * 16))
+            assert is_faststart(fast) and not is_faststart(slow), "Position de l'index mal détectée"
+            
+            # 50 MB sur 10 minutes: environ 650 kbit/s de vidéo après l'audio
+            bitrate = target_video_bitrate(600, 50 * 1024 * 1024, audio_bitrate=128)
+            assert 500 < bitrate < 700, f"Débit cible inattendu: {bitrate}"
+            assert target_video_bitrate(36000, 1024 * 1024) is None, "Budget trop faible accepté"
+            
+            # Un fichier illisible par ffmpeg (ou ffmpeg absent) est envoyé tel quel
+            broken = os.path.join(tmp_dir, 'broken.webm')
+            with open(broken, 'wb') as f:
+                f.write(b'\0' * 128)
+            processor = PostProcessor(DownloadExecutor(max_workers=2, mode='thread', name='post-traitement'))
+            try:
+                result = asyncio.run(processor.process(broken))
+            finally:
+                processor.shutdown()
+            assert result == broken and os.path.exists(broken)
+        
+        print(f"✅ Index MP4 détecté, débit cible {bitrate} kbit/s")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur post-traitement: {e}")
+        return False
+
+def test_media_info():
+    """Teste les métadonnées transmises à sendVideo"""
+    print("\n🖼️ Test des métadonnées vidéo...")
+    
+    try:
+        import tempfile
+        from media_info import metadata_from_info, probe_video
+        
+        info = {
+            'duration': 61.4, 'width': 1920, 'height': 1080,
+            'formats': [
+                {'format_id': '18', 'width': 640, 'height': 360},
+                {'format_id': '136', 'width': 1280, 'height': 720},
+                {'format_id': '140', 'vcodec': 'none'},
+            ],
+        }
+        assert metadata_from_info(info, '136+140') == {'duration': 61, 'width': 1280, 'height': 720}
+        assert metadata_from_info(info)['width'] == 1920
+        assert metadata_from_info(None) == {}
+        
+        # Fichier illisible par ffprobe: les informations de l'extracteur sont utilisées
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'video.mp4')
+            with open(path, 'wb') as f:
+                f.write(b'\0' * 256)
+            metadata = probe_video(path, info, '18')
+        assert metadata['width'] == 640 and metadata['duration'] == 61
+        assert metadata['supports_streaming'] is True and metadata['thumbnail'] is None
+        
+        print(f"✅ {metadata['width']}x{metadata['height']}, {metadata['duration']}s")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur métadonnées vidéo: {e}")
+        return False
+
+def test_video_splitting():
+    """Teste l'envoi d'une vidéo découpée en parties"""
+    print("\n✂️ Test du découpage en parties...")
+    
+    try:
+        import tempfile
+        from types import SimpleNamespace
+        from download_executor import DownloadExecutor
+        from postprocessor import PostProcessor, split_video
+        import shutil as shutil_module
+        
+        class FakeUploader:
+            def __init__(self):
+                self.active = 0
+                self.max_active = 0
+            
+            async def send_video(self, bot, chat_id, file_path, progress=None, **fields):
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                await asyncio.sleep(0.05)
+                self.active -= 1
+                if progress:
+                    size = os.path.getsize(file_path)
+                    progress(size, size)
+                index = int(file_path.rsplit('.', 2)[-2])
+                return SimpleNamespace(message_id=100 + index, video=SimpleNamespace(file_id=f'PART{index}'),
+                                       document=None)
+        
+        class FakeBot:
+            def __init__(self):
+                self.groups = []
+                self.deleted = []
+            
+            async def send_media_group(self, chat_id, media):
+                self.groups.append([item.media for item in media])
+            
+            async def delete_message(self, chat_id, message_id):
+                self.deleted.append(message_id)
+        
+        class FakeMessage:
+            chat_id = 42
+            message_id = 1
+            
+            async def edit_text(self, text, parse_mode=None):
+                self.text = text
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Sans ffmpeg (ou fichier illisible), la vidéo n'est pas découpée
+            broken = os.path.join(tmp_dir, 'broken.mp4')
+            with open(broken, 'wb') as f:
+                f.write(b'\0' * 128)
+            if not shutil_module.which('ffmpeg'):
+                assert split_video(broken, max_size=64) == [] and os.path.exists(broken)
+            
+            parts = []
+            for index in range(12):
+                part = os.path.join(tmp_dir, f'video.{index:03d}.mp4')
+                with open(part, 'wb') as f:
+                    f.write(b'\0' * 1024)
+                parts.append(part)
+            
+            bot = make_test_bot(tmp_dir)
+            bot.uploader = FakeUploader()
+            bot.postprocessor = PostProcessor(DownloadExecutor(max_workers=2, mode='thread', name='post-traitement'))
+            fake_bot = FakeBot()
+            try:
+                result = asyncio.run(bot._send_parts(fake_bot, 42, 'https://example.com/v', 1, 'video.mp4',
+                                                     parts, FakeMessage()))
+            finally:
+                bot.postprocessor.shutdown()
+                bot.journal.close()
+                bot.file_id_cache.close()
+        
+        assert result['file_ids'] == [f'PART{i}' for i in range(12)], "Ordre des parties incorrect"
+        assert [len(group) for group in fake_bot.groups] == [10, 2], "Albums de 10 vidéos au plus"
+        assert sorted(fake_bot.deleted) == list(range(100, 112)), "Messages de dépôt non supprimés"
+        assert 1 < bot.uploader.max_active <= 3, f"Parallélisme inattendu: {bot.uploader.max_active}"
+        
+        print(f"✅ 12 parties envoyées dans l'ordre ({bot.uploader.max_active} envois simultanés)")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur découpage en parties: {e}")
+        return False
+
+def test_storage_manager():
+    """Teste le quota, l'attente d'espace et le nettoyage des orphelins"""
+    print("\n💾 Test du gestionnaire d'espace disque...")
+    
+    try:
+        import tempfile
+        from storage import StorageManager, InsufficientStorageError
+        
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as tmpfs:
+            storage = StorageManager(root, quota=1000, min_free=0, tmpfs_path=tmpfs,
+                                     tmpfs_max_job_size=100, orphan_age=0)
+            storage.POLL_INTERVAL = 0.05
+            
+            async def run_admission():
+                small = await storage.allocate(50)
+                large = await storage.allocate(800)
+                assert os.path.dirname(small) == tmpfs and os.path.dirname(large) == root, "Mauvais emplacement"
+                
+                # Quota atteint: la tâche attend qu'une réservation soit libérée
+                waiter = asyncio.create_task(storage.allocate(500, timeout=2))
+                await asyncio.sleep(0.1)
+                assert not waiter.done(), "Tâche admise au-delà du quota"
+                storage.forget(large)
+                admitted = await waiter
+                
+                try:
+                    await storage.allocate(600, timeout=0.1)
+                    raise AssertionError("Quota dépassé sans erreur")
+                except InsufficientStorageError:
+                    pass
+                return small, admitted
+            
+            small, admitted = asyncio.run(run_admission())
+            
+            # Orphelins: dossier d'une tâche disparue et fichier partiel isolé
+            orphan_dir = tempfile.mkdtemp(prefix='job-', dir=root)
+            with open(os.path.join(orphan_dir, 'video.mp4.part'), 'wb') as f:
+                f.write(b'\0' * 300)
+            with open(os.path.join(root, 'stray.part'), 'wb') as f:
+                f.write(b'\0' * 200)
+            kept = tempfile.mkdtemp(prefix='job-', dir=root)
+            freed = storage.sweep(keep=[kept])
+            
+            assert freed == 500, f"Octets libérés inattendus: {freed}"
+            assert not os.path.exists(orphan_dir) and os.path.isdir(kept)
+            assert os.path.isdir(small) and os.path.isdir(admitted), "Dossier actif supprimé"
+        
+        # Lien direct plus gros que la limite: refusé comme trop volumineux, sans attendre d'espace
+        from video_downloader import VideoDownloader
+        from size_guard import FileTooLargeError
+        with tempfile.TemporaryDirectory() as root:
+            downloader = VideoDownloader(storage=StorageManager(root, quota=100 * 1024 * 1024, min_free=0))
+            
+            async def huge_probe(url):
+                return 5 * 1024 ** 3, True, url
+            
+            downloader.direct_downloader.probe = huge_probe
+            
+            async def run_huge():
+                try:
+                    await downloader.download_video('https://example.com/huge.mp4', user_id=1, job_id=1)
+                    raise AssertionError("Fichier trop volumineux accepté")
+                except FileTooLargeError:
+                    pass
+                finally:
+                    await downloader.close()
+            
+            asyncio.run(run_huge())
+            assert os.listdir(root) == [], "Dossier de travail créé pour un fichier refusé"
+        
+        print(f"✅ Quota respecté et {freed} octets d'orphelins supprimés")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur gestionnaire d'espace disque: {e}")
+        return False
+
+def test_webhook_mode():
+    """Teste le mode webhook contre un faux serveur Bot API local"""
+    print("\n🪝 Test du mode webhook...")
+    
+    try:
+        import socket
+        from aiohttp import web, ClientSession
+        from telegram.ext import Application, MessageHandler, filters
+        from webhook_server import run_webhook, SECRET_HEADER
+        from main import parse_args
+        
+        calls = {}
+        
+        async def bot_api(request):
+            method = request.match_info['method']
+            calls[method] = dict(await request.post()) if request.can_read_body else {}
+            if method == 'getMe':
+                return web.json_response({'ok': True, 'result': {
+                    'id': 123, 'is_bot': True, 'first_name': 'Test', 'username': 'test_bot',
+                }})
+            return web.json_response({'ok': True, 'result': True})
+        
+        def message_update(update_id: int, text: str) -> dict:
+            return {'update_id': update_id, 'message': {
+                'message_id': update_id, 'date': 0, 'text': text,
+                'chat': {'id': 42, 'type': 'private'}, 'from': {'id': 7, 'is_bot': False, 'first_name': 'U'},
+            }}
+        
+        async def run_scenario():
+            api = web.Application()
+            api.router.add_post('/bot123:TEST/{method}', bot_api)
+            api_runner = web.AppRunner(api)
+            await api_runner.setup()
+            site = web.TCPSite(api_runner, '127.0.0.1', 0)
+            await site.start()
+            api_port = site._server.sockets[0].getsockname()[1]
+            
+            with socket.socket() as s:
+                s.bind(('127.0.0.1', 0))
+                port = s.getsockname()[1]
+            
+            received = asyncio.Queue()
+            
+            async def on_message(update, context):
+                await received.put(update.message.text)
+            
+            application = Application.builder().token('123:TEST').base_url(f'http://127.0.0.1:{api_port}/bot').build()
+            application.add_handler(MessageHandler(filters.TEXT, on_message))
+            
+            stop_event = asyncio.Event()
+            server = asyncio.create_task(run_webhook(
+                application, 'https://bot.example.com/hook', '127.0.0.1', port, 'SECRET', stop_event
+            ))
+            statuses = {}
+            try:
+                async with ClientSession() as http:
+                    base = f'http://127.0.0.1:{port}'
+                    for _ in range(100):
+                        try:
+                            async with http.get(f'{base}/healthz') as response:
+                                if response.status == 200:
+                                    break
+                        except OSError:
+                            pass
+                        await asyncio.sleep(0.05)
+                    
+                    async with http.post(f'{base}/hook', json=message_update(1, 'refusé'),
+                                         headers={SECRET_HEADER: 'WRONG'}) as response:
+                        statuses['wrong'] = response.status
+                    async with http.post(f'{base}/hook', data=b'{', headers={SECRET_HEADER: 'SECRET'}) as response:
+                        statuses['invalid'] = response.status
+                    async with http.post(f'{base}/hook', json=message_update(2, 'bonjour'),
+                                         headers={SECRET_HEADER: 'SECRET'}) as response:
+                        statuses['ok'] = response.status
+                    text = await asyncio.wait_for(received.get(), 5)
+            finally:
+                stop_event.set()
+                await server
+                await api_runner.cleanup()
+            return statuses, text, received.empty()
+        
+        statuses, text, nothing_else = asyncio.run(run_scenario())
+        
+        assert statuses == {'wrong': 403, 'invalid': 400, 'ok': 200}, f"Statuts inattendus: {statuses}"
+        assert text == 'bonjour' and nothing_else, "La mise à jour refusée a été traitée"
+        assert calls['setWebhook']['url'] == 'https://bot.example.com/hook'
+        assert calls['setWebhook']['secret_token'] == 'SECRET'
+        assert 'deleteWebhook' in calls, "Webhook laissé en place à l'arrêt"
+        
+        args = parse_args(['--mode', 'webhook', '--webhook-url', 'https://bot.example.com/hook', '--port', '9000'])
+        assert args.mode == 'webhook' and args.port == 9000 and args.listen == '0.0.0.0'
+        
+        print("✅ Mises à jour reçues par webhook, jeton secret vérifié")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur mode webhook: {e}")
+        return False
+
+def test_job_queue_workers():
+    """Teste la file de tâches et les workers de téléchargement"""
+    print("\n🛰️ Test de la file de tâches et des workers...")
+    
+    try:
+        import tempfile
+        from types import SimpleNamespace
+        from job_queue import MemoryJobQueue, SQLiteJobQueue
+        from worker import DownloadWorker
+        from telegram_bot import VideoUploaderBot
+        
+        async def check_contract(queue):
+            await queue.put({'job_id': 1, 'url': 'https://example.com/a'})
+            await queue.put({'job_id': 2, 'url': 'https://example.com/b'})
+            first = await queue.claim('w1', 0.1)
+            second = await queue.claim('w2', 0.1)
+            assert (first['job_id'], second['job_id']) == (1, 2), "Ordre de la file incorrect"
+            assert await queue.claim('w3', 0.1) is None, "Tâche réservée proposée deux fois"
+            
+            # La réservation du worker w2 est prolongée, celle de w1 expire
+            await asyncio.sleep(0.15)
+            await queue.heartbeat(2, 'w2')
+            await asyncio.sleep(0.1)
+            reclaimed = await queue.claim('w3', 0.5)
+            assert reclaimed['job_id'] == 1, "Tâche d'un worker disparu non reproposée"
+            
+            await queue.publish(1, {'type': 'status', 'text': 'en cours'})
+            await queue.complete(1, {'file_id': 'F1'})
+            events = await queue.events(0, 0.1)
+            assert [event['type'] for _, _, event in events] == ['status', 'result']
+            assert events[-1][2]['result'] == {'file_id': 'F1'}
+            assert await queue.events(events[-1][0], 0.05) == []
+            await queue.purge(1)
+            assert await queue.events(0, 0.05) == []
+            assert [job['job_id'] for job in await queue.pending()] == [2]
+            
+            # Identifiants croissants, au-delà du plancher donné (journal d'un processus)
+            ids = [await queue.next_job_id() for _ in range(3)]
+            assert ids == sorted(set(ids)), f"Identifiants: {ids}"
+            assert await queue.next_job_id(10 ** 6) == 10 ** 6 + 1
+            assert await queue.next_job_id() == 10 ** 6 + 2
+            await queue.close()
+        
+        # Une file incomplète est refusée dès sa création
+        from job_queue import JobQueue
+        
+        class PartialQueue(JobQueue):
+            async def put(self, job):
+                pass
+        
+        try:
+            PartialQueue()
+            raise AssertionError("File incomplète instanciée")
+        except TypeError:
+            pass
+        
+        asyncio.run(check_contract(MemoryJobQueue(lease=0.2)))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            asyncio.run(check_contract(SQLiteJobQueue(os.path.join(tmp_dir, 'queue.db'), lease=0.2)))
+            
+            # Deux processus qui partagent la file n'obtiennent jamais le même identifiant
+            async def draw_ids():
+                queues = [SQLiteJobQueue(os.path.join(tmp_dir, 'shared.db')) for _ in range(2)]
+                try:
+                    drawn = await asyncio.gather(*(queue.next_job_id() for queue in queues for _ in range(25)))
+                finally:
+                    for queue in queues:
+                        await queue.close()
+                return drawn
+            
+            drawn = asyncio.run(draw_ids())
+            assert len(set(drawn)) == 50, "Identifiant attribué deux fois"
+        print("✅ Files en mémoire et SQLite: ordre, réservations, événements, identifiants")
+        
+        # Au démarrage, un worker n'oublie que ses propres tâches et celles des workers arrêtés
+        import socket
+        import subprocess
+        from job_journal import JobJournal
+        from worker import prune_journal
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            journal = JobJournal(os.path.join(tmp_dir, 'jobs.db'))
+            owners = {
+                1: 'me', 2: 'me', 3: 'other-host-42', 4: f"{socket.gethostname()}-{os.getpid()}",
+                5: f"{socket.gethostname()}-{finished.pid}", 6: None,
+            }
+            for job_id, owner in owners.items():
+                journal.owner = owner
+                journal.create(job_id, f'https://example.com/{job_id}', chat_id=42)
+            queue = MemoryJobQueue()
+            
+            async def prune():
+                await queue.put({'job_id': 2, 'url': 'https://example.com/2'})
+                await prune_journal(journal, queue, 'me')
+            
+            asyncio.run(prune())
+            kept = [entry['job_id'] for entry in journal.pending()]
+            journal.close()
+        assert kept == [2, 3, 4, 6], f"Tâches conservées: {kept}"
+        
+        class FakePipeline:
+            journal = SimpleNamespace(get=lambda job_id: None)
+            
+            def __init__(self):
+                self.jobs = []
+            
+            async def _run_job(self, bot, chat_id, user_id, url, job_id, status_message, resumed=False, group=True,
+                               deliver=True, allowance=None):
+                self.jobs.append((job_id, chat_id, user_id, url, group))
+                await status_message.edit_text("📥 Téléchargement...")
+                await asyncio.sleep(0.1)
+                await status_message.edit_text("✅ Terminé")
+                return {'file_id': 'REMOTE', 'name': 'video.mp4', 'size': 1024}
+        
+        class FakeBot:
+            def __init__(self):
+                self.sent = []
+            
+            async def send_video(self, chat_id, video, **kwargs):
+                self.sent.append((chat_id, video))
+        
+        class FakeMessage:
+            chat_id = 42
+            
+            def __init__(self, message_id):
+                self.message_id = message_id
+                self.text = None
+            
+            async def edit_text(self, text, parse_mode=None):
+                self.text = text
+        
+        async def run_frontend(bot):
+            fake_bot = FakeBot()
+            pipeline = FakePipeline()
+            worker = asyncio.create_task(DownloadWorker(bot.job_queue, pipeline, 'test').run(fake_bot))
+            leader_message, follower_message = FakeMessage(1), FakeMessage(2)
+            try:
+                results = await asyncio.gather(
+                    bot._submit_job(fake_bot, 42, 7, 'https://example.com/remote', 1001, leader_message),
+                    bot._submit_job(fake_bot, 43, 8, 'https://example.com/remote', 1002, follower_message),
+                )
+                cached = bot.file_id_cache.get('https://example.com/remote', bot.downloader.format_spec)
+            finally:
+                worker.cancel()
+                await asyncio.gather(worker, return_exceptions=True)
+                await bot._post_shutdown(None)
+            return results, pipeline.jobs, fake_bot.sent, leader_message.text, cached
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = make_test_bot(tmp_dir, job_queue=MemoryJobQueue())
+            results, jobs, sent, final_text, cached = asyncio.run(run_frontend(bot))
+        
+        assert results[0]['file_id'] == 'REMOTE' and results[1]['file_id'] == 'REMOTE'
+        assert jobs == [(1001, 42, 7, 'https://example.com/remote', False)], f"Tâches du worker: {jobs}"
+        assert sent == [(43, 'REMOTE')], "La demande regroupée n'a pas reçu la vidéo"
+        assert final_text == "✅ Terminé", "Statut final du worker non relayé"
+        assert cached and cached['file_id'] == 'REMOTE', "file_id du worker absent du cache du frontal"
+        
+        # Redémarrage d'un frontal relié à une file SQLite partagée
+        from job_journal import JobJournal
+        from file_id_cache import FileIdCache
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            journal = JobJournal(os.path.join(tmp_dir, 'jobs.db'))
+            journal.create(3001, 'https://example.com/worker-job', chat_id=42, user_id=7, format_spec='best')
+            queue = SQLiteJobQueue(os.path.join(tmp_dir, 'queue.db'))
+            bot = VideoUploaderBot(job_queue=queue, journal=journal,
+                                   file_id_cache=FileIdCache(os.path.join(tmp_dir, 'file_ids.db')))
+            
+            async def restart_frontend():
+                # Tâche déposée avant le redémarrage, dont le résultat est publié avant la lecture des événements
+                await queue.put({'job_id': 2001, 'url': 'https://example.com/queued', 'chat_id': 42, 'user_id': 7,
+                                 'message_id': 5})
+                await queue.publish(2001, {'type': 'result', 'result': {'file_id': 'EARLY'}})
+                # Résultat d'une tâche d'un autre frontal
+                await queue.publish(9999, {'type': 'result', 'result': {'file_id': 'OTHER'}})
+                
+                tasks = []
+                application = SimpleNamespace(bot=FakeBot(), create_task=lambda coro: tasks.append(
+                    asyncio.ensure_future(coro)) or tasks[-1])
+                try:
+                    await bot._post_init(application)
+                    done, _ = await asyncio.wait(tasks, timeout=5)
+                    results = [task.result() for task in done if task.result() is not None]
+                    others = [job_id for _, job_id, _ in await queue.events(0, 0.1)]
+                    pending = [entry['job_id'] for entry in journal.pending()]
+                    attempts = journal.get(3001)['attempts']
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    await bot._post_shutdown(None)
+                return results, others, pending, attempts
+            
+            results, others, pending, attempts = asyncio.run(restart_frontend())
+            journal.close()
+        
+        assert results == [{'file_id': 'EARLY'}], f"Tâche reprise sans résultat: {results}"
+        assert others == [9999], f"Résultat d'un autre frontal supprimé: {others}"
+        assert pending == [3001] and attempts == 0, "Tâche d'un worker reprise par le frontal"
+        
+        print("✅ Tâche exécutée par le worker, statut et résultat relayés au frontal")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur file de tâches: {e}")
+        return False
+
+def test_multi_url_batch():
+    """Teste le traitement parallèle des liens d'un même message"""
+    print("\n📦 Test des messages à plusieurs liens...")
+    
+    try:
+        import time
+        import tempfile
+        from types import SimpleNamespace
+        from scheduler import DownloadScheduler
+        from download_executor import DownloadExecutor
+        from postprocessor import PostProcessor
+        
+        class FakeMessage:
+            chat_id = 42
+            message_id = 1
+            
+            def __init__(self, text=None):
+                self.text = text
+                self.replies = []
+            
+            async def reply_text(self, text, parse_mode=None):
+                reply = FakeMessage(text)
+                self.replies.append(reply)
+                return reply
+            
+            async def edit_text(self, text, parse_mode=None):
+                self.text = text
+        
+        class FakeBot:
+            def __init__(self):
+                self.groups = []
+                self.videos = []
+                self.deleted = []
+            
+            async def send_media_group(self, chat_id, media):
+                self.groups.append([item.media for item in media])
+            
+            async def send_video(self, chat_id, video, **kwargs):
+                self.videos.append(video)
+            
+            async def delete_message(self, chat_id, message_id):
+                self.deleted.append(message_id)
+        
+        class FakeUploader:
+            async def send_video(self, bot, chat_id, file_path, progress=None, **fields):
+                await asyncio.sleep(0.01)
+                index = int(os.path.basename(file_path)[1:-4])
+                return SimpleNamespace(message_id=500 + index, video=SimpleNamespace(file_id=f'F{index}'),
+                                       document=None)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = make_test_bot(tmp_dir)
+            # Planificateur réel, un seul téléchargement à la fois par utilisateur
+            bot.scheduler = DownloadScheduler(max_concurrent=8, max_per_user=1)
+            bot.uploader = FakeUploader()
+            bot.postprocessor = PostProcessor(DownloadExecutor(max_workers=2, mode='thread', name='postprocess'))
+            running = {'now': 0, 'max': 0}
+            
+            async def fake_download_video(url, user_id, job_id=None, **kwargs):
+                # Extraction et téléchargement
+                if user_id == 7:
+                    running['now'] += 1
+                    running['max'] = max(running['max'], running['now'])
+                await asyncio.sleep(0.2)
+                if user_id == 7:
+                    running['now'] -= 1
+                path = os.path.join(tmp_dir, f"v{url.rsplit('v', 1)[-1]}.mp4")
+                with open(path, 'wb') as f:
+                    f.write(b'\0' * 1024)
+                return path
+            
+            bot.downloader.download_video = fake_download_video
+            urls = [f"https://example.com/v{i}" for i in range(11)]
+            format_spec = bot.downloader.format_spec
+            bot.file_id_cache.put(urls[0], format_spec, 'CACHED', 'v0.mp4', 1024)
+            
+            message = FakeMessage(' '.join(urls + [urls[1]]))
+            fake_bot = FakeBot()
+            update = SimpleNamespace(message=message, effective_user=SimpleNamespace(id=7),
+                                     effective_chat=SimpleNamespace(id=42))
+            
+            async def run_batch():
+                # Le dernier lien est déjà en cours de téléchargement pour un autre utilisateur
+                leader = asyncio.create_task(bot._run_job(fake_bot, 43, 8, urls[10], 999, FakeMessage()))
+                await asyncio.sleep(0)
+                try:
+                    await bot.handle_url_message(update, SimpleNamespace(bot=fake_bot))
+                    return await leader
+                finally:
+                    await bot.progress_renderer.stop()
+            
+            started = time.monotonic()
+            try:
+                leader_result = asyncio.run(run_batch())
+            finally:
+                bot.postprocessor.shutdown()
+                bot.journal.close()
+                bot.file_id_cache.close()
+            elapsed = time.monotonic() - started
+        
+        assert leader_result and leader_result['file_id'] == 'F10'
+        assert len(message.replies) == 1, "Un seul message de statut attendu"
+        assert fake_bot.groups == [['CACHED'] + [f'F{i}' for i in range(1, 10)]], f"Albums: {fake_bot.groups}"
+        assert fake_bot.videos == ['F10'], "La vidéo de la demande regroupée doit rejoindre les envois du message"
+        assert sorted(fake_bot.deleted) == [500 + i for i in range(1, 10)], "Messages de dépôt non supprimés"
+        assert running['max'] == 4, f"Parallélisme inattendu: {running['max']}"
+        assert elapsed < 1.2, f"Liens traités en série ({elapsed:.2f}s)"
+        assert message.replies[0].text.startswith("✅ <b>11/11 vidéos envoyées</b>"), message.replies[0].text
+        
+        print(f"✅ 11 liens traités en {elapsed:.2f}s (4 en parallèle malgré 1 par utilisateur), 1 album + 1 vidéo")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur messages à plusieurs liens: {e}")
+        return False
+
+def test_playlist_pipeline():
+    """Teste le traitement en pipeline des éléments d'une playlist"""
+    print("\n📃 Test des playlists...")
+    
+    try:
+        import tempfile
+        from config import PLAYLIST_PREFETCH
+        
+        class FakeMessage:
+            chat_id = 42
+            message_id = 1
+            text = None
+            
+            async def edit_text(self, text, parse_mode=None):
+                self.text = text
+        
+        class FakeBot:
+            def __init__(self):
+                self.groups = []
+                self.deleted = []
+            
+            async def send_media_group(self, chat_id, media):
+                self.groups.append([item.media for item in media])
+            
+            async def send_video(self, chat_id, video, **kwargs):
+                self.groups.append([video])
+            
+            async def delete_message(self, chat_id, message_id):
+                self.deleted.append(message_id)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = make_test_bot(tmp_dir)
+            running = {'now': 0, 'max': 0}
+            pulled = []
+            
+            async def fake_iter_playlist(url):
+                for i in range(12):
+                    pulled.append(i)
+                    yield {'url': f"https://example.com/p{i}", 'title': f"p{i}"}
+            
+            async def fake_run_job(tg_bot, chat_id, user_id, url, job_id, status_message, deliver=True, **kwargs):
+                assert not deliver, "Les éléments d'une playlist doivent être déposés"
+                index = int(url.rsplit('p', 1)[-1])
+                running['now'] += 1
+                running['max'] = max(running['max'], running['now'])
+                # Durées décroissantes: les éléments se terminent dans le désordre
+                await asyncio.sleep(0.05 * (3 - index % 3))
+                running['now'] -= 1
+                return {'file_id': f'F{index}', 'name': f'p{index}.mp4', 'size': 1024, 'staged': [chat_id, 500 + index]}
+            
+            bot.downloader.iter_playlist = fake_iter_playlist
+            bot._run_job = fake_run_job
+            status_message = FakeMessage()
+            fake_bot = FakeBot()
+            
+            async def run_playlist():
+                try:
+                    await bot._run_playlist(fake_bot, 42, 7, "https://example.com/list", "Ma playlist", status_message)
+                finally:
+                    await bot.progress_renderer.stop()
+            
+            try:
+                asyncio.run(run_playlist())
+            finally:
+                bot.journal.close()
+                bot.file_id_cache.close()
+        
+        assert fake_bot.groups == [[f'F{i}' for i in range(10)], ['F10', 'F11']], f"Albums: {fake_bot.groups}"
+        assert sorted(fake_bot.deleted) == [500 + i for i in range(12)], "Messages de dépôt non supprimés"
+        assert 1 < running['max'] <= PLAYLIST_PREFETCH + 1, f"Fenêtre d'avance non respectée: {running['max']}"
+        assert "12/12 vidéos envoyées" in status_message.text, status_message.text
+
+        # Deux demandes simultanées de la même playlist: chacune la reçoit, les éléments sont partagés
+        from types import SimpleNamespace
+        from scheduler import DownloadScheduler
+        from download_executor import DownloadExecutor
+        from postprocessor import PostProcessor
+        from video_downloader import PlaylistError
+
+        class ChatMessage:
+            def __init__(self, chat_id):
+                self.chat_id = chat_id
+                self.message_id = chat_id
+                self.text = None
+
+            async def edit_text(self, text, parse_mode=None):
+                self.text = text
+
+        class ChatBot:
+            def __init__(self):
+                self.albums = {}
+                self.deleted = []
+
+            async def send_media_group(self, chat_id, media):
+                self.albums.setdefault(chat_id, []).append([item.media for item in media])
+
+            async def delete_message(self, chat_id, message_id):
+                self.deleted.append(message_id)
+
+        class FakeUploader:
+            async def send_video(self, bot, chat_id, file_path, progress=None, **fields):
+                index = int(os.path.basename(file_path)[1:-4])
+                return SimpleNamespace(message_id=500 + index, video=SimpleNamespace(file_id=f'F{index}'),
+                                       document=None)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = make_test_bot(tmp_dir)
+            bot.scheduler = DownloadScheduler(max_concurrent=4, max_per_user=1)
+            bot.uploader = FakeUploader()
+            bot.postprocessor = PostProcessor(DownloadExecutor(max_workers=2, mode='thread', name='postprocess'))
+            downloads = []
+            parent_rows = []
+
+            async def fake_download_video(url, user_id, job_id=None, **kwargs):
+                await asyncio.sleep(0.05)
+                if url.endswith('/list'):
+                    raise PlaylistError(url, "Ma playlist")
+                downloads.append(url)
+                await asyncio.sleep(0.05)
+                path = os.path.join(tmp_dir, f"p{url.rsplit('p', 1)[-1]}.mp4")
+                with open(path, 'wb') as f:
+                    f.write(b'\0' * 1024)
+                return path
+
+            async def shared_iter_playlist(url):
+                # L'entrée de la playlist a quitté le journal avant l'énumération
+                parent_rows.append(bot.journal.get(1001))
+                for i in range(3):
+                    yield {'url': f"https://example.com/p{i}", 'title': f"p{i}"}
+
+            bot.downloader.download_video = fake_download_video
+            bot.downloader.iter_playlist = shared_iter_playlist
+            chat_bot = ChatBot()
+
+            async def run_both():
+                try:
+                    return await asyncio.gather(
+                        bot._run_job(chat_bot, 42, 7, "https://example.com/list", 1001, ChatMessage(42)),
+                        bot._run_job(chat_bot, 43, 8, "https://example.com/list", 1002, ChatMessage(43)),
+                    )
+                finally:
+                    await bot.progress_renderer.stop()
+
+            try:
+                results = asyncio.run(run_both())
+                pending = bot.journal.pending()
+            finally:
+                bot.postprocessor.shutdown()
+                bot.journal.close()
+                bot.file_id_cache.close()
+
+        assert results == [{'playlist': True}, {'playlist': True}], f"Résultats: {results}"
+        expected = [[f'F{i}' for i in range(3)]]
+        assert chat_bot.albums == {42: expected, 43: expected}, f"Albums: {chat_bot.albums}"
+        assert sorted(downloads) == [f"https://example.com/p{i}" for i in range(3)], f"Téléchargements: {downloads}"
+        assert parent_rows == [None, None] and pending == [], "Playlist laissée au journal"
+
+        print(f"✅ 12 éléments livrés dans l'ordre (au plus {running['max']} en cours), 2 albums; "
+              "playlist partagée entre 2 demandes")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur playlists: {e}")
+        return False
+
+def test_url_utils():
+    """Teste l'extraction, la forme canonique et la pré-sélection des liens"""
+    print("\n🔗 Test des liens...")
+    
+    try:
+        import time
+        from url_utils import extract_urls, canonicalize_url, normalize_url, ExtractorMatcher
+        
+        # Tirets et ponctuation: le lien entier, sans la ponctuation qui le suit
+        text = ("Regarde (https://example.com/v-1?id=a-b_c&x=%20) puis https://vimeo.com/123456789, "
+                "et https://www.youtube.com/watch?v=dQw4w9WgXcQ. Pas ceci: ftp://example.com")
+        assert extract_urls(text) == [
+            "https://example.com/v-1?id=a-b_c&x=%20",
+            "https://vimeo.com/123456789",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        ], extract_urls(text)
+        assert extract_urls("https://fr.wikipedia.org/wiki/Test_(film)") == ["https://fr.wikipedia.org/wiki/Test_(film)"]
+        
+        # Liens courts, hôtes mobiles et paramètres de suivi
+        canonical = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        assert canonicalize_url("https://youtu.be/dQw4w9WgXcQ?si=abc") == canonical
+        assert canonicalize_url("https://m.youtube.com/shorts/dQw4w9WgXcQ?feature=share") == canonical
+        assert canonicalize_url("HTTPS://YouTube.com/watch?v=dQw4w9WgXcQ&utm_source=x#t") == canonical
+        assert canonicalize_url("https://youtu.be/dQw4w9WgXcQ?t=42") == canonical + "&t=42"
+        assert canonicalize_url("https://example.com:443/v?b=2&fbclid=z&a=1") == "https://example.com/v?b=2&a=1"
+        assert normalize_url("https://youtu.be/dQw4w9WgXcQ") == normalize_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=x")
+        # Paramètres conservés octet pour octet (liens signés)
+        signed = "https://cdn.example.com/v.mp4?Policy=eyJ=&t=1,2:3&x&Signature=a%2Bb"
+        assert canonicalize_url(signed + "&utm_source=x") == signed, canonicalize_url(signed + "&utm_source=x")
+        
+        # Le lien est téléchargé tel qu'envoyé, les doublons écartés selon leur forme normalisée
+        import tempfile
+        from types import SimpleNamespace
+        
+        class FakeMessage:
+            def __init__(self, text):
+                self.text = text
+                self.replies = []
+            
+            async def reply_text(self, text, parse_mode=None):
+                self.replies.append(text)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = make_test_bot(tmp_dir)
+            fetched = []
+            
+            async def fake_process_video_url(update, context, url, user_id):
+                fetched.append(url)
+            
+            bot._process_video_url = fake_process_video_url
+            update = SimpleNamespace(message=FakeMessage(f"{signed} {signed}&fbclid=z"),
+                                     effective_user=SimpleNamespace(id=7), effective_chat=SimpleNamespace(id=42))
+            try:
+                asyncio.run(bot.handle_url_message(update, SimpleNamespace(bot=None)))
+            finally:
+                bot.journal.close()
+                bot.file_id_cache.close()
+        assert fetched == [signed], f"Lien modifié avant téléchargement: {fetched}"
+        
+        # Pré-sélection hors ligne de l'extracteur (tout lien valide accepté avant le chargement)
+        matcher = ExtractorMatcher(allow_generic=False)
+        assert matcher.is_supported("https://example.com/page") and not matcher.is_supported("not_a_url")
+        assert not matcher.get_stats()['misses'], "Extracteurs parcourus avant leur chargement"
+        matcher.warm_up()
+        assert matcher.ready
+        assert matcher.match("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == 'Youtube'
+        assert matcher.is_supported("https://vimeo.com/123456789")
+        assert not matcher.is_supported("https://www.disneyplus.com/video/abc"), "Site DRM accepté"
+        assert not matcher.is_supported("https://example.com/page"), "Extracteur générique accepté"
+        assert matcher.is_supported("https://example.com/video.mp4"), "Lien direct refusé"
+        generic = ExtractorMatcher(allow_generic=True)
+        generic.warm_up()
+        assert generic.is_supported("https://example.com/page")
+        
+        # Une page du site sans extracteur dédié ne masque pas les vidéos du même domaine
+        assert matcher.match("https://streamable.com/") == 'Generic'
+        assert matcher.match("https://streamable.com/abc12") == 'Streamable'
+        assert matcher.is_supported("https://streamable.com/abc13")
+        
+        # Domaine déjà vu et liens invalides: sans parcourir les extracteurs
+        misses = matcher.misses
+        started = time.perf_counter()
+        for i in range(1000):
+            assert matcher.match(f"https://www.youtube.com/watch?v=dQw4w9WgX{i:02d}"[:43]) == 'Youtube'
+            assert not matcher.is_supported("not_a_url")
+        elapsed = time.perf_counter() - started
+        assert matcher.misses == misses, "Domaine connu non mémorisé"
+        assert elapsed < 0.5, f"Pré-sélection trop lente ({elapsed:.3f}s)"
+        
+        print(f"✅ Liens extraits et canoniques, 2000 vérifications en {elapsed * 1000:.1f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur liens: {e}")
+        return False
+
+def test_startup_imports():
+    """Teste le chargement différé des modules lourds au démarrage"""
+    print("\n🚀 Test du temps de démarrage...")
+    
+    try:
+        from startup_benchmark import measure_imports
+        
+        # Processus neuf, sans BOT_TOKEN: l'import de la configuration ne doit pas échouer
+        report = measure_imports('main', runs=1)
+        assert not report['deferred'], f"Modules lourds chargés au démarrage: {report['deferred']}"
+        
+        # yt-dlp reste disponible à la première utilisation
+        from url_utils import ExtractorMatcher
+        assert ExtractorMatcher().match("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == 'Youtube'
+        
+        print(f"✅ Import du point d'entrée en {report['median_ms']:.1f} ms, sans yt-dlp ni aiohttp")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur temps de démarrage: {e}")
+        return False
+
 def test_dependencies():
     """Teste les dépendances"""
     print("\n📦 Test des dépendances...")
@@ -152,6 +1778,29 @@ def main():
         ("Configuration", test_config),
         ("Module de téléchargement", test_video_downloader),
         ("Module bot Telegram", test_telegram_bot),
+        ("Chemin de sortie", test_output_path),
+        ("Pool de téléchargement", test_download_executor),
+        ("Planificateur", test_scheduler),
+        ("Cache d'informations", test_info_cache),
+        ("Cache de file_id", test_file_id_cache),
+        ("Regroupement des demandes", test_inflight_registry),
+        ("Progression par tâche", test_download_progress),
+        ("Moteur de rendu", test_progress_renderer),
+        ("Envoi en flux", test_streaming_upload),
+        ("Choix de format", test_format_selector),
+        ("Garde-fou de taille", test_size_guard),
+        ("Téléchargement direct", test_direct_downloader),
+        ("Reprise des téléchargements", test_job_journal),
+        ("Post-traitement", test_postprocessor),
+        ("Métadonnées vidéo", test_media_info),
+        ("Découpage en parties", test_video_splitting),
+        ("Espace disque", test_storage_manager),
+        ("Mode webhook", test_webhook_mode),
+        ("File de tâches et workers", test_job_queue_workers),
+        ("Messages à plusieurs liens", test_multi_url_batch),
+        ("Playlists", test_playlist_pipeline),
+        ("Liens", test_url_utils),
+        ("Temps de démarrage", test_startup_imports),
         ("Dépendances", test_dependencies),
     ]
     
@@ -0,0 +1,137 @@
+import io
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+from config import UPLOAD_READ_TIMEOUT, LOCAL_MODE
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class _ProgressReader(io.BufferedReader):
+    """Lecteur de fichier qui signale le nombre d'octets déjà lus"""
+
+    def __init__(self, path: str, callback: Optional[Callable[[int], None]] = None):
+        super().__init__(io.FileIO(path, 'rb'))
+        self._callback = callback
+        self.sent = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = super().read(size)
+        self.sent += len(data)
+        if self._callback:
+            try:
+                self._callback(self.sent)
+            except Exception as e:
+                logger.error(f"Erreur dans le suivi de l'envoi: {e}")
+        return data
+
+
+class StreamingUploader:
+    """
+    Envoi de vidéos en flux depuis le disque
+
+    Le corps multipart est produit par morceaux à partir du fichier, si bien
+    que la mémoire utilisée par un envoi ne dépend pas de la taille de la
+    vidéo. Les requêtes visent l'URL de l'API configurée sur le bot.
+
+    En mode local (serveur Bot API auto-hébergé), seul le chemin file://
+    est transmis: le serveur lit le fichier directement sur le disque.
+    """
+
+    def __init__(self, read_timeout: float = UPLOAD_READ_TIMEOUT, local_mode: bool = LOCAL_MODE):
+        self.read_timeout = read_timeout
+        self.local_mode = local_mode
+        self._session: Optional['aiohttp.ClientSession'] = None
+
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """Retourne la session HTTP partagée (aiohttp n'est chargé qu'au premier envoi)"""
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=self.read_timeout)
+            self._session = aiohttp.ClientSession(timeout=timeout)
+        return self._session
+
+    async def send_video(self, bot, chat_id: int, file_path: str, progress: Optional[Callable[[int, int], None]] = None,
+                         thumbnail: Optional[str] = None, **fields: Any) -> Message:
+        """
+        Envoie une vidéo en lisant le fichier par morceaux
+
+        Args:
+            bot: Bot Telegram (fournit l'URL de l'API)
+            chat_id: Chat destinataire
+            file_path: Chemin de la vidéo
+            progress: Callback appelé avec (octets envoyés, taille totale)
+            thumbnail: Chemin d'une miniature JPEG (optionnel)
+            **fields: Autres paramètres de sendVideo (caption, duration, width, ...)
+
+        Returns:
+            Le message envoyé
+        """
+        total = os.path.getsize(file_path)
+        file_name = os.path.basename(file_path)
+        content_type = mimetypes.guess_type(file_name)[0] or 'video/mp4'
+
+        import aiohttp
+
+        form = aiohttp.FormData()
+        form.add_field('chat_id', str(chat_id))
+        for name, value in fields.items():
+            if value is not None:
+                form.add_field(name, str(value).lower() if isinstance(value, bool) else str(value))
+
+        session = await self._get_session()
+        if self.local_mode:
+            # Le serveur local lit le fichier lui-même: aucun octet ne transite ici
+            form.add_field('video', Path(file_path).absolute().as_uri())
+            if thumbnail:
+                form.add_field('thumbnail', Path(thumbnail).absolute().as_uri())
+            async with session.post(f"{bot.base_url}/sendVideo", data=form) as response:
+                data = await self._read_response(response)
+            if progress:
+                progress(total, total)
+        else:
+            callback = (lambda sent: progress(sent, total)) if progress else None
+            if thumbnail:
+                # Les miniatures sont toujours envoyées comme un nouveau fichier joint
+                with open(thumbnail, 'rb') as f:
+                    form.add_field('thumbnail_file', f.read(), filename='thumbnail.jpg', content_type='image/jpeg')
+                form.add_field('thumbnail', 'attach://thumbnail_file')
+            with _ProgressReader(file_path, callback) as reader:
+                form.add_field('video', reader, filename=file_name, content_type=content_type)
+                async with session.post(f"{bot.base_url}/sendVideo", data=form) as response:
+                    data = await self._read_response(response)
+
+        if not data.get('ok'):
+            description = data.get('description', f"Erreur HTTP {response.status}")
+            parameters = data.get('parameters') or {}
+            if 'retry_after' in parameters:
+                raise RetryAfter(parameters['retry_after'])
+            if response.status == 400:
+                raise BadRequest(description)
+            raise TelegramError(description)
+
+        logger.info(f"Vidéo envoyée: {file_name} ({total / 1024 / 1024:.2f} MB)")
+        return Message.de_json(data['result'], bot)
+
+    async def _read_response(self, response: 'aiohttp.ClientResponse') -> dict:
+        """Décode la réponse JSON de l'API (ou une erreur si elle n'en est pas)"""
+        try:
+            return await response.json(content_type=None)
+        except ValueError:
+            return {'ok': False, 'description': f"Erreur HTTP {response.status}"}
+
+    async def close(self):
+        """Ferme la session HTTP"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
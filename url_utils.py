@@ -0,0 +1,256 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote_plus
+
+from config import SUPPORTED_FORMATS, ALLOW_GENERIC_EXTRACTOR, EXTRACTOR_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Validation d'une URL isolée
+URL_PATTERN = re.compile(
+    r'^https?://'  # http:// ou https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,63}\.?|'  # domaine
+    r'localhost|'  # localhost
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP
+    r'(?::\d+)?'  # port optionnel
+    r'(?:/?|[/?#]\S+)$', re.IGNORECASE)
+
+# URLs dans un texte: jusqu'au premier blanc ou délimiteur, ponctuation finale retirée ensuite
+TEXT_URL_PATTERN = re.compile(r'https?://[^\s<>"\'`]+', re.IGNORECASE)
+TRAILING_PUNCTUATION = '.,;:!?\'"»…'
+
+# Paramètres de suivi retirés des liens (tous sites, puis par site)
+TRACKING_PREFIXES = ('utm_',)
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', 'igshid', 'igsh', '_ga', 'ref_src',
+})
+HOST_TRACKING_PARAMS = {
+    'www.youtube.com': frozenset({'si', 'feature', 'pp', 'ab_channel'}),
+    'twitter.com': frozenset({'s', 't', 'ref_url'}),
+    'x.com': frozenset({'s', 't', 'ref_url'}),
+    'www.instagram.com': frozenset({'img_index'}),
+    'www.tiktok.com': frozenset({'is_from_webapp', 'sender_device', 'web_id', '_r', '_t'}),
+}
+
+# Hôtes équivalents (versions mobiles, sans www)
+HOST_ALIASES = {
+    'youtube.com': 'www.youtube.com',
+    'm.youtube.com': 'www.youtube.com',
+    'mobile.twitter.com': 'twitter.com',
+    'www.twitter.com': 'twitter.com',
+    'mobile.x.com': 'x.com',
+    'www.x.com': 'x.com',
+    'instagram.com': 'www.instagram.com',
+    'm.tiktok.com': 'www.tiktok.com',
+    'tiktok.com': 'www.tiktok.com',
+    'm.vk.com': 'vk.com',
+    'm.dailymotion.com': 'www.dailymotion.com',
+    'dailymotion.com': 'www.dailymotion.com',
+}
+
+# Liens courts dont la cible se déduit de l'URL (sans requête réseau)
+YOUTU_BE_PATTERN = re.compile(r'^/([\w-]{11})/?$')
+YOUTUBE_SHORTS_PATTERN = re.compile(r'^/(?:shorts|live|embed|v)/([\w-]{11})/?$')
+DAI_LY_PATTERN = re.compile(r'^/(\w+)/?$')
+
+
+def is_valid_url(url: str) -> bool:
+    """Vérifie si l'URL est valide (http ou https, hôte bien formé)"""
+    return URL_PATTERN.match(url) is not None
+
+
+def extract_urls(text: str) -> List[str]:
+    """Extrait les URLs valides d'un texte, dans l'ordre"""
+    urls = []
+    for url in TEXT_URL_PATTERN.findall(text or ''):
+        while url:
+            stripped = url.rstrip(TRAILING_PUNCTUATION)
+            # Parenthèse fermante qui entoure le lien et non qui lui appartient
+            if stripped.endswith(')') and stripped.count('(') < stripped.count(')'):
+                stripped = stripped[:-1]
+            if stripped == url:
+                break
+            url = stripped
+        if is_valid_url(url):
+            urls.append(url)
+    return urls
+
+
+def _expand_short_link(host: str, path: str, query: list) -> Optional[tuple]:
+    """Cible (hôte, chemin, paramètres bruts) d'un lien court ou d'une variante de page, ou None"""
+    if host == 'youtu.be':
+        match = YOUTU_BE_PATTERN.match(path)
+        if match:
+            return 'www.youtube.com', '/watch', [f"v={match.group(1)}"] + query
+    elif host == 'www.youtube.com':
+        match = YOUTUBE_SHORTS_PATTERN.match(path)
+        if match:
+            return host, '/watch', [f"v={match.group(1)}"] + query
+    elif host == 'dai.ly':
+        match = DAI_LY_PATTERN.match(path)
+        if match:
+            return 'www.dailymotion.com', f'/video/{match.group(1)}', query
+    return None
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Forme canonique d'un lien, sans requête réseau
+
+    Schéma et hôte en minuscules, port par défaut, fragment et paramètres de
+    suivi retirés, hôtes mobiles et liens courts (youtu.be, shorts, dai.ly)
+    ramenés à la page de la vidéo. Les autres paramètres sont conservés
+    octet pour octet et dans leur ordre (liens signés).
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    host = HOST_ALIASES.get(host, host)
+    query = [segment for segment in parts.query.split('&') if segment]
+
+    expanded = _expand_short_link(host, parts.path, query)
+    path = parts.path
+    if expanded:
+        host, path, query = expanded
+
+    host_params = HOST_TRACKING_PARAMS.get(host, frozenset())
+    kept = []
+    for segment in query:
+        key = unquote_plus(segment.split('=', 1)[0])
+        if key not in TRACKING_PARAMS and key not in host_params and not key.startswith(TRACKING_PREFIXES):
+            kept.append(segment)
+
+    netloc = host
+    if parts.port and parts.port != {'http': 80, 'https': 443}.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    return urlunsplit((scheme, netloc, path or '/', '&'.join(kept), ''))
+
+
+def normalize_url(url: str) -> str:
+    """Normalise une URL pour servir de clé de cache (forme canonique, paramètres triés)"""
+    parts = urlsplit(canonicalize_url(url))
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme, parts.netloc, path, query, ''))
+
+
+def is_direct_media_url(url: str) -> bool:
+    """Indique si l'URL désigne un fichier vidéo par son extension"""
+    path = urlsplit(url).path.lower()
+    return path.endswith(tuple(SUPPORTED_FORMATS))
+
+
+class ExtractorMatcher:
+    """
+    Pré-sélection hors ligne de l'extracteur yt-dlp d'un lien
+
+    Compare le lien aux motifs des extracteurs (suitable()) sans requête
+    réseau: un lien que yt-dlp sait non supporté (DRM, sites refusés) est
+    écarté avant toute extraction. Les extracteurs dédiés trouvés sont
+    mémorisés par domaine: les liens suivants d'un même site ne parcourent
+    pas la liste des ~1800 extracteurs. Un lien qu'aucun extracteur mémorisé
+    n'accepte (autre page du site, extracteur générique) la parcourt.
+    """
+
+    GENERIC = 'Generic'
+
+    def __init__(self, allow_generic: bool = ALLOW_GENERIC_EXTRACTOR, max_domains: int = EXTRACTOR_CACHE_SIZE):
+        self.allow_generic = allow_generic
+        self.max_domains = max_domains
+        self._extractors: Optional[list] = None
+        self._unsupported: frozenset = frozenset()  # clés des extracteurs de sites refusés par yt-dlp
+        # domaine -> extracteurs dédiés déjà reconnus
+        self._domains: 'OrderedDict[str, list]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()  # extracteurs chargés et motifs compilés
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ready(self) -> bool:
+        """Indique si warm_up() est terminé"""
+        return self._ready.is_set()
+
+    def warm_up(self):
+        """Charge les extracteurs et compile leurs motifs (bloquant, à lancer dans un thread)"""
+        for extractor in self._load_extractors():
+            extractor.suitable('https://example.com/')
+        self._ready.set()
+
+    def _load_extractors(self) -> list:
+        if self._extractors is None:
+            with self._lock:
+                if self._extractors is None:
+                    from yt_dlp.extractor import gen_extractor_classes
+                    extractors = list(gen_extractor_classes())
+                    # Classes éventuellement paresseuses (lazy_extractors): comparer par nom
+                    self._unsupported = frozenset(
+                        extractor.ie_key() for extractor in extractors
+                        if any(base.__name__ == 'UnsupportedInfoExtractor' for base in extractor.__mro__[1:])
+                    )
+                    self._extractors = extractors
+        return self._extractors
+
+    def _scan(self, url: str):
+        """Premier extracteur qui accepte le lien (l'extracteur générique en dernier)"""
+        for extractor in self._load_extractors():
+            if extractor.suitable(url):
+                return extractor
+        return None
+
+    def match(self, url: str) -> Optional[str]:
+        """
+        Extracteur qui traitera le lien
+
+        Returns:
+            La clé de l'extracteur (GENERIC si aucun n'est dédié au site), ou
+            None si le lien est invalide ou que yt-dlp le sait non supporté
+        """
+        if not is_valid_url(url):
+            return None
+        domain = (urlsplit(url).hostname or '').lower()
+
+        with self._lock:
+            known = list(self._domains.get(domain, ()))
+            if known:
+                self._domains.move_to_end(domain)
+        for extractor in known:
+            if extractor.suitable(url):
+                self.hits += 1
+                return None if extractor.ie_key() in self._unsupported else extractor.ie_key()
+
+        # Domaine inconnu ou lien qu'aucun extracteur mémorisé n'accepte
+        self.misses += 1
+        extractor = self._scan(url)
+        if extractor is not None and extractor.ie_key() != self.GENERIC:
+            with self._lock:
+                extractors = self._domains.setdefault(domain, [])
+                if extractor not in extractors:
+                    extractors.append(extractor)
+                self._domains.move_to_end(domain)
+                while len(self._domains) > self.max_domains:
+                    self._domains.popitem(last=False)
+
+        if extractor is None or extractor.ie_key() in self._unsupported:
+            return None
+        return extractor.ie_key()
+
+    def is_supported(self, url: str) -> bool:
+        """
+        Indique, sans requête réseau, si le lien peut être téléchargé
+
+        Ne bloque pas pendant warm_up(): tant que les extracteurs ne sont pas
+        prêts, tout lien valide est accepté (yt-dlp tranchera à l'extraction).
+        """
+        if not is_valid_url(url):
+            return False
+        if is_direct_media_url(url) or not self.ready:
+            return True
+        key = self.match(url)
+        return key is not None and (self.allow_generic or key != self.GENERIC)
+
+    def get_stats(self) -> dict:
+        return {'domains': len(self._domains), 'hits': self.hits, 'misses': self.misses}
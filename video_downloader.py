@@ -1,60 +1,147 @@
 import os
+import copy
+import shutil
 import asyncio
-import yt_dlp
-import aiohttp
 import logging
-import time
-from typing import Optional, Callable, Dict, Any
-from config import DOWNLOAD_PATH, MAX_FILE_SIZE, SUPPORTED_FORMATS
+from typing import Optional, Callable, Dict, Any, Tuple, AsyncIterator
+from config import (
+    DOWNLOAD_PATH, MAX_FILE_SIZE, MAX_FILE_SIZE_MB, DOWNLOAD_MAX_SIZE, SUPPORTED_FORMATS, FRAGMENT_CONCURRENCY,
+    PLAYLIST_MAX_ITEMS,
+)
+from download_executor import DownloadExecutor
+from info_cache import InfoCache
+from progress import DownloadProgress
+from format_selector import select_format
+from size_guard import SizeGuard, FileTooLargeError
+from direct_downloader import DirectDownloader, NotDirectMediaError
+from job_journal import JobJournal
+from storage import StorageManager, InsufficientStorageError
+from url_utils import ExtractorMatcher, is_valid_url
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Types de résultats yt-dlp qui regroupent plusieurs vidéos
+PLAYLIST_TYPES = ('playlist', 'multi_video')
+
+
+class PlaylistError(Exception):
+    """L'URL désigne une playlist: ses éléments doivent être traités un par un"""
+
+    def __init__(self, url: str, title: Optional[str] = None):
+        super().__init__(url, title)
+        self.url = url
+        self.title = title
+
+    def __str__(self):
+        return f"Playlist: {self.title or self.url}"
+
+
+def _new_ytdlp(ydl_opts: dict):
+    """Crée un YoutubeDL (yt-dlp et ses extracteurs ne sont chargés qu'à la première utilisation)"""
+    import yt_dlp
+
+    return yt_dlp.YoutubeDL(ydl_opts)
+
+
+def _extract_info(url: str, ydl_opts: dict) -> Dict[str, Any]:
+    """Extrait les informations d'une vidéo sans la télécharger (dans un travailleur du pool)"""
+    with _new_ytdlp(ydl_opts) as ydl:
+        return ydl.sanitize_info(ydl.extract_info(url, download=False))
+
+
+def _choose_format(info: Dict[str, Any], max_size: int,
+                   download_limit: Optional[int] = None) -> Tuple[Optional[str], int]:
+    """
+    Choisit le format à télécharger d'après les informations déjà extraites
+
+    Args:
+        info: Informations extraites par yt-dlp
+        max_size: Taille visée pour l'envoi
+        download_limit: Taille téléchargeable (plus grande si le fichier est réencodé ensuite)
+
+    Returns:
+        L'identifiant du format (None pour le sélecteur générique de yt-dlp)
+        et sa taille estimée (0 si inconnue)
+
+    Raises:
+        FileTooLargeError: si la vidéo dépasse la taille téléchargeable
+    """
+    download_limit = download_limit or max_size
+    title = info.get('title', 'video')
+    duration = info.get('duration', 0)
+
+    # Choisir le meilleur format compatible avec la taille maximale
+    choice = select_format(info, max_size)
+    if choice is not None:
+        filesize = choice.estimated_size
+    else:
+        filesize = info.get('filesize') or info.get('filesize_approx') or 0
+
+    logger.info(f"Titre: {title}")
+    logger.info(f"Durée: {duration} secondes")
+    logger.info(f"Taille estimée: {filesize / 1024 / 1024:.2f} MB")
+
+    # Vérifier la taille du fichier
+    if filesize > download_limit:
+        raise FileTooLargeError(filesize, download_limit)
+
+    return (choice.format_id if choice is not None else None), filesize or 0
+
+
+def _run_ytdlp(url: str, ydl_opts: dict, max_size: int, info: Dict[str, Any],
+               progress: Optional[Callable] = None, format_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Exécute yt-dlp de façon bloquante (dans un travailleur du pool)
+
+    Le téléchargement part des informations déjà extraites, avec le format
+    choisi au préalable. Les fichiers partiels présents dans le dossier de
+    sortie sont repris par yt-dlp.
+
+    Returns:
+        Le titre et le chemin de la vidéo
+
+    Raises:
+        FileTooLargeError: si la vidéo dépasse max_size pendant le téléchargement
+    """
+    # Le garde-fou de taille tourne dans le travailleur pour couper le transfert au plus tôt
+    ydl_opts = dict(ydl_opts)
+    ydl_opts['progress_hooks'] = [SizeGuard(max_size)]
+    if progress is not None:
+        ydl_opts['progress_hooks'].append(progress)
+    if format_id:
+        ydl_opts['format'] = format_id
+
+    logger.info(f"Début du téléchargement: {url}")
+
+    with _new_ytdlp(ydl_opts) as ydl:
+        processed = ydl.process_ie_result(copy.deepcopy(info), download=True)
+
+    return {'title': info.get('title', 'video'), 'filepath': _resolve_output_path(processed)}
+
+
+def _resolve_output_path(info: Dict[str, Any]) -> Optional[str]:
+    """Retrouve le chemin final du fichier à partir des informations de yt-dlp"""
+    for download in reversed(info.get('requested_downloads') or []):
+        path = download.get('filepath') or download.get('_filename')
+        if path:
+            return path
+    return info.get('filepath') or info.get('_filename')
+
+
 class VideoDownloader:
-    def __init__(self):
+    def __init__(self, executor: Optional[DownloadExecutor] = None, info_cache: Optional[InfoCache] = None,
+                 journal: Optional[JobJournal] = None, storage: Optional[StorageManager] = None):
         self.download_path = DOWNLOAD_PATH
-        os.makedirs(self.download_path, exist_ok=True)
-        self.download_progress = {}  # Pour stocker les informations de progression
-    
-    def _progress_hook(self, d):
-        """Hook pour suivre la progression du téléchargement"""
-        if d['status'] == 'downloading':
-            try:
-                downloaded = d.get('downloaded_bytes', 0)
-                total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-                
-                if total > 0:
-                    percentage = (downloaded / total) * 100
-                    speed = d.get('speed', 0)
-                    eta = d.get('eta', 0)
-                    
-                    # Calculer la vitesse en MB/s
-                    speed_mb = speed / 1024 / 1024 if speed else 0
-                    
-                    # Formater le temps restant
-                    eta_str = self._format_time(eta) if eta else "Calcul..."
-                    
-                    # Stocker les informations de progression
-                    progress_info = {
-                        'percentage': percentage,
-                        'downloaded_mb': downloaded / 1024 / 1024,
-                        'total_mb': total / 1024 / 1024,
-                        'speed_mb': speed_mb,
-                        'eta': eta_str,
-                        'eta_seconds': eta,
-                        'downloaded_bytes': downloaded,
-                        'total_bytes': total
-                    }
-                    
-                    # Stocker pour l'utilisateur actuel (si disponible)
-                    if hasattr(self, 'current_user_id'):
-                        self.download_progress[self.current_user_id] = progress_info
-                    
-                    logger.info(f"Progression: {percentage:.1f}% - Vitesse: {speed_mb:.2f} MB/s - Temps restant: {eta_str}")
-                    
-            except Exception as e:
-                logger.error(f"Erreur dans le suivi de progression: {e}")
+        self.storage = storage or StorageManager(self.download_path)  # Quota et espace libre des dossiers de travail
+        self.download_progress: Dict[Any, DownloadProgress] = {}  # Progression par tâche
+        self.executor = executor or DownloadExecutor()
+        self.info_cache = info_cache or InfoCache()
+        self.journal = journal  # Journal des tâches (reprise après redémarrage), optionnel
+        self.direct_downloader = DirectDownloader()
+        self.extractor_matcher = ExtractorMatcher()  # Liens non supportés écartés sans requête réseau
+        self.format_spec = f'best[filesize<{MAX_FILE_SIZE_MB}M]/best'
     
     def _format_time(self, seconds):
         """Formate le temps en secondes en format lisible"""
@@ -72,6 +159,49 @@ class VideoDownloader:
             minutes = int((seconds % 3600) // 60)
             return f"{hours}h {minutes}m"
     
+    async def iter_playlist(self, url: str, limit: int = PLAYLIST_MAX_ITEMS) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Énumère les éléments d'une playlist au fur et à mesure
+        
+        L'extraction est « à plat » (les éléments ne sont pas résolus) et
+        paresseuse: les pages de la playlist sont lues à mesure que les
+        éléments sont consommés, dans un thread (le générateur de yt-dlp ne
+        peut pas passer par un pool de processus).
+        
+        Yields:
+            url et titre de chaque élément, limit éléments au plus
+        """
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True,
+        }
+        ydl = await asyncio.to_thread(_new_ytdlp, ydl_opts)
+        try:
+            info = await asyncio.to_thread(ydl.extract_info, url, download=False, process=False)
+            # Suivre les redirections vers la playlist elle-même
+            for _ in range(3):
+                if info.get('_type') not in ('url', 'url_transparent'):
+                    break
+                info = await asyncio.to_thread(ydl.extract_info, info['url'], download=False, process=False)
+            
+            entries = iter(info.get('entries') or [])
+            count = 0
+            while count < limit:
+                entry = await asyncio.to_thread(next, entries, None)
+                if entry is None:
+                    break
+                if entry.get('_type') in PLAYLIST_TYPES:
+                    continue  # playlists imbriquées ignorées
+                entry_url = entry.get('webpage_url') or entry.get('url')
+                if not entry_url or not entry_url.startswith(('http://', 'https://')):
+                    continue
+                count += 1
+                yield {'url': entry_url, 'title': entry.get('title')}
+        finally:
+            ydl.close()
+    
     def _format_size(self, bytes_size):
         """Formate la taille en bytes en format lisible"""
         if bytes_size < 1024:
@@ -81,88 +211,236 @@ class VideoDownloader:
         else:
             return f"{bytes_size / 1024 / 1024:.1f} MB"
     
-    async def download_video(self, url: str, user_id: int = None, progress_callback: Optional[Callable] = None) -> Optional[str]:
+    async def download_video(self, url: str, user_id: int = None, progress_callback: Optional[Callable] = None,
+                             job_id: Any = None) -> Optional[str]:
         """
         Télécharge une vidéo depuis une URL avec suivi de progression
         
         Args:
             url: L'URL de la vidéo à télécharger
-            user_id: ID de l'utilisateur pour le suivi de progression
+            user_id: ID de l'utilisateur (clé de progression si job_id est absent)
             progress_callback: Fonction de callback pour le suivi de progression
+            job_id: Identifiant de la tâche pour le suivi de progression (et le journal)
             
         Returns:
             Le chemin du fichier téléchargé ou None si échec
+        
+        Raises:
+            FileTooLargeError: si la vidéo dépasse DOWNLOAD_MAX_SIZE (le fichier partiel est supprimé)
+            InsufficientStorageError: si l'espace disque ne se libère pas à temps
+            PlaylistError: si l'URL désigne une playlist
+        
+        Si la tâche figure déjà dans le journal (tâche interrompue), son
+        dossier de travail et son format sont réutilisés pour reprendre les
+        fichiers partiels au lieu de tout retélécharger.
         """
+        job_dir = None
+        downloaded_file = None
+        interrupted = False
+        entry = self.journal.get(job_id) if self.journal is not None and job_id is not None else None
+        
+        # Progression propre à cette tâche, libérée quelle que soit l'issue
+        progress_key = job_id if job_id is not None else user_id
+        progress = DownloadProgress(progress_key)
+        if progress_key is not None:
+            self.download_progress[progress_key] = progress
+        def hook(d):
+            progress.update(d)
+            if progress_callback:
+                progress_callback(d)
+        
         try:
-            # Stocker l'ID utilisateur pour le suivi
-            if user_id:
-                self.current_user_id = user_id
-                self.download_progress[user_id] = {}
-            
-            # Configuration de yt-dlp avec suivi de progression amélioré
-            ydl_opts = {
-                'outtmpl': os.path.join(self.download_path, '%(title)s.%(ext)s'),
-                'format': 'best[filesize<50M]/best',
-                'progress_hooks': [self._progress_hook],
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-            }
-            
             # Vérifier si l'URL est valide
-            if not self._is_valid_url(url):
+            if not is_valid_url(url):
                 logger.error(f"URL invalide: {url}")
                 return None
             
-            # Télécharger la vidéo
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                logger.info(f"Début du téléchargement: {url}")
-                
-                # Obtenir les informations de la vidéo
-                info = ydl.extract_info(url, download=False)
-                title = info.get('title', 'video')
-                duration = info.get('duration', 0)
-                filesize = info.get('filesize', 0)
-                
-                logger.info(f"Titre: {title}")
-                logger.info(f"Durée: {duration} secondes")
-                logger.info(f"Taille estimée: {filesize / 1024 / 1024:.2f} MB")
-                
-                # Vérifier la taille du fichier
-                if filesize > MAX_FILE_SIZE:
-                    logger.error(f"Fichier trop volumineux: {filesize / 1024 / 1024:.2f} MB")
-                    return None
-                
-                # Démarrer le téléchargement
-                ydl.download([url])
+            # Tâche reprise dont le fichier était déjà complet
+            if entry and entry.get('file_path') and os.path.exists(entry['file_path']):
+                downloaded_file = entry['file_path']
+                logger.info(f"Fichier déjà téléchargé avant l'interruption: {downloaded_file}")
+                return downloaded_file
+            
+            # Dossier de travail conservé lors d'une reprise
+            if entry and entry.get('job_dir') and os.path.isdir(entry['job_dir']):
+                job_dir = entry['job_dir']
+                self.storage.adopt(job_dir)
+                logger.info(f"Reprise de la tâche {job_id} dans {job_dir}")
+            
+            async def allocate(estimate: Optional[int]) -> str:
+                """Dossier de travail, créé une fois l'espace nécessaire réservé"""
+                nonlocal job_dir
+                if job_dir is None:
+                    job_dir = await self.storage.allocate(estimate)
+                    self._journal_update(job_id, job_dir=job_dir, status='downloading')
+                return job_dir
+            
+            # Lien direct: téléchargement natif sans passer par l'extracteur yt-dlp
+            if self.direct_downloader.is_direct_url(url):
+                import aiohttp  # déjà chargé par la sonde du lien direct
                 
-                # Trouver le fichier téléchargé
-                downloaded_file = self._find_downloaded_file(title)
+                try:
+                    probed = await self.direct_downloader.probe(url)
+                except (NotDirectMediaError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # Serveur injoignable ou page HTML: l'extracteur peut encore réussir
+                    logger.info(f"Lien non direct ou injoignable, passage par yt-dlp: {e}")
+                    probed = None
                 
-                if downloaded_file and os.path.exists(downloaded_file):
-                    file_size = os.path.getsize(downloaded_file)
-                    logger.info(f"Téléchargement terminé: {downloaded_file} ({file_size / 1024 / 1024:.2f} MB)")
-                    
-                    # Nettoyer les données de progression
-                    if user_id and user_id in self.download_progress:
-                        del self.download_progress[user_id]
-                    
-                    return downloaded_file
-                else:
-                    logger.error("Fichier téléchargé non trouvé")
-                    return None
+                if probed is not None:
+                    # Fichier trop volumineux: le refuser avant d'attendre de l'espace disque
+                    SizeGuard(DOWNLOAD_MAX_SIZE).check(0, probed[0])
+                    try:
+                        dest_dir = await allocate(probed[0])
+                        downloaded_file = await self.direct_downloader.download(
+                            url, dest_dir, DOWNLOAD_MAX_SIZE, progress=hook, probed=probed
+                        )
+                    except NotDirectMediaError as e:
+                        logger.info(f"Lien non direct, passage par yt-dlp: {e}")
+            
+            if downloaded_file is None:
+                format_id = entry.get('format_id') if entry else None
+                downloaded_file = await self._download_with_ytdlp(url, allocate, hook, job_id, format_id)
+            
+            if downloaded_file and not downloaded_file.lower().endswith(tuple(SUPPORTED_FORMATS)):
+                logger.error(f"Format de fichier non supporté: {downloaded_file}")
+                downloaded_file = None
+            
+            if downloaded_file and os.path.exists(downloaded_file):
+                file_size = os.path.getsize(downloaded_file)
+                logger.info(f"Téléchargement terminé: {downloaded_file} ({file_size / 1024 / 1024:.2f} MB)")
+                self._journal_update(job_id, file_path=downloaded_file, status='downloaded')
+                return downloaded_file
+            else:
+                logger.error("Fichier téléchargé non trouvé")
+                return None
                     
+        except (FileTooLargeError, InsufficientStorageError) as e:
+            logger.error(f"Téléchargement interrompu: {e}")
+            raise
+        except PlaylistError as e:
+            logger.info(f"{e}: traitement élément par élément")
+            raise
+        except asyncio.CancelledError:
+            # Arrêt du bot: les fichiers partiels sont gardés pour la reprise
+            interrupted = True
+            raise
         except Exception as e:
             logger.error(f"Erreur lors du téléchargement: {e}")
             return None
+        
+        finally:
+            if progress_key is not None and self.download_progress.get(progress_key) is progress:
+                del self.download_progress[progress_key]
+            
+            # Le fichier est désormais compté sur le disque: libérer la réservation
+            if job_dir:
+                self.storage.release(job_dir)
+            
+            # Supprimer le dossier de travail si aucun fichier n'est livré
+            if job_dir and not interrupted and not (downloaded_file and os.path.exists(downloaded_file)):
+                shutil.rmtree(job_dir, ignore_errors=True)
+                self.storage.forget(job_dir)
+    
+    async def _download_with_ytdlp(self, url: str, allocate: Callable, hook: Callable, job_id: Any = None,
+                                   format_id: Optional[str] = None) -> Optional[str]:
+        """Télécharge une vidéo avec yt-dlp dans le pool et retourne le chemin exact du fichier"""
+        # Configuration de yt-dlp (le hook est ajouté par le travailleur, le dossier une fois l'espace réservé)
+        ydl_opts = {
+            'format': self.format_spec,
+            'quiet': True,
+            'no_warnings': True,
+            # Une playlist est seulement détectée (premier élément, à plat), puis énumérée par iter_playlist
+            'extract_flat': 'in_playlist',
+            'playlist_items': '1',
+            # Lien vers une vidéo d'une playlist: la vidéo seule
+            'noplaylist': True,
+            # Fragments HLS/DASH récupérés en parallèle
+            'concurrent_fragment_downloads': FRAGMENT_CONCURRENCY,
+            # Reprendre les fichiers partiels d'une tâche interrompue
+            'continuedl': True,
+        }
+        
+        cached_info = self.info_cache.get(url)
+        try:
+            return await self._run_ytdlp_job(url, ydl_opts, allocate, hook, cached_info, job_id, format_id)
+        except (FileTooLargeError, InsufficientStorageError, PlaylistError):
+            raise
+        except Exception as e:
+            if cached_info is None:
+                raise
+            # Les URLs de formats en cache ont pu expirer: nouvelle extraction
+            logger.warning(f"Échec avec les informations en cache, nouvelle extraction: {e}")
+            self.info_cache.invalidate(url)
+            return await self._run_ytdlp_job(url, ydl_opts, allocate, hook, None, job_id, format_id)
+    
+    async def _run_ytdlp_job(self, url: str, ydl_opts: dict, allocate: Callable, hook: Callable,
+                             info: Optional[Dict[str, Any]], job_id: Any, format_id: Optional[str]) -> Optional[str]:
+        """Extrait (ou réutilise) les informations, fixe le format puis télécharge dans le pool"""
+        # Une seule extraction: les informations servent au choix du format puis au téléchargement
+        if info is None:
+            info = await self.executor.submit(_extract_info, url, ydl_opts)
+            if info.get('_type') in PLAYLIST_TYPES:
+                raise PlaylistError(url, info.get('title'))
+            self.info_cache.put(url, info)
+        else:
+            logger.info(f"Informations réutilisées depuis le cache: {url}")
+        
+        # Le format est choisi une fois et journalisé: une reprise télécharge le même flux
+        estimate = None
+        if format_id is None:
+            format_id, estimate = _choose_format(info, MAX_FILE_SIZE, DOWNLOAD_MAX_SIZE)
+            self._journal_update(job_id, format_id=format_id)
+        
+        # Réserver l'espace disque avant de télécharger
+        job_dir = await allocate(estimate)
+        ydl_opts = dict(ydl_opts, outtmpl=os.path.join(job_dir, '%(title).150B.%(ext)s'))
+        
+        # Télécharger la vidéo dans le pool sans bloquer la boucle asyncio
+        result = await self.executor.submit(
+            _run_ytdlp, url, ydl_opts, DOWNLOAD_MAX_SIZE, info, progress=hook, format_id=format_id
+        )
+        if not result:
+            return None
+        
+        # Chemin exact du fichier produit par yt-dlp
+        return result['filepath']
+    
+    def _journal_update(self, job_id: Any, **fields: Any):
+        """Enregistre l'avancement d'une tâche dans le journal (s'il y en a un)"""
+        if self.journal is not None and job_id is not None:
+            self.journal.update(job_id, **fields)
     
-    def get_progress(self, user_id: int) -> Dict[str, Any]:
-        """Obtient les informations de progression pour un utilisateur"""
-        return self.download_progress.get(user_id, {})
+    def get_progress(self, job_id: Any) -> Dict[str, Any]:
+        """Obtient les informations de progression d'une tâche"""
+        progress = self.download_progress.get(job_id)
+        if progress is None or not progress.started or progress.total_bytes <= 0:
+            return {}
+        
+        eta = progress.eta
+        return {
+            'percentage': progress.percentage,
+            'downloaded_mb': progress.downloaded_bytes / 1024 / 1024,
+            'total_mb': progress.total_bytes / 1024 / 1024,
+            'speed_mb': progress.speed / 1024 / 1024,
+            'eta': self._format_time(eta) if eta else "Calcul...",
+            'eta_seconds': eta,
+            'downloaded_bytes': progress.downloaded_bytes,
+            'total_bytes': progress.total_bytes,
+            'fragment_index': progress.fragment_index,
+            'fragment_count': progress.fragment_count
+        }
+    
+    @property
+    def total_speed(self) -> float:
+        """Débit agrégé de tous les téléchargements en cours (octets par seconde)"""
+        return sum(
+            progress.speed for progress in list(self.download_progress.values())
+            if progress.started and progress.status == 'downloading'
+        )
     
-    def format_progress_message(self, user_id: int) -> str:
+    def format_progress_message(self, job_id: Any) -> str:
         """Formate un message de progression pour l'affichage"""
-        progress = self.get_progress(user_id)
+        progress = self.get_progress(job_id)
         
         if not progress:
             return "⏳ Initialisation du téléchargement..."
@@ -185,41 +463,35 @@ class VideoDownloader:
         message += f"📁 <b>Téléchargé:</b> {downloaded_mb:.1f} MB / {total_mb:.1f} MB\n"
         message += f"⚡ <b>Vitesse:</b> {speed_mb:.2f} MB/s\n"
         message += f"⏱️ <b>Temps restant:</b> {eta}\n"
+        if progress.get('fragment_count'):
+            message += f"🧩 <b>Fragments:</b> {progress.get('fragment_index') or 0}/{progress['fragment_count']}\n"
         
         return message
     
-    def _is_valid_url(self, url: str) -> bool:
-        """Vérifie si l'URL est valide"""
-        import re
-        url_pattern = re.compile(
-            r'^https?://'  # http:// ou https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domaine
-            r'localhost|'  # localhost
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP
-            r'(?::\d+)?'  # port optionnel
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-        return url_pattern.match(url) is not None
+    def is_supported(self, url: str) -> bool:
+        """Indique, sans requête réseau, si le lien peut être téléchargé"""
+        return self.extractor_matcher.is_supported(url)
     
-    def _find_downloaded_file(self, title: str) -> Optional[str]:
-        """Trouve le fichier téléchargé dans le dossier de téléchargement"""
-        try:
-            for filename in os.listdir(self.download_path):
-                file_path = os.path.join(self.download_path, filename)
-                if os.path.isfile(file_path):
-                    # Vérifier si c'est un fichier vidéo supporté
-                    if any(filename.lower().endswith(ext) for ext in SUPPORTED_FORMATS):
-                        return file_path
-            return None
-        except Exception as e:
-            logger.error(f"Erreur lors de la recherche du fichier: {e}")
-            return None
+    def shutdown(self):
+        """Arrête le pool de téléchargement"""
+        self.executor.shutdown(wait=False)
+    
+    async def close(self):
+        """Ferme la session HTTP et arrête le pool de téléchargement"""
+        await self.direct_downloader.close()
+        self.shutdown()
     
     async def cleanup_file(self, file_path: str):
-        """Supprime un fichier téléchargé"""
+        """Supprime un fichier téléchargé et son dossier de travail"""
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
                 logger.info(f"Fichier supprimé: {file_path}")
+            
+            job_dir = os.path.dirname(os.path.abspath(file_path))
+            if self.storage.is_job_dir(job_dir):
+                shutil.rmtree(job_dir, ignore_errors=True)
+                self.storage.forget(job_dir)
         except Exception as e:
             logger.error(f"Erreur lors de la suppression du fichier: {e}")
     
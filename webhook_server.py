@@ -0,0 +1,157 @@
+import asyncio
+import hmac
+import logging
+import secrets
+import signal
+from typing import Optional
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import Application
+
+logger = logging.getLogger(__name__)
+
+# En-tête envoyé par Telegram avec le secret_token de setWebhook
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """
+    Serveur HTTP asynchrone qui reçoit les mises à jour Telegram
+
+    Chaque requête POST sur le chemin du webhook est validée par son jeton
+    secret, décodée puis placée dans la file des mises à jour de
+    l'application. Un chemin de santé (GET /healthz) permet de placer le bot
+    derrière un répartiteur de charge.
+    """
+
+    def __init__(self, application: Application, listen: str, port: int, path: str = '/',
+                 secret_token: Optional[str] = None):
+        self.application = application
+        self.listen = listen
+        self.port = port
+        self.path = path or '/'
+        self.secret_token = secret_token
+        self._runner: Optional[web.AppRunner] = None
+
+    def _make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        app.router.add_get('/healthz', self._handle_health)
+        return app
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        """Valide et met en file une mise à jour"""
+        if self.secret_token:
+            received = request.headers.get(SECRET_HEADER, '')
+            if not hmac.compare_digest(received.encode(), self.secret_token.encode()):
+                logger.warning(f"Requête webhook refusée (jeton secret invalide) depuis {request.remote}")
+                return web.Response(status=403)
+
+        try:
+            data = await request.json()
+            update = Update.de_json(data, self.application.bot)
+        except Exception as e:
+            logger.warning(f"Mise à jour webhook illisible: {e}")
+            return web.Response(status=400)
+
+        await self.application.update_queue.put(update)
+        return web.Response(status=200)
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.Response(text='ok' if self.application.running else 'starting',
+                            status=200 if self.application.running else 503)
+
+    @property
+    def bound_port(self) -> Optional[int]:
+        """Port réellement écouté (utile avec le port 0)"""
+        if self._runner is None:
+            return None
+        for address in self._runner.addresses:
+            if isinstance(address, tuple):
+                return address[1]
+        return None
+
+    async def start(self):
+        """Démarre l'écoute HTTP"""
+        self._runner = web.AppRunner(self._make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.listen, self.port)
+        await site.start()
+        logger.info(f"Serveur webhook à l'écoute sur {self.listen}:{self.bound_port}{self.path}")
+
+    async def stop(self):
+        """Arrête l'écoute HTTP"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def run_webhook(application: Application, webhook_url: str, listen: str, port: int,
+                      secret_token: Optional[str] = None, stop_event: Optional[asyncio.Event] = None,
+                      drop_pending_updates: bool = False, delete_webhook: bool = True):
+    """
+    Fait tourner l'application en mode webhook jusqu'au signal d'arrêt
+
+    Reprend le cycle de vie de run_polling (initialize, post_init, start,
+    puis stop, post_stop, shutdown et post_shutdown) avec le serveur HTTP
+    ci-dessus à la place du long polling.
+
+    Args:
+        application: Application construite (handlers ajoutés)
+        webhook_url: URL publique déclarée à Telegram (son chemin est celui écouté)
+        listen: Adresse d'écoute locale
+        port: Port d'écoute local
+        secret_token: Jeton secret attendu dans chaque requête (généré si absent)
+        stop_event: Événement d'arrêt (SIGINT/SIGTERM par défaut)
+        drop_pending_updates: Ignorer les mises à jour en attente chez Telegram
+        delete_webhook: Retirer le webhook à l'arrêt, pour qu'un redémarrage en
+            long polling ne soit pas refusé (False si d'autres instances
+            partagent le webhook et continuent de le servir)
+    """
+    secret_token = secret_token or secrets.token_urlsafe(32)
+    server = WebhookServer(application, listen, port, urlsplit(webhook_url).path, secret_token)
+
+    if stop_event is None:
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    await application.initialize()
+    started = False
+    registered = False
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        started = True
+        await server.start()
+        await application.bot.set_webhook(
+            webhook_url, secret_token=secret_token, allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=drop_pending_updates
+        )
+        registered = True
+        logger.info(f"Webhook enregistré: {webhook_url}")
+        await stop_event.wait()
+    finally:
+        await server.stop()
+        if registered and delete_webhook:
+            # Les mises à jour reçues pendant l'arrêt restent en attente chez Telegram
+            try:
+                await application.bot.delete_webhook()
+                logger.info("Webhook retiré")
+            except TelegramError as e:
+                logger.warning(f"Webhook non retiré: {e}")
+        if started:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import signal
+import socket
+from typing import Any, Dict, Optional
+
+from telegram import Bot
+
+from config import BOT_TOKEN, LOCAL_BOT_API_URL, LOCAL_MODE, MAX_CONCURRENT_DOWNLOADS
+from job_journal import JobJournal
+from job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteStatusMessage:
+    """
+    Message de statut d'une tâche exécutée par un worker
+
+    Les modifications ne sont pas envoyées à Telegram: elles sont publiées
+    dans la file et appliquées par le frontal, qui garde seul la maîtrise
+    des budgets de modification des messages.
+    """
+
+    def __init__(self, queue: JobQueue, job_id: int, chat_id: int, message_id: int):
+        self.queue = queue
+        self.job_id = job_id
+        self.chat_id = chat_id
+        self.message_id = message_id
+
+    async def edit_text(self, text: str, parse_mode: Optional[str] = None, **kwargs):
+        await self.queue.publish(self.job_id, {'type': 'status', 'text': text})
+
+
+class DownloadWorker:
+    """
+    Worker de téléchargement alimenté par la file de tâches
+
+    Réserve des tâches dans la file (MAX_CONCURRENT_DOWNLOADS à la fois),
+    les exécute avec le pipeline du bot (téléchargement, post-traitement,
+    envoi à Telegram) et publie leur statut puis leur résultat. Plusieurs
+    workers, éventuellement sur d'autres machines, peuvent partager la
+    même file.
+    """
+
+    POLL_TIMEOUT = 5.0  # attente maximale d'une tâche avant de réinterroger la file
+
+    def __init__(self, queue: JobQueue, pipeline, worker_id: Optional[str] = None,
+                 concurrency: int = MAX_CONCURRENT_DOWNLOADS):
+        self.queue = queue
+        self.pipeline = pipeline  # VideoUploaderBot (méthode _run_job)
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = max(1, concurrency)
+        self.active: Dict[int, asyncio.Task] = {}
+
+    async def run(self, bot):
+        """Traite les tâches de la file jusqu'à l'annulation"""
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info(f"Worker {self.worker_id} démarré ({self.concurrency} tâches simultanées)")
+        try:
+            while True:
+                await slots.acquire()
+                job = await self.queue.claim(self.worker_id, self.POLL_TIMEOUT)
+                if job is None:
+                    slots.release()
+                    continue
+
+                task = asyncio.create_task(self._handle(bot, job))
+                self.active[job['job_id']] = task
+                task.add_done_callback(lambda _, job_id=job['job_id']: (self.active.pop(job_id, None), slots.release()))
+        finally:
+            # Arrêt du worker: les tâches en cours seront reprises à l'expiration de leur réservation
+            tasks = list(self.active.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"Worker {self.worker_id} arrêté")
+
+    async def _keep_alive(self, job_id: int):
+        """Prolonge la réservation tant que la tâche est en cours"""
+        while True:
+            await asyncio.sleep(self.queue.lease / 3)
+            try:
+                await self.queue.heartbeat(job_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Réservation de la tâche {job_id} non prolongée: {e}")
+
+    async def _handle(self, bot, job: Dict[str, Any]):
+        """Exécute une tâche et publie son résultat"""
+        job_id = job['job_id']
+        logger.info(f"Tâche {job_id} prise par le worker {self.worker_id}: {job['url']}")
+        status_message = RemoteStatusMessage(self.queue, job_id, job['chat_id'], job['message_id'])
+        keep_alive = asyncio.create_task(self._keep_alive(job_id))
+        result = None
+        try:
+            # Une tâche déjà au journal a été interrompue ici: reprendre ses fichiers partiels
+            resumed = self.pipeline.journal.get(job_id) is not None
+            result = await self.pipeline._run_job(
+                bot, job['chat_id'], job['user_id'], job['url'], job_id, status_message, resumed=resumed,
+                group=False, deliver=job.get('deliver', True), allowance=job.get('allowance')
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la tâche {job_id}: {e}")
+        finally:
+            keep_alive.cancel()
+        await self.queue.complete(job_id, result)
+
+
+def default_worker_id() -> str:
+    """Identifiant par défaut d'un worker: hôte et PID"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _owner_alive(owner: str) -> bool:
+    """
+    Indique si le worker propriétaire d'une tâche du journal peut encore tourner
+
+    Seul un identifiant par défaut (hôte et PID) de cet hôte peut être
+    vérifié; dans le doute le worker est supposé actif.
+    """
+    host, _, pid = owner.rpartition('-')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+async def prune_journal(journal: JobJournal, queue: JobQueue, worker_id: str):
+    """
+    Oublie les tâches du journal qui ne seront plus reprises
+
+    Une tâche que la file ne propose plus est retirée si son worker s'est
+    arrêté (ce worker lors d'un lancement précédent, ou un worker disparu de
+    cet hôte). Les éléments de playlist d'un worker actif ne passent pas par
+    la file: ils lui sont laissés, comme les tâches sans propriétaire.
+    """
+    queued = {job['job_id'] for job in await queue.pending()}
+    for entry in journal.pending():
+        owner = entry.get('owner')
+        if entry['job_id'] in queued or not owner:
+            continue
+        if owner == worker_id or not _owner_alive(owner):
+            journal.remove(entry['job_id'])
+
+
+def _make_bot() -> Bot:
+    """Client Bot API du worker (mêmes réglages que le frontal)"""
+    if LOCAL_MODE:
+        return Bot(BOT_TOKEN, base_url=f"{LOCAL_BOT_API_URL}/bot",
+                   base_file_url=f"{LOCAL_BOT_API_URL}/file/bot", local_mode=True)
+    return Bot(BOT_TOKEN)
+
+
+async def run_worker(queue: JobQueue, worker_id: Optional[str] = None, stop_event: Optional[asyncio.Event] = None):
+    """
+    Fait tourner un processus worker jusqu'au signal d'arrêt
+
+    Args:
+        queue: File de tâches partagée avec le frontal
+        worker_id: Identifiant du worker (hôte et PID par défaut)
+        stop_event: Événement d'arrêt (SIGINT/SIGTERM par défaut)
+    """
+    from telegram_bot import VideoUploaderBot
+
+    if stop_event is None:
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    worker_id = worker_id or default_worker_id()
+    pipeline = VideoUploaderBot(job_queue=queue, journal=JobJournal(owner=worker_id))
+    worker = DownloadWorker(queue, pipeline, worker_id)
+    await prune_journal(pipeline.journal, queue, worker_id)
+
+    # D'autres workers peuvent partager le dossier: seuls les orphelins anciens sont supprimés
+    storage = pipeline.downloader.storage
+    await asyncio.to_thread(storage.sweep, pipeline._journaled_dirs())
+    storage.start_sweeper(pipeline._journaled_dirs)
+
+    async with _make_bot() as bot:
+        task = asyncio.create_task(worker.run(bot))
+        try:
+            await stop_event.wait()
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await pipeline._post_shutdown(None)